@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+from pathlib import Path
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pox as Pox
+from Cache.program_cache import ProgramCache
+from Embed.program import ENGINES, CompileError, Program
+
+
+def run_job(
+    path: str,
+    engine: str = "tree",
+    optimize: bool = False,
+    memoize: bool = False,
+    use_cache: bool = True,
+) -> dict:
+    """Runs one script on a fresh interpreter, reporting what `run.py path` would."""
+    return Pox.on_large_stack(execute, path, engine, optimize, memoize, use_cache)
+
+
+def execute(path: str, engine: str, optimize: bool, memoize: bool, use_cache: bool) -> dict:
+    start = time.perf_counter()
+    status, exit_status, output = "ok", 0, ""
+    try:
+        with open(path, "r") as file:
+            source = file.read()
+        program = load(path, source, optimize, memoize, use_cache)
+        result = program.run(engine)
+        output = result.output + "".join(f"{error}\n" for error in result.errors)
+        if not result.ok:
+            status = "runtime error"
+    except CompileError as error:
+        status, exit_status = "compile error", 1
+        output = "".join(f"{diagnostic}\n" for diagnostic in error.diagnostics)
+    except OSError as error:
+        status, exit_status = "unreadable", 1
+        output = f"Can't read {path}: {error.strerror}\n"
+    except Exception:
+        # A bug in Pox itself only fails this one job.
+        status, exit_status = "crashed", 1
+        output = traceback.format_exc()
+    return {
+        "path": path,
+        "status": status,
+        "exit": exit_status,
+        "seconds": time.perf_counter() - start,
+        "output": output,
+    }
+
+
+def load(path: str, source: str, optimize: bool, memoize: bool, use_cache: bool) -> Program:
+    """The compiled script, from __poxcache__ like the command line if allowed."""
+    if not use_cache:
+        return Program.compile(source, optimize=optimize, memoize=memoize)
+
+    options = []
+    if optimize:
+        options.append("opt")
+    if memoize:
+        options.append("memo")
+    cache = ProgramCache(path, Pox.POX_VERSION, tuple(options))
+    statements = cache.load(source)
+    if statements is not None:
+        return Program(statements)
+    program = Program.compile(source, optimize=optimize, memoize=memoize)
+    cache.store(source, program.statements)
+    return program
+
+
+def collect(paths: list[str], manifests: list[str]) -> list[str]:
+    """Scripts named directly, found under directories, and listed in manifests."""
+    scripts = []
+    for manifest in manifests:
+        base = Path(manifest).parent
+        with open(manifest, "r") as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    paths.append(str(base / line))
+    for path in paths:
+        if os.path.isdir(path):
+            scripts.extend(str(script) for script in sorted(Path(path).rglob("*.pox")))
+        else:
+            scripts.append(path)
+    return scripts
+
+
+def run_batch(scripts: list[str], job, workers: int):
+    """Yields the result of every script in order, a dying worker only fails its own."""
+    pending = list(scripts)
+    while pending:
+        # Workers are forked from this process, so every Pox module is
+        # already imported when they start.
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(job, script) for script in pending]
+            for finished, future in enumerate(futures):
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    break
+                yield result
+            else:
+                return
+
+        # Every unfinished script fails along with the pool, running the
+        # first one alone tells whether it is the one that killed it.
+        yield run_alone(pending[finished], job)
+        pending = pending[finished + 1 :]
+
+
+def run_alone(script: str, job) -> dict:
+    with ProcessPoolExecutor(1) as pool:
+        try:
+            return pool.submit(job, script).result()
+        except BrokenProcessPool:
+            return {
+                "path": script,
+                "status": "crashed",
+                "exit": 1,
+                "seconds": 0.0,
+                "output": "The worker running the script died.\n",
+            }
+
+
+def write_outputs(results: list[dict], directory: str) -> None:
+    """One <script>.out per script, numbered when two scripts share a name."""
+    os.makedirs(directory, exist_ok=True)
+    taken = set()
+    for result in results:
+        stem = Path(result["path"]).stem
+        name, number = stem, 1
+        while name in taken:
+            number += 1
+            name = f"{stem}-{number}"
+        taken.add(name)
+        with open(os.path.join(directory, name + ".out"), "w") as file:
+            file.write(result["output"])
+
+
+def summary(results: list[dict], workers: int, wall: float) -> str:
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    ok = counts.pop("ok", 0)
+    failed = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    busy = sum(result["seconds"] for result in results)
+    return (
+        f"{len(results)} scripts: {ok} ok"
+        + (f", {failed}" if failed else "")
+        + f" in {wall:.2f}s on {workers} worker{'s' if workers != 1 else ''}"
+        + f" ({busy:.2f}s of script time)"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="Pox batch")
+    parser.add_argument("scripts", nargs="*", help="scripts or directories of scripts to run")
+    parser.add_argument(
+        "--manifest",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="file listing one script per line, relative to the file",
+    )
+    parser.add_argument("--engine", choices=ENGINES, default="tree")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes (default one per core)",
+    )
+    parser.add_argument("-O", "--optimize", action="store_true")
+    parser.add_argument("--memoize", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument(
+        "--output-dir", metavar="DIR", help="write each script's output to DIR/<script>.out"
+    )
+    parser.add_argument(
+        "--json", metavar="FILE", help="write every script's status, time and output to FILE"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="list every script, not only failures"
+    )
+    args = parser.parse_args(argv)
+
+    scripts = collect(list(args.scripts), args.manifest)
+    if not scripts:
+        parser.error("no scripts given")
+    if args.memoize and args.engine not in ("tree", "closure"):
+        parser.error("--memoize needs the tree or closure engine")
+    workers = max(1, min(args.workers, len(scripts)))
+
+    job = partial(
+        run_job,
+        engine=args.engine,
+        optimize=args.optimize,
+        memoize=args.memoize,
+        use_cache=not args.no_cache,
+    )
+    results = []
+    start = time.perf_counter()
+    for result in run_batch(scripts, job, workers):
+        results.append(result)
+        if args.verbose or result["status"] != "ok":
+            print(f"{result['status']:>13} {result['seconds'] * 1000:9.1f}ms  {result['path']}")
+            if result["status"] != "ok":
+                for line in result["output"].splitlines()[-5:]:
+                    print(f"{'':>26}{line}")
+    wall = time.perf_counter() - start
+
+    if args.output_dir is not None:
+        write_outputs(results, args.output_dir)
+    if args.json is not None:
+        with open(args.json, "w") as file:
+            json.dump(
+                {"engine": args.engine, "workers": workers, "seconds": wall, "scripts": results},
+                file,
+                indent=2,
+            )
+
+    print(summary(results, workers, wall))
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import argparse
+import tracemalloc
+from Lexer.lexer import Lexer
+from Lexer.fast_lexer import FastLexer
+from Parser.parser import Parser
+
+LEXERS = {
+    "lexer": lambda source: Lexer(source),
+    "fast": lambda source: FastLexer(source),
+    "packed": lambda source: FastLexer(source, packed=True),
+}
+
+
+def generate(functions: int) -> str:
+    """Builds a large but valid Pox script out of repetitive functions."""
+    parts = []
+    for index in range(functions):
+        parts.append(
+            f"fn work_{index}(a, b) {{\n"
+            f"    let total = 0;\n"
+            f"    for (let i = 0; i < a; i = i + 1) {{\n"
+            f"        if (i == b or total > 1000) {{ total = total - b * 2; }}\n"
+            f"        else {{ total = total + i / 3; }}\n"
+            f"    }}\n"
+            f"    # comment {index}\n"
+            f"    return total + 'label {index}';\n"
+            f"}}\n"
+            f"print work_{index}({index % 7}, {index % 3}.5);\n"
+        )
+    return "".join(parts)
+
+
+def measure(source: str, make_lexer) -> dict:
+    tracemalloc.start()
+
+    tokens = make_lexer(source).scan_tokens()
+    after_lex = tracemalloc.get_traced_memory()[0]
+
+    statements = Parser(tokens).parse()
+    peak = tracemalloc.get_traced_memory()[1]
+
+    del tokens
+    after_parse = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.stop()
+    del statements
+    return {"tokens": after_lex, "peak": peak, "ast": after_parse}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="Pox memory benchmark")
+    parser.add_argument("--functions", type=int, default=5000)
+    args = parser.parse_args()
+
+    source = generate(args.functions)
+    print(f"source: {len(source) / 1e6:.2f} MB")
+    for name, make_lexer in LEXERS.items():
+        result = measure(source, make_lexer)
+        print(
+            f"{name:>7}: tokens {result['tokens'] / 1e6:7.2f} MB"
+            f"  peak {result['peak'] / 1e6:7.2f} MB"
+            f"  ast {result['ast'] / 1e6:7.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
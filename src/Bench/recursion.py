@@ -0,0 +1,52 @@
+import io
+import argparse
+import time
+import pox as Pox
+
+SOURCE = """
+fn fib(n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+print fib(%d);
+"""
+
+
+def calls(n: int) -> int:
+    """How many times fib(n) invokes fib, itself included."""
+    previous, current = 1, 1
+    for _ in range(n - 1):
+        previous, current = current, previous + current + 1
+    return current
+
+
+def measure(engine: str, n: int, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        pox = Pox.Pox(engine=engine, output=io.StringIO())
+        pox.use_cache = False
+        start = time.perf_counter()
+        pox.run(SOURCE % n)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="Pox recursion benchmark")
+    parser.add_argument("--n", type=int, default=22)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engines", default=",".join(Pox.ENGINES))
+    args = parser.parse_args()
+
+    total = calls(args.n)
+    print(f"fib({args.n}): {total} calls")
+    for engine in args.engines.split(","):
+        elapsed = measure(engine, args.n, args.repeat)
+        print(f"{engine:>8}: {elapsed:.3f}s  {elapsed / total * 1e9:8.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import io
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import tracemalloc
+from pathlib import Path
+import pox as Pox
+from Profiler.metrics import MeteringInterpreter
+
+CORPUS_DIR = Path(__file__).resolve().parents[2] / "tests" / "bench"
+
+
+def corpus(names: list[str] | None = None) -> dict[str, str]:
+    """Maps benchmark name to source for every tests/bench/*.pox script."""
+    scripts = {}
+    for path in sorted(CORPUS_DIR.glob("*.pox")):
+        if names is None or path.stem in names:
+            scripts[path.stem] = path.read_text()
+    return scripts
+
+
+def run_once(engine: str, source: str) -> float:
+    pox = Pox.Pox(engine=engine, output=io.StringIO())
+    pox.use_cache = False
+    start = time.perf_counter()
+    pox.run(source)
+    pox.out.flush()
+    return time.perf_counter() - start
+
+
+def count_operations(source: str) -> dict:
+    """Deterministic work counters of one tree interpreter run."""
+    pox = Pox.Pox(output=io.StringIO())
+    pox.use_cache = False
+    pox.interpreter = MeteringInterpreter(pox.out, pox.diagnostics)
+    pox.select_engine("tree")
+    pox.run(source)
+    return pox.interpreter.metrics()
+
+
+def peak_memory(engine: str, source: str) -> int:
+    # Measured in a separate run, tracemalloc slows allocation down too much
+    # to share a run with the timings.
+    tracemalloc.start()
+    try:
+        run_once(engine, source)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(engine: str, source: str, warmup: int, repeat: int) -> dict:
+    for _ in range(warmup):
+        run_once(engine, source)
+    timings = sorted(run_once(engine, source) for _ in range(repeat))
+    return {
+        "median": statistics.median(timings),
+        "p10": percentile(timings, 10),
+        "p90": percentile(timings, 90),
+        "min": timings[0],
+        "max": timings[-1],
+        "runs": repeat,
+        "peak_memory": peak_memory(engine, source),
+    }
+
+
+def percentile(timings: list[float], percent: int) -> float:
+    """Linear interpolation between the closest ranks of sorted timings."""
+    position = (len(timings) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(timings) - 1)
+    return timings[lower] + (timings[upper] - timings[lower]) * (position - lower)
+
+
+def run_suite(
+    scripts: dict[str, str], engines: list[str], warmup: int, repeat: int, counters: bool
+) -> dict:
+    results = {}
+    operations = {}
+    for name, source in scripts.items():
+        results[name] = {}
+        if counters:
+            operations[name] = count_operations(source)
+            print(f"{name:>10} {'counters':>8}: {operations[name]['operations']} operations")
+        for engine in engines:
+            stats = measure(engine, source, warmup, repeat)
+            results[name][engine] = stats
+            print(
+                f"{name:>10} {engine:>8}: median {stats['median'] * 1000:8.2f}ms"
+                f"  p10 {stats['p10'] * 1000:8.2f}ms  p90 {stats['p90'] * 1000:8.2f}ms"
+                f"  peak {stats['peak_memory'] / 1024:8.0f}KB"
+            )
+    return {
+        "pox": Pox.POX_VERSION,
+        "python": platform.python_version(),
+        "warmup": warmup,
+        "repeat": repeat,
+        "results": results,
+        "counters": operations,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Prints the median change against baseline, returns the regressions."""
+    regressions = []
+    for name, engines in current["results"].items():
+        for engine, stats in engines.items():
+            before = baseline["results"].get(name, {}).get(engine)
+            if before is None:
+                continue
+            change = stats["median"] / before["median"] - 1
+            verdict = ""
+            if change > threshold:
+                verdict = "REGRESSION"
+                regressions.append(f"{name}/{engine}")
+            elif change < -threshold:
+                verdict = "faster"
+            print(f"{name:>10} {engine:>8}: {change * 100:+7.1f}%  {verdict}")
+
+    # Counters don't move between identical runs, so any growth is reported.
+    for name, counters in current.get("counters", {}).items():
+        before = baseline.get("counters", {}).get(name)
+        if before is None:
+            continue
+        for key in ("operations", "statements", "expressions", "environments", "hops", "calls"):
+            if counters[key] > before[key]:
+                regressions.append(f"{name}/{key}")
+                print(f"{name:>10} {key:>8}: {before[key]} -> {counters[key]}  REGRESSION")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="Pox bench")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default all)")
+    parser.add_argument("--engines", default=",".join(Pox.ENGINES))
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--counters",
+        action="store_true",
+        help="also record deterministic operation counts of the tree interpreter",
+    )
+    parser.add_argument("--json", metavar="FILE", help="write the results to FILE")
+    parser.add_argument(
+        "--compare", metavar="FILE", help="compare medians against an earlier --json FILE"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="relative slowdown reported as a regression (default 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    scripts = corpus(args.names or None)
+    if not scripts:
+        parser.error(f"no benchmarks found in {CORPUS_DIR}")
+
+    report = run_suite(
+        scripts,
+        [engine for engine in args.engines.split(",") if engine],
+        args.warmup,
+        max(args.repeat, 1),
+        args.counters,
+    )
+
+    if args.json is not None:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, "r") as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import gc
+import os
+import pickle
+import hashlib
+from contextlib import contextmanager
+from Eval.expressions import Expr
+from Eval.statements import Stmt
+from Lexer.token import Token
+from Lexer.token_type import TokenType
+
+CACHE_DIR = "__poxcache__"
+MAGIC = "POXC"
+FORMAT = 1
+
+
+def layout() -> str:
+    """Fingerprint of the node fields and token types a pickled program is made of."""
+    parts = [",".join(token_type.name for token_type in TokenType)]
+    for owner in (Expr, Stmt):
+        for name, node in sorted(vars(owner).items()):
+            if isinstance(node, type) and hasattr(node, "__slots__"):
+                parts.append(f"{owner.__name__}.{name}({','.join(node.__slots__)})")
+    parts.append(f"Token({','.join(Token.__slots__)})")
+    return hashlib.sha256(";".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+LAYOUT = layout()
+
+
+@contextmanager
+def paused_gc():
+    """Keeps the collector from scanning the acyclic AST while it is (un)pickled."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class ProgramCache:
+    """Resolved statements of a script, stored in __poxcache__ next to it."""
+
+    def __init__(self, script_path: str, version: str, options: tuple = ()) -> None:
+        directory, file_name = os.path.split(os.path.abspath(script_path))
+        stem = os.path.splitext(file_name)[0]
+        self.directory = os.path.join(directory, CACHE_DIR)
+        tags = "".join(f".{option}" for option in options)
+        self.path = os.path.join(self.directory, f"{stem}.pox-{version}{tags}.cache")
+        self.version = version
+        self.options = options
+
+    # An entry whose header differs in anything is a miss, overwritten by store().
+    def header(self, source: str) -> tuple:
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        return (MAGIC, FORMAT, LAYOUT, self.version, self.options, digest)
+
+    def load(self, source: str):
+        """Returns the cached statements for source, or None on a miss."""
+        try:
+            with open(self.path, "rb") as file:
+                header = pickle.load(file)
+                if header != self.header(source):
+                    return None
+                with paused_gc():
+                    return pickle.load(file)
+        except Exception:
+            # A truncated or foreign file can fail unpickling in many ways,
+            # all of them simply mean the entry has to be rebuilt.
+            return None
+
+    def store(self, source: str, statements: list) -> bool:
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary, "wb") as file, paused_gc():
+                pickle.dump(self.header(source), file, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(statements, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path)
+            return True
+        except (OSError, pickle.PicklingError, RecursionError):
+            # A read-only directory or a too deeply nested program only
+            # costs the warm start, never the run itself.
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return False
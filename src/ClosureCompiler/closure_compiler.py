@@ -0,0 +1,764 @@
+from Eval.expressions import Expr
+from Eval.statements import Stmt
+from Lexer.token_type import TokenType
+from Errors.runtime_error import Runtime_error, STACK_OVERFLOW
+from Lexer.token import Token
+from Env.environment import Environment
+from Functions.pox_callable import PoxCallable
+from Functions.pox_function import PoxFunction
+from Functions.native_function import NativeFunction
+from Functions.completion import BREAK, CONTINUE, RETURN, TAIL_CALL
+from Memo.memo import MemoTable, Memoized
+from Collections.pox_array import PoxArray, get_item, set_item
+from Collections.pox_map import PoxMap
+from Collections.rope import Rope, concat
+
+
+class CompiledFunction(PoxFunction):
+    def __init__(self, declaration: Stmt.Function, closure: Environment, body) -> None:
+        super().__init__(declaration, closure)
+        self.body = body
+
+    def call(self, interpreter, arguments: list) -> object:
+        function = self
+        while True:
+            env = Environment(function.closure, function.declaration.slot_count)
+            env.slots[: len(arguments)] = arguments
+
+            completion = function.body(env)
+            if completion is RETURN:
+                return interpreter.return_value
+            if completion is not TAIL_CALL:
+                return None
+
+            function, arguments = interpreter.return_value
+
+
+class MemoizedCompiledFunction(CompiledFunction, Memoized):
+    def __init__(
+        self, declaration: Stmt.Function, closure: Environment, body, memo: MemoTable
+    ) -> None:
+        super().__init__(declaration, closure, body)
+        self.memo = memo
+
+    def call(self, interpreter, arguments: list) -> object:
+        return self.memo.call(CompiledFunction.call, self, interpreter, arguments)
+
+
+class ClosureCompiler(Expr.Visitor, Stmt.Visitor):
+    """Compiles resolved statements into Python closures taking the Environment."""
+
+    def __init__(self, interpreter) -> None:
+        self.interpreter = interpreter
+        # Line of every compiled statement closure, for the sampler.
+        self.lines = {}
+
+    def interpret(self, statements: list[Stmt]):
+        global_env = self.interpreter.global_env
+        line = statements[0].line if statements else 0
+        try:
+            # Top level statements are kept apart to know where a stack
+            # overflow started, they can't complete abruptly anyway.
+            program = []
+            for statement in statements:
+                line = statement.line
+                program.append((self.compile_stmt(statement), line))
+            for statement, line in program:
+                statement(global_env)
+        except Runtime_error as error:
+            self.interpreter.diagnostics.runtime_error(error)
+        except RecursionError:
+            token = Token(TokenType.EOF, "", None, line)
+            error = Runtime_error(token, STACK_OVERFLOW)
+            self.interpreter.diagnostics.runtime_error(error)
+
+    def compile_expr(self, expr: Expr):
+        return expr.accept(self)
+
+    def compile_stmt(self, stmt: Stmt):
+        compiled = stmt.accept(self)
+        # A one statement block is its statement's closure, keep the inner line.
+        self.lines.setdefault(compiled, stmt.line)
+        return compiled
+
+    def compile_block(self, statements: list[Stmt]):
+        compiled = tuple(self.compile_stmt(statement) for statement in statements)
+
+        if len(compiled) == 1:
+            return compiled[0]
+
+        if not any(self.completes_abruptly(statement) for statement in statements):
+
+            def block(env):
+                for statement in compiled:
+                    statement(env)
+
+            return block
+
+        checked = tuple(
+            (closure, self.completes_abruptly(statement))
+            for closure, statement in zip(compiled, statements)
+        )
+
+        def block(env):
+            for statement, abrupt in checked:
+                if abrupt:
+                    completion = statement(env)
+                    if completion is not None:
+                        return completion
+                else:
+                    statement(env)
+            return None
+
+        return block
+
+    def completes_abruptly(self, stmt: Stmt) -> bool:
+        """Whether running stmt can end in a break, continue or return."""
+        if isinstance(stmt, (Stmt.Return, Stmt.Break, Stmt.Continue)):
+            return True
+        if isinstance(stmt, Stmt.Block):
+            return any(self.completes_abruptly(inner) for inner in stmt.statements)
+        if isinstance(stmt, Stmt.If):
+            return self.completes_abruptly(stmt.then_branch) or (
+                stmt.else_branch is not None
+                and self.completes_abruptly(stmt.else_branch)
+            )
+        if isinstance(stmt, Stmt.While):
+            return self.returns(stmt.body)
+        return False
+
+    def returns(self, stmt: Stmt) -> bool:
+        """Whether stmt contains a return outside of nested functions."""
+        if isinstance(stmt, Stmt.Return):
+            return True
+        if isinstance(stmt, Stmt.Block):
+            return any(self.returns(inner) for inner in stmt.statements)
+        if isinstance(stmt, Stmt.If):
+            return self.returns(stmt.then_branch) or (
+                stmt.else_branch is not None and self.returns(stmt.else_branch)
+            )
+        if isinstance(stmt, Stmt.While):
+            return self.returns(stmt.body)
+        return False
+
+    def undefined(self, name):
+        return Runtime_error(
+            name, f'Can\'t access uninitialized variable "{name.lexeme}".'
+        )
+
+    # Statements
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        # Named like the block loops' variable so the sampler finds its line.
+        statement = self.compile_block(stmt.statements)
+        size = stmt.slot_count
+
+        def block(env):
+            return statement(Environment(env, size))
+
+        return block
+
+    def visit_break_stmt(self, stmt: Stmt.Break):
+        return lambda env: BREAK
+
+    def visit_continue_stmt(self, stmt: Stmt.Continue):
+        return lambda env: CONTINUE
+
+    def visit_expression_stmt(self, stmt: Stmt.Expression):
+        return self.compile_expr(stmt.expression)
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        body = self.compile_block(stmt.body)
+        name = stmt.name.lexeme
+        slot = stmt.slot
+
+        if stmt.dependencies is not None:
+            memo_table = self.interpreter.memo_table
+
+            def function(env):
+                memo = memo_table(stmt)
+                env.define(name, MemoizedCompiledFunction(stmt, env, body, memo))
+
+        elif slot is None:
+
+            def function(env):
+                env.define(name, CompiledFunction(stmt, env, body))
+
+        else:
+
+            def function(env):
+                env.slots[slot] = CompiledFunction(stmt, env, body)
+
+        return function
+
+    def visit_if_stmt(self, stmt: Stmt.If):
+        condition = self.compile_expr(stmt.condition)
+        then_branch = self.compile_stmt(stmt.then_branch)
+
+        if self.completes_abruptly(stmt):
+            return self.compile_abrupt_if(stmt, condition, then_branch)
+
+        if stmt.else_branch is None:
+
+            def if_stmt(env):
+                value = condition(env)
+                if value is not None and value is not False:
+                    then_branch(env)
+
+        else:
+            else_branch = self.compile_stmt(stmt.else_branch)
+
+            def if_stmt(env):
+                value = condition(env)
+                if value is not None and value is not False:
+                    then_branch(env)
+                else:
+                    else_branch(env)
+
+        return if_stmt
+
+    def compile_abrupt_if(self, stmt: Stmt.If, condition, then_branch):
+        # A branch that cannot complete abruptly may hand back any value,
+        # so only the result of one that can is passed on.
+        then_abrupt = self.completes_abruptly(stmt.then_branch)
+        else_branch = (
+            self.compile_stmt(stmt.else_branch)
+            if stmt.else_branch is not None
+            else (lambda env: None)
+        )
+        else_abrupt = stmt.else_branch is not None and self.completes_abruptly(
+            stmt.else_branch
+        )
+
+        def if_stmt(env):
+            value = condition(env)
+            if value is not None and value is not False:
+                completion = then_branch(env)
+                return completion if then_abrupt else None
+            completion = else_branch(env)
+            return completion if else_abrupt else None
+
+        return if_stmt
+
+    def visit_print_stmt(self, stmt: Stmt.Print):
+        value = self.compile_expr(stmt.expression)
+        stringify = self.interpreter.stringify
+        write_line = self.interpreter.out.write_line
+
+        def print_stmt(env):
+            write_line(stringify(value(env)))
+
+        return print_stmt
+
+    def visit_return_stmt(self, stmt: Stmt.Return):
+        interpreter = self.interpreter
+
+        if stmt.value is None:
+
+            def return_stmt(env):
+                interpreter.return_value = None
+                return RETURN
+
+        elif isinstance(stmt.value, Expr.Call):
+            return self.compile_tail_call(stmt.value)
+
+        else:
+            value = self.compile_expr(stmt.value)
+
+            def return_stmt(env):
+                interpreter.return_value = value(env)
+                return RETURN
+
+        return return_stmt
+
+    def compile_tail_call(self, expr: Expr.Call):
+        # Same checks as visit_call_expr, but a CompiledFunction is left to
+        # the CompiledFunction.call loop receiving TAIL_CALL.
+        callee = self.compile_expr(expr.callee)
+        arguments = tuple(self.compile_expr(argument) for argument in expr.arguments)
+        argc = len(arguments)
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def return_stmt(env):
+            function = callee(env)
+            args = [argument(env) for argument in arguments]
+
+            if function is expr.cache:
+                interpreter.call_hits += 1
+            else:
+                interpreter.call_misses += 1
+                if not isinstance(function, PoxCallable):
+                    raise Runtime_error(paren, "Can only call function and classes.")
+                if argc != function.arity():
+                    raise Runtime_error(
+                        paren, f"Expected {function.arity()} arguments but got {argc}."
+                    )
+                expr.cache = function
+
+            if type(function) is CompiledFunction:
+                interpreter.return_value = (function, args)
+                return TAIL_CALL
+
+            try:
+                interpreter.return_value = function.call(interpreter, args)
+            except Runtime_error as error:
+                raise error.at(paren)
+            return RETURN
+
+        return return_stmt
+
+    def visit_var_stmt(self, stmt: Stmt.Var):
+        name = stmt.name.lexeme
+        slot = stmt.slot
+        initializer = (
+            self.compile_expr(stmt.initializer)
+            if stmt.initializer is not None
+            else (lambda env: None)
+        )
+
+        if slot is None:
+
+            def var_stmt(env):
+                env.define(name, initializer(env))
+
+        else:
+
+            def var_stmt(env):
+                env.slots[slot] = initializer(env)
+
+        return var_stmt
+
+    def visit_while_stmt(self, stmt: Stmt.While):
+        condition = self.compile_expr(stmt.condition)
+        body = self.compile_stmt(stmt.body)
+        increment = (
+            self.compile_expr(stmt.increment) if stmt.increment is not None else None
+        )
+
+        if not self.completes_abruptly(stmt.body):
+            if increment is None:
+
+                def while_stmt(env):
+                    value = condition(env)
+                    while value is not None and value is not False:
+                        body(env)
+                        value = condition(env)
+
+            else:
+
+                def while_stmt(env):
+                    value = condition(env)
+                    while value is not None and value is not False:
+                        body(env)
+                        increment(env)
+                        value = condition(env)
+
+            return while_stmt
+
+        def while_stmt(env):
+            value = condition(env)
+            while value is not None and value is not False:
+                completion = body(env)
+                if completion is BREAK:
+                    break
+                if completion is RETURN or completion is TAIL_CALL:
+                    return completion
+                if increment is not None:
+                    increment(env)
+                value = condition(env)
+            return None
+
+        return while_stmt
+
+    # Expressions
+
+    def visit_literal_expr(self, expr: Expr.Literal):
+        value = expr.value
+        return lambda env: value
+
+    def visit_grouping_expr(self, expr: Expr.Grouping):
+        return self.compile_expr(expr.expression)
+
+    def visit_variable_expr(self, expr: Expr.Variable):
+        name = expr.name
+        slot = expr.slot
+        undefined = self.undefined
+
+        if expr.depth is None:
+            interpreter = self.interpreter
+            global_env = interpreter.global_env
+
+            def variable(env):
+                version, value = expr.cache
+                if version == global_env.version:
+                    interpreter.variable_hits += 1
+                else:
+                    interpreter.variable_misses += 1
+                    value = global_env.get(name)
+                    expr.cache = (global_env.version, value)
+                if value is None:
+                    raise undefined(name)
+                return value
+
+        elif expr.depth == 0:
+
+            def variable(env):
+                value = env.slots[slot]
+                if value is None:
+                    raise undefined(name)
+                return value
+
+        elif expr.depth == 1:
+
+            def variable(env):
+                value = env.enclosing.slots[slot]
+                if value is None:
+                    raise undefined(name)
+                return value
+
+        else:
+            depth = expr.depth
+
+            def variable(env):
+                value = env.ancestor(depth).slots[slot]
+                if value is None:
+                    raise undefined(name)
+                return value
+
+        return variable
+
+    def visit_assign_expr(self, expr: Expr.Assign):
+        return self.compile_assign(expr, self.compile_expr(expr.value))
+
+    def visit_append_expr(self, expr: Expr.Append):
+        binary = expr.value
+        left = self.compile_expr(binary.left)
+        right = self.compile_expr(binary.right)
+        operator = binary.operator
+        stringify = self.interpreter.stringify
+
+        def append(env):
+            a = left(env)
+            b = right(env)
+            kind = type(a)
+            if kind is float and type(b) is float:
+                return a + b
+            if kind is str or kind is Rope:
+                return concat(a, stringify(b))
+            if isinstance(b, (str, Rope)):
+                return stringify(a) + stringify(b)
+            raise Runtime_error(operator, "Operands must be two numbers or two strings.")
+
+        return self.compile_assign(expr, append)
+
+    def compile_assign(self, expr: Expr.Assign, value):
+        name = expr.name
+        slot = expr.slot
+
+        if expr.depth is None:
+            global_env = self.interpreter.global_env
+
+            def assign(env):
+                result = value(env)
+                global_env.assign(name, result)
+                return result
+
+        elif expr.depth == 0:
+
+            def assign(env):
+                result = env.slots[slot] = value(env)
+                return result
+
+        else:
+            depth = expr.depth
+
+            def assign(env):
+                result = env.ancestor(depth).slots[slot] = value(env)
+                return result
+
+        return assign
+
+    def visit_logical_expr(self, expr: Expr.Logical):
+        left = self.compile_expr(expr.left)
+        right = self.compile_expr(expr.right)
+
+        if expr.operator.token_type == TokenType.OR:
+
+            def logical(env):
+                value = left(env)
+                if value is not None and value is not False:
+                    return value
+                return right(env)
+
+        else:
+
+            def logical(env):
+                value = left(env)
+                if value is None or value is False:
+                    return value
+                return right(env)
+
+        return logical
+
+    def visit_unary_expr(self, expr: Expr.Unary):
+        right = self.compile_expr(expr.right)
+
+        if expr.operator.token_type == TokenType.MINUS:
+            return lambda env: -float(right(env))
+
+        def not_(env):
+            value = right(env)
+            return value is None or value is False
+
+        return not_
+
+    def visit_binary_expr(self, expr: Expr.Binary):
+        if isinstance(expr.left, Expr.Literal) and isinstance(expr.right, Expr.Literal):
+            # Both operands are known, so the whole node becomes a constant,
+            # unless evaluating it raises, which must still happen at runtime.
+            try:
+                value = self.interpreter.evaluate(expr)
+            except Exception:
+                pass
+            else:
+                return lambda env: value
+
+        operator = expr.operator
+        kind = operator.token_type
+        left = self.compile_expr(expr.left)
+        right = self.compile_expr(expr.right)
+        constant = (
+            expr.right.value
+            if isinstance(expr.right, Expr.Literal) and type(expr.right.value) is float
+            else None
+        )
+
+        if kind == TokenType.EQUAL_EQUAL:
+            return lambda env: left(env) == right(env)
+        if kind == TokenType.BANG_EQUAL:
+            return lambda env: left(env) != right(env)
+        if kind == TokenType.PLUS:
+            return self.compile_add(operator, left, right)
+        if kind == TokenType.MINUS:
+            if constant is not None:
+                return lambda env: float(left(env)) - constant
+            return self.compile_subtract(operator, left, right)
+        if kind == TokenType.SLASH:
+            return self.compile_divide(operator, left, right)
+
+        compute = {
+            TokenType.GREATER: lambda a, b: a > b,
+            TokenType.GREATER_EQUAL: lambda a, b: a >= b,
+            TokenType.LESS: lambda a, b: a < b,
+            TokenType.LESS_EQUAL: lambda a, b: a <= b,
+            TokenType.STAR: lambda a, b: a * b,
+        }[kind]
+        return self.compile_numeric(kind, operator, left, right, constant, compute)
+
+    def compile_numeric(self, kind, operator, left, right, constant, compute):
+        # The common comparisons get their own closures to skip the extra
+        # call through `compute`.
+        if constant is not None:
+            if kind == TokenType.LESS:
+
+                def binary(env):
+                    a = left(env)
+                    if type(a) is float:
+                        return a < constant
+                    raise Runtime_error(operator, "Operand must be a number.")
+
+                return binary
+
+            if kind == TokenType.LESS_EQUAL:
+
+                def binary(env):
+                    a = left(env)
+                    if type(a) is float:
+                        return a <= constant
+                    raise Runtime_error(operator, "Operand must be a number.")
+
+                return binary
+
+            def binary(env):
+                a = left(env)
+                if type(a) is float:
+                    return compute(a, constant)
+                raise Runtime_error(operator, "Operand must be a number.")
+
+            return binary
+
+        if kind == TokenType.LESS:
+
+            def binary(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is float and type(b) is float:
+                    return a < b
+                raise Runtime_error(operator, "Operand must be a number.")
+
+            return binary
+
+        def binary(env):
+            a = left(env)
+            b = right(env)
+            if type(a) is float and type(b) is float:
+                return compute(a, b)
+            raise Runtime_error(operator, "Operand must be a number.")
+
+        return binary
+
+    def compile_add(self, operator, left, right):
+        stringify = self.interpreter.stringify
+
+        def add(env):
+            a = left(env)
+            b = right(env)
+            if type(a) is float and type(b) is float:
+                return a + b
+            if isinstance(a, (str, Rope)) or isinstance(b, (str, Rope)):
+                return stringify(a) + stringify(b)
+            raise Runtime_error(operator, "Operands must be two numbers or two strings.")
+
+        return add
+
+    def compile_subtract(self, operator, left, right):
+        def subtract(env):
+            a = left(env)
+            b = right(env)
+            if type(b) is float:
+                return float(a) - b
+            raise Runtime_error(operator, "Operand must be a number.")
+
+        return subtract
+
+    def compile_divide(self, operator, left, right):
+        def divide(env):
+            a = left(env)
+            b = right(env)
+            if type(a) is not float or type(b) is not float:
+                raise Runtime_error(operator, "Operand must be a number.")
+            if a == 0 or b == 0:
+                raise Runtime_error(operator, f"Trying to devide by Zero: {a} / {b}")
+            return a / b
+
+        return divide
+
+    def visit_call_expr(self, expr: Expr.Call):
+        callee = self.compile_expr(expr.callee)
+        arguments = tuple(self.compile_expr(argument) for argument in expr.arguments)
+        argc = len(arguments)
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def call_function(env, function):
+            args = [argument(env) for argument in arguments]
+
+            if function is expr.cache:
+                interpreter.call_hits += 1
+            else:
+                interpreter.call_misses += 1
+                if not isinstance(function, PoxCallable):
+                    raise Runtime_error(paren, "Can only call function and classes.")
+                if argc != function.arity():
+                    raise Runtime_error(
+                        paren, f"Expected {function.arity()} arguments but got {argc}."
+                    )
+                expr.cache = function
+
+            try:
+                return function.call(interpreter, args)
+            except Runtime_error as error:
+                raise error.at(paren)
+
+        # A cached native of one or two arguments gets them passed directly,
+        # without an argument list.
+
+        if argc == 1:
+            (first,) = arguments
+
+            def call(env):
+                function = callee(env)
+                if function is not expr.cache or type(function) is not NativeFunction:
+                    return call_function(env, function)
+                interpreter.call_hits += 1
+                try:
+                    return function.function(first(env))
+                except Runtime_error as error:
+                    raise error.at(paren)
+
+        elif argc == 2:
+            first, second = arguments
+
+            def call(env):
+                function = callee(env)
+                if function is not expr.cache or type(function) is not NativeFunction:
+                    return call_function(env, function)
+                interpreter.call_hits += 1
+                try:
+                    return function.function(first(env), second(env))
+                except Runtime_error as error:
+                    raise error.at(paren)
+
+        else:
+
+            def call(env):
+                return call_function(env, callee(env))
+
+        return call
+
+    def visit_array_expr(self, expr: Expr.Array):
+        elements = tuple(self.compile_expr(element) for element in expr.elements)
+
+        def array(env):
+            return PoxArray.of([element(env) for element in elements])
+
+        return array
+
+    def visit_map_expr(self, expr: Expr.Map):
+        entries = tuple(
+            (self.compile_expr(key), self.compile_expr(value))
+            for key, value in zip(expr.keys, expr.values)
+        )
+        brace = expr.brace
+
+        def map_(env):
+            pairs = [(key(env), value(env)) for key, value in entries]
+            try:
+                return PoxMap.of(pairs)
+            except Runtime_error as error:
+                raise error.at(brace)
+
+        return map_
+
+    def visit_index_expr(self, expr: Expr.Index):
+        target = self.compile_expr(expr.array)
+        index = self.compile_expr(expr.index)
+        bracket = expr.bracket
+
+        def get_index(env):
+            array = target(env)
+            i = index(env)
+            try:
+                return get_item(array, i)
+            except Runtime_error as error:
+                raise error.at(bracket)
+
+        return get_index
+
+    def visit_set_index_expr(self, expr: Expr.SetIndex):
+        target = self.compile_expr(expr.array)
+        index = self.compile_expr(expr.index)
+        value = self.compile_expr(expr.value)
+        bracket = expr.bracket
+
+        def set_index(env):
+            array = target(env)
+            i = index(env)
+            new = value(env)
+            try:
+                return set_item(array, i, new)
+            except Runtime_error as error:
+                raise error.at(bracket)
+
+        return set_index
@@ -0,0 +1,71 @@
+from array import array
+from Errors.runtime_error import Runtime_error
+from .pox_map import PoxMap, get_entry, set_entry
+
+
+def storage(values) -> array | list:
+    """Contiguous array('d') when every value is a number, a list otherwise."""
+    values = values if isinstance(values, list) else list(values)
+    # Checked by exact type, array("d") would silently turn True into 1.0.
+    if all(type(value) is float for value in values):
+        return array("d", values)
+    return values
+
+
+class PoxArray:
+    """The value of an array literal, compared by identity like other Pox objects."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: array | list) -> None:
+        # Numbers stay unboxed in an array('d') until something else is stored.
+        self.items = items
+
+    @classmethod
+    def of(cls, values) -> "PoxArray":
+        return cls(storage(values))
+
+    def numeric(self) -> bool:
+        return type(self.items) is array
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __repr__(self) -> str:
+        return f"<array of {len(self.items)}>"
+
+
+def whole_number(value: object, what: str) -> int:
+    if type(value) is not float or not value.is_integer():
+        raise Runtime_error(None, f"{what} must be a whole number.")
+    return int(value)
+
+
+def position(target: PoxArray, index: object) -> int:
+    i = whole_number(index, "Array index")
+    if not 0 <= i < len(target.items):
+        raise Runtime_error(
+            None, f"Array index {i} out of range for length {len(target.items)}."
+        )
+    return i
+
+
+def get_item(target: object, index: object) -> object:
+    if type(target) is not PoxArray:
+        if type(target) is PoxMap:
+            return get_entry(target, index)
+        raise Runtime_error(None, "Only arrays and maps can be indexed.")
+    return target.items[position(target, index)]
+
+
+def set_item(target: object, index: object, value: object) -> object:
+    if type(target) is not PoxArray:
+        if type(target) is PoxMap:
+            return set_entry(target, index, value)
+        raise Runtime_error(None, "Only arrays and maps can be indexed.")
+    i = position(target, index)
+    items = target.items
+    if type(items) is array and type(value) is not float:
+        items = target.items = list(items)
+    items[i] = value
+    return value
@@ -0,0 +1,54 @@
+from Errors.runtime_error import Runtime_error
+from .rope import Rope
+
+
+def map_key(key: object) -> object:
+    """key as stored in a map, Ropes are flattened so they hash as strings."""
+    kind = type(key)
+    if kind is str or kind is float or kind is bool or key is None:
+        return key
+    if kind is Rope:
+        return str(key)
+    raise Runtime_error(None, "Map keys must be numbers, strings, booleans or Nil.")
+
+
+def describe(key: object) -> str:
+    if type(key) is float and key.is_integer():
+        return str(int(key))
+    if key is None:
+        return "Nil"
+    return str(key)
+
+
+class PoxMap:
+    """The value of a map literal, keys are equal when `==` says they are."""
+
+    __slots__ = ("entries",)
+
+    def __init__(self, entries: dict) -> None:
+        self.entries = entries
+
+    @classmethod
+    def of(cls, pairs) -> "PoxMap":
+        return cls({map_key(key): value for key, value in pairs})
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f"<map of {len(self.entries)}>"
+
+
+def get_entry(target: PoxMap, key: object) -> object:
+    try:
+        return target.entries[key]
+    except KeyError:
+        key = map_key(key)
+    if key in target.entries:
+        return target.entries[key]
+    raise Runtime_error(None, f'Undefined key "{describe(key)}".')
+
+
+def set_entry(target: PoxMap, key: object, value: object) -> object:
+    target.entries[map_key(key)] = value
+    return value
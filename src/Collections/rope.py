@@ -0,0 +1,69 @@
+# Results shorter than this stay plain strings, copying them is cheaper
+# than keeping a Rope around.
+ROPE_MIN = 256
+
+
+class Builder:
+    """The pieces appended so far, shared by every Rope grown from them."""
+
+    __slots__ = ("parts", "length")
+
+    def __init__(self, parts: list[str], length: int) -> None:
+        self.parts = parts
+        self.length = length
+
+
+class Rope:
+    """A string grown in place by `s = s + piece`, joined when the text is needed."""
+
+    __slots__ = ("builder", "length", "text")
+
+    def __init__(self, builder: Builder, length: int) -> None:
+        self.builder = builder
+        # Older Ropes of the builder only see their first `length` characters.
+        self.length = length
+        self.text = None
+
+    def __str__(self) -> str:
+        text = self.text
+        if text is None:
+            builder = self.builder
+            if len(builder.parts) > 1:
+                builder.parts = ["".join(builder.parts)]
+            text = builder.parts[0]
+            if len(text) != self.length:
+                text = text[: self.length]
+            self.text = text
+        return text
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (str, Rope)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __repr__(self) -> str:
+        return f"<rope of {self.length}>"
+
+
+def concat(left: str | Rope, piece: str) -> str | Rope:
+    """left + piece, growing left's Builder in place when left is its newest Rope."""
+    if type(left) is str:
+        length = len(left) + len(piece)
+        if length < ROPE_MIN:
+            return left + piece
+        return Rope(Builder([left, piece], length), length)
+
+    builder = left.builder
+    if left.length != builder.length:
+        # Something was already appended to a newer value, start over from
+        # this one's text.
+        builder = Builder([str(left)], left.length)
+    builder.parts.append(piece)
+    builder.length += len(piece)
+    return Rope(builder, builder.length)
@@ -0,0 +1,184 @@
+import io
+import inspect
+from Lexer.lexer import Lexer
+from Lexer.fast_lexer import FastLexer
+from Eval.statements import Stmt
+from Interpreter.interpreter import Interpreter
+from Interpreter.resolver import Resolver
+from Optimizer.optimizer import Optimizer
+from Parser.parser import Parser
+from VM.vm import VM
+from ClosureCompiler.closure_compiler import ClosureCompiler
+from Transpiler.transpiler import Transpiler
+from Collections.pox_array import PoxArray
+from Collections.pox_map import PoxMap
+from Errors.diagnostics import Diagnostics
+from Functions.native_function import NativeFunction
+from Functions.pox_callable import PoxCallable
+from Output.output_sink import OutputSink
+from Memo.purity import PurityAnalysis
+
+ENGINES = ("tree", "closure", "vm", "python")
+
+
+def make_executor(engine: str, interpreter: Interpreter):
+    """The object whose interpret() runs statements on the given engine."""
+    match engine:
+        case "tree":
+            return interpreter
+        case "closure":
+            return ClosureCompiler(interpreter)
+        case "vm":
+            return VM(interpreter)
+        case "python":
+            return Transpiler(interpreter)
+        case _:
+            raise ValueError(f'Unknown engine "{engine}".')
+
+
+def global_values(executor, interpreter: Interpreter) -> dict:
+    """Name to value of every global once executor has run."""
+    if isinstance(executor, Transpiler):
+        # Generated code keeps globals as g_<name> in its own namespace.
+        namespace = executor.namespace
+        return {name[2:]: value for name, value in namespace.items() if name.startswith("g_")}
+    return interpreter.global_env.values
+
+
+def compile_source(
+    source: str,
+    interpreter: Interpreter,
+    optimize: bool = False,
+    memoize: bool = False,
+    fast_lexer: bool = False,
+    packed_tokens: bool = False,
+    repl: bool = False,
+    optimizer_report=None,
+) -> list[Stmt] | None:
+    """Lexes, parses and resolves source, returns None if it had errors."""
+    diagnostics = interpreter.diagnostics
+    if fast_lexer or packed_tokens:
+        lexer = FastLexer(source, packed=packed_tokens, diagnostics=diagnostics)
+    else:
+        lexer = Lexer(source, diagnostics)
+    statements = Parser(lexer.scan_tokens(), diagnostics).parse()
+    if diagnostics.had_error:
+        return None
+
+    if optimize:
+        optimizer = Optimizer(interpreter, repl=repl)
+        statements = optimizer.optimize(statements)
+        if optimizer_report is not None:
+            optimizer_report(optimizer.report())
+
+    Resolver(interpreter, diagnostics).resolve(statements)
+    if diagnostics.had_error:
+        return None
+
+    if memoize:
+        PurityAnalysis().analyze(statements)
+    return statements
+
+
+def pox_value(value: object) -> object:
+    """Converts a Python value to the Pox value it stands for."""
+    if value is None or type(value) in (bool, float, str):
+        return value
+    if isinstance(value, (PoxArray, PoxMap, PoxCallable)):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return PoxArray.of([pox_value(item) for item in value])
+    if isinstance(value, dict):
+        return PoxMap.of((pox_value(key), pox_value(item)) for key, item in value.items())
+    if callable(value):
+        return native(value)
+    raise TypeError(f"Can't pass a {type(value).__name__} to Pox.")
+
+
+def native(function) -> NativeFunction:
+    """Wraps a Python callable so Pox can call it, converting what it returns."""
+    argc = len(inspect.signature(function).parameters)
+    name = getattr(function, "__name__", "native")
+    return NativeFunction(name, argc, lambda *arguments: pox_value(function(*arguments)))
+
+
+class CompileError(Exception):
+    """Raised by Program.compile, `diagnostics` holds what went wrong."""
+
+    def __init__(self, diagnostics: list) -> None:
+        super().__init__("\n".join(str(diagnostic) for diagnostic in diagnostics))
+        self.diagnostics = diagnostics
+
+
+class Result:
+    """What one Program.run left behind."""
+
+    __slots__ = ("output", "diagnostics", "globals")
+
+    def __init__(self, output: str | None, diagnostics: Diagnostics, globals: dict) -> None:
+        # None when the run printed to a stream of the caller's.
+        self.output = output
+        self.diagnostics = diagnostics
+        self.globals = globals
+
+    @property
+    def errors(self) -> list:
+        return self.diagnostics.errors
+
+    @property
+    def ok(self) -> bool:
+        return not self.diagnostics.errors
+
+
+class Program:
+    """A script compiled once, each run gets its own interpreter, globals and output."""
+
+    def __init__(self, statements: list[Stmt], memo_size: int | None = None) -> None:
+        self.statements = statements
+        self.memo_size = memo_size
+
+    @classmethod
+    def compile(
+        cls,
+        source: str,
+        optimize: bool = False,
+        memoize: bool = False,
+        fast_lexer: bool = False,
+        memo_size: int | None = None,
+    ) -> "Program":
+        interpreter = Interpreter(diagnostics=Diagnostics())
+        statements = compile_source(
+            source, interpreter, optimize=optimize, memoize=memoize, fast_lexer=fast_lexer
+        )
+        if statements is None:
+            raise CompileError(interpreter.diagnostics.errors)
+        return cls(statements, memo_size)
+
+    def run(self, engine: str = "tree", globals: dict | None = None, output=None) -> Result:
+        """Runs the program on a fresh interpreter with `globals` defined."""
+        # Printed lines end up in Result.output unless output is a stream.
+        captured = io.StringIO() if output is None else None
+        out = OutputSink(captured if output is None else output)
+        interpreter = Interpreter(out, Diagnostics())
+        if self.memo_size is not None:
+            interpreter.memo_size = max(self.memo_size, 1)
+        builtins = set(interpreter.global_env.values)
+        for name, value in (globals or {}).items():
+            interpreter.global_env.define(name, pox_value(value))
+        executor = make_executor(engine, interpreter)
+        try:
+            executor.interpret(self.statements)
+        finally:
+            out.flush()
+        values = {
+            name: value
+            for name, value in global_values(executor, interpreter).items()
+            if name not in builtins
+        }
+        return Result(
+            captured.getvalue() if captured is not None else None,
+            interpreter.diagnostics,
+            values,
+        )
@@ -1,11 +1,22 @@
+from itertools import count
 from Errors.runtime_error import Runtime_error
 from Lexer.token import Token
 
+# Shared by every Environment, so a version number identifies one state of
+# one Environment and an inline cache filled by another one never matches.
+versions = count(1)
+
 
 class Environment:
-    def __init__(self, enclosing=None) -> None:
+    """Globals live in `values` by name, resolved locals in `slots`."""
+
+    # Changes whenever a global is defined or assigned, inline caches check it.
+    version = 0
+
+    def __init__(self, enclosing=None, size: int = 0) -> None:
         self.enclosing = enclosing
         self.values = {}
+        self.slots = [None] * size
 
     def get(self, name: Token) -> object:
         if name.lexeme in self.values:
@@ -18,6 +29,7 @@ class Environment:
     def assign(self, name: Token, value: object) -> object:
         if name.lexeme in self.values:
             self.values[name.lexeme] = value
+            self.version = next(versions)
             return
         if self.enclosing is not None:
             self.enclosing.assign(name, value)
@@ -27,3 +39,24 @@ class Environment:
 
     def define(self, name: str, value: object):
         self.values[name] = value
+        self.version = next(versions)
+
+    def ancestor(self, depth: int):
+        env = self
+        for _ in range(depth):
+            env = env.enclosing
+        return env
+
+    def get_at(self, depth: int, slot: int) -> object:
+        if depth == 0:
+            return self.slots[slot]
+        return self.ancestor(depth).slots[slot]
+
+    def assign_at(self, depth: int, slot: int, value: object) -> None:
+        if depth == 0:
+            self.slots[slot] = value
+        else:
+            self.ancestor(depth).slots[slot] = value
+
+    def define_at(self, slot: int, value: object) -> None:
+        self.slots[slot] = value
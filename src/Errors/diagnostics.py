@@ -0,0 +1,56 @@
+from Lexer.token import Token
+from Lexer.token_type import TokenType
+from .runtime_error import Runtime_error
+
+
+class Diagnostic:
+    """One reported error, formatted the way the command line prints it."""
+
+    __slots__ = ("kind", "line", "where", "message")
+
+    def __init__(self, kind: str, line: int, where: str, message: str) -> None:
+        # "lexer", "parse" or "runtime".
+        self.kind = kind
+        self.line = line
+        self.where = where
+        self.message = message
+
+    def __str__(self) -> str:
+        if self.kind == "runtime":
+            return f"[Line {self.line}]: Runtime Error: {self.message}"
+        return f"[Line: {self.line}] Error {self.where}: {self.message}"
+
+    def __repr__(self) -> str:
+        return f"<{self.kind} error: {self}>"
+
+
+class Diagnostics:
+    """The errors of one compile or run, each passed to `report` as it comes in."""
+
+    def __init__(self, report=None) -> None:
+        self.report = report
+        self.errors = []
+        self.had_error = False
+        self.had_runtime_error = False
+
+    def add(self, diagnostic: Diagnostic) -> None:
+        self.errors.append(diagnostic)
+        if self.report is not None:
+            self.report(diagnostic)
+
+    def lexer_error(self, line: int, message: str) -> None:
+        self.had_error = True
+        self.add(Diagnostic("lexer", line, "", message))
+
+    def parse_error(self, token: Token, message: str) -> None:
+        self.had_error = True
+        if token.token_type == TokenType.EOF:
+            where = " at end"
+        else:
+            where = f' at "{token.lexeme}"'
+        self.add(Diagnostic("parse", token.line, where, message))
+
+    def runtime_error(self, error: Runtime_error) -> None:
+        self.had_runtime_error = True
+        line = error.token.line if error.token is not None else "?"
+        self.add(Diagnostic("runtime", line, "", error.message))
@@ -1,6 +1,16 @@
 from Lexer.token import Token
 
+# Reported when a Pox call chain exhausts the Python stack. Only the tree,
+# closure and python engines nest Python frames per call, the vm does not.
+STACK_OVERFLOW = "Stack overflow, recursion too deep (try --engine vm)."
+
 class Runtime_error(RuntimeError):
     def __init__(self, token: Token = None, message: str = None) -> None:
         self.message = message
         self.token = token
+
+    def at(self, token: Token):
+        """Places an error raised without a token, by a native, at token."""
+        if self.token is None:
+            self.token = token
+        return self
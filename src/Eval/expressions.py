@@ -1,9 +1,14 @@
 from abc import ABC, abstractmethod
 from Lexer.token import Token
+from Lexer.token_type import TokenType
 
 
 class Expr(ABC):
     class Visitor(ABC):
+        @abstractmethod
+        def visit_array_expr(self, expr):
+            pass
+
         @abstractmethod
         def visit_assign_expr(self, expr):
             pass
@@ -24,6 +29,10 @@ class Expr(ABC):
         def visit_grouping_expr(self, expr):
             pass
 
+        @abstractmethod
+        def visit_index_expr(self, expr):
+            pass
+
         @abstractmethod
         def visit_literal_expr(self, expr):
             pass
@@ -32,10 +41,18 @@ class Expr(ABC):
         def visit_logical_expr(self, expr):
             pass
 
+        @abstractmethod
+        def visit_map_expr(self, expr):
+            pass
+
         # @abstractmethod
         # def visit_set_expr(self, expr):
         #    pass
 
+        @abstractmethod
+        def visit_set_index_expr(self, expr):
+            pass
+
         # @abstractmethod
         # def visit_super_expr(self, expr):
         #    pass
@@ -52,6 +69,20 @@ class Expr(ABC):
         def visit_variable_expr(self, expr):
             pass
 
+        # Quickened Binary nodes are still Binary nodes to every visitor
+        # that doesn't tell them apart.
+
+        def visit_number_binary_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        def visit_string_binary_expr(self, expr):
+            return self.visit_binary_expr(expr)
+
+        # Likewise an Append is an Assign to visitors that don't build Ropes.
+
+        def visit_append_expr(self, expr):
+            return self.visit_assign_expr(expr)
+
     # Nested _expr classes here...
 
     @abstractmethod
@@ -59,30 +90,80 @@ class Expr(ABC):
         pass
 
     class Assign:
+        __slots__ = ("name", "value", "depth", "slot")
+
         def __init__(self, name: Token, value):
             self.name = name
             self.value = value
+            self.depth = None
+            self.slot = None
 
         def accept(self, visitor):
             return visitor.visit_assign_expr(self)
 
+    class Append(Assign):
+        """`name = name + piece`, which may keep a growing string as a Rope."""
+
+        __slots__ = ()
+
+        @staticmethod
+        def matches(name: Token, value) -> bool:
+            return (
+                isinstance(value, Expr.Binary)
+                and value.operator.token_type == TokenType.PLUS
+                and isinstance(value.left, Expr.Variable)
+                and value.left.name.lexeme == name.lexeme
+            )
+
+        def accept(self, visitor):
+            return visitor.visit_append_expr(self)
+
     class Variable:
+        __slots__ = ("name", "depth", "slot", "cache")
+
         def __init__(self, name: Token):
             self.name = name
+            self.depth = None
+            self.slot = None
+            # (Environment version, value) of the last global lookup.
+            self.cache = (None, None)
 
         def accept(self, visitor):
             return visitor.visit_variable_expr(self)
 
     class Binary:
+        __slots__ = ("left", "operator", "right", "feedback", "operation")
+
         def __init__(self, left, operator: Token, right):
             self.left = left
             self.operator = operator
             self.right = right
+            # How many evaluations in a row saw the same operand types, and
+            # the operator as a plain function once the node is quickened.
+            self.feedback = 0
+            self.operation = None
 
         def accept(self, visitor):
             return visitor.visit_binary_expr(self)
 
+    # A Binary node is rewritten in place into one of these by swapping its
+    # __class__, and back when the operand types stop matching.
+
+    class NumberBinary(Binary):
+        __slots__ = ()
+
+        def accept(self, visitor):
+            return visitor.visit_number_binary_expr(self)
+
+    class StringBinary(Binary):
+        __slots__ = ()
+
+        def accept(self, visitor):
+            return visitor.visit_string_binary_expr(self)
+
     class Grouping:
+        __slots__ = ("expression",)
+
         def __init__(self, expression):
             self.expression = expression
 
@@ -90,6 +171,8 @@ class Expr(ABC):
             return visitor.visit_grouping_expr(self)
 
     class Literal:
+        __slots__ = ("value",)
+
         def __init__(self, value: object):
             self.value = value
 
@@ -100,6 +183,8 @@ class Expr(ABC):
             return f"Literal value: {self.value}"
 
     class Unary:
+        __slots__ = ("operator", "right")
+
         def __init__(self, operator: Token, right):
             self.operator = operator
             self.right = right
@@ -108,6 +193,8 @@ class Expr(ABC):
             return visitor.visit_unary_expr(self)
 
     class Logical:
+        __slots__ = ("left", "operator", "right")
+
         def __init__(self, left, operator, right) -> None:
             self.left = left
             self.operator = operator
@@ -117,10 +204,58 @@ class Expr(ABC):
             return visitor.visit_logical_expr(self)
 
     class Call:
+        __slots__ = ("callee", "paren", "arguments", "cache")
+
         def __init__(self, callee, paren, arguments: list) -> None:
             self.callee = callee
             self.paren = paren
             self.arguments = arguments
+            # The last callee that passed the callable and arity checks here.
+            self.cache = None
 
         def accept(self, visitor):
             return visitor.visit_call_expr(self)
+
+    class Array:
+        __slots__ = ("bracket", "elements")
+
+        def __init__(self, bracket: Token, elements: list) -> None:
+            self.bracket = bracket
+            self.elements = elements
+
+        def accept(self, visitor):
+            return visitor.visit_array_expr(self)
+
+    class Index:
+        __slots__ = ("array", "bracket", "index")
+
+        def __init__(self, array, bracket: Token, index) -> None:
+            self.array = array
+            self.bracket = bracket
+            self.index = index
+
+        def accept(self, visitor):
+            return visitor.visit_index_expr(self)
+
+    class SetIndex:
+        __slots__ = ("array", "bracket", "index", "value")
+
+        def __init__(self, array, bracket: Token, index, value) -> None:
+            self.array = array
+            self.bracket = bracket
+            self.index = index
+            self.value = value
+
+        def accept(self, visitor):
+            return visitor.visit_set_index_expr(self)
+
+    class Map:
+        __slots__ = ("brace", "keys", "values")
+
+        def __init__(self, brace: Token, keys: list, values: list) -> None:
+            self.brace = brace
+            self.keys = keys
+            self.values = values
+
+        def accept(self, visitor):
+            return visitor.visit_map_expr(self)
@@ -8,10 +8,18 @@ class Stmt(ABC):
         def visit_block_stmt(self, stmt):
             pass
 
+        @abstractmethod
+        def visit_break_stmt(self, stmt):
+            pass
+
         # @abstractmethod
         # def visit_class_stmt(self, stmt):
         #    pass
 
+        @abstractmethod
+        def visit_continue_stmt(self, stmt):
+            pass
+
         @abstractmethod
         def visit_expression_stmt(self, stmt):
             pass
@@ -45,64 +53,126 @@ class Stmt(ABC):
         pass
 
     class Block:
+        __slots__ = ("statements", "slot_count", "line")
+
         def __init__(self, statements: list):
             self.statements = statements
+            self.slot_count = 0
+            self.line = 0
 
         def accept(self, visitor):
             return visitor.visit_block_stmt(self)
 
     class Expression:
+        __slots__ = ("expression", "line")
+
         def __init__(self, expression):
             self.expression = expression
+            self.line = 0
 
         def accept(self, visitor):
             return visitor.visit_expression_stmt(self)
 
     class Print:
+        __slots__ = ("expression", "line")
+
         def __init__(self, expression):
             self.expression = expression
+            self.line = 0
 
         def accept(self, visitor):
             return visitor.visit_print_stmt(self)
 
     class Var:
+        __slots__ = ("name", "initializer", "slot", "line")
+
         def __init__(self, name, initializer):
             self.name = name
             self.initializer = initializer
+            self.slot = None
+            self.line = 0
 
         def accept(self, visitor):
             return visitor.visit_var_stmt(self)
 
     class If:
+        __slots__ = ("condition", "then_branch", "else_branch", "line")
+
         def __init__(self, condition, then_branch, else_branch):
             self.condition = condition
             self.then_branch = then_branch
             self.else_branch = else_branch
+            self.line = 0
 
         def accept(self, visitor):
             return visitor.visit_if_stmt(self)
 
     class While:
-        def __init__(self, condition, body):
+        __slots__ = ("condition", "body", "increment", "line")
+
+        def __init__(self, condition, body, increment=None):
             self.condition = condition
             self.body = body
+            # The increment of a desugared for loop, kept apart from the body
+            # so `continue` still runs it.
+            self.increment = increment
+            self.line = 0
 
         def accept(self, visitor):
             return visitor.visit_while_stmt(self)
 
     class Function:
+        __slots__ = (
+            "name",
+            "params",
+            "body",
+            "slot",
+            "slot_count",
+            "dependencies",
+            "line",
+        )
+
         def __init__(self, name, params, body):
             self.name = name
             self.params = params
             self.body = body
+            self.slot = None
+            self.slot_count = 0
+            # (reads, calls) global names for functions PurityAnalysis
+            # found pure, None otherwise.
+            self.dependencies = None
+            self.line = 0
 
         def accept(self, visitor):
             return visitor.visit_function_stmt(self)
 
+    class Break:
+        __slots__ = ("keyword", "line")
+
+        def __init__(self, keyword):
+            self.keyword = keyword
+            self.line = 0
+
+        def accept(self, visitor):
+            return visitor.visit_break_stmt(self)
+
+    class Continue:
+        __slots__ = ("keyword", "line")
+
+        def __init__(self, keyword):
+            self.keyword = keyword
+            self.line = 0
+
+        def accept(self, visitor):
+            return visitor.visit_continue_stmt(self)
+
     class Return:
+        __slots__ = ("keyword", "value", "line")
+
         def __init__(self, keyword, value):
             self.keyword = keyword
             self.value = value
+            self.line = 0
 
         def accept(self, visitor):
             return visitor.visit_return_stmt(self)
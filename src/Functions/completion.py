@@ -0,0 +1,19 @@
+from enum import Enum
+
+
+class Completion(Enum):
+    """How a statement finished when it did not fall through, None otherwise."""
+
+    BREAK = "break"
+    CONTINUE = "continue"
+    # The returned value is handed over separately, for a tail call it is
+    # (function, arguments) so the caller's Python frame makes the call.
+    RETURN = "return"
+    TAIL_CALL = "tail call"
+
+
+# Module level aliases, looked up far more often than the enum itself.
+BREAK = Completion.BREAK
+CONTINUE = Completion.CONTINUE
+RETURN = Completion.RETURN
+TAIL_CALL = Completion.TAIL_CALL
@@ -0,0 +1,20 @@
+from .pox_callable import PoxCallable
+
+
+class NativeFunction(PoxCallable):
+    """A builtin implemented in Python and called with the argument values."""
+
+    def __init__(self, name: str, argc: int, function) -> None:
+        self.name = name
+        self.argc = argc
+        self.function = function
+
+    # Errors are raised without a token, the call site knows where the call was.
+    def call(self, interpreter, arguments: list) -> object:
+        return self.function(*arguments)
+
+    def arity(self) -> int:
+        return self.argc
+
+    def __repr__(self) -> str:
+        return "<native fn>"
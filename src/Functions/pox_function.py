@@ -1,7 +1,7 @@
 from .pox_callable import PoxCallable
 from Eval.statements import Stmt
 from Env.environment import Environment
-from .pox_return import PoxReturn
+from .completion import RETURN, TAIL_CALL
 
 class PoxFunction(PoxCallable):
     def __init__(self, declaration: Stmt.Function, closure: Environment) -> None:
@@ -9,17 +9,19 @@ class PoxFunction(PoxCallable):
         self.closure = closure
 
     def call(self, interpreter, arguments: list) -> object:
-        env = Environment(self.closure)
+        function = self
+        while True:
+            declaration = function.declaration
+            env = Environment(function.closure, declaration.slot_count)
+            env.slots[: len(arguments)] = arguments
 
-        for i in range(len(self.declaration.params)):
-            env.define(self.declaration.params[i].lexeme, arguments[i])
-        
-        try:
-            interpreter.execute_block(self.declaration.body, env)
-        except PoxReturn as return_value:
-            return return_value.value
+            completion = interpreter.execute_block(declaration.body, env)
+            if completion is RETURN:
+                return interpreter.return_value
+            if completion is not TAIL_CALL:
+                return None
 
-        return None
+            function, arguments = interpreter.return_value
 
     def arity(self) -> int:
         return len(self.declaration.params)
@@ -2,39 +2,77 @@ from Eval.expressions import Expr
 from Eval.statements import Stmt
 from Lexer.token_type import TokenType
 from Lexer.token import Token
-from Errors.runtime_error import Runtime_error
+from Errors.runtime_error import Runtime_error, STACK_OVERFLOW
+from Errors.diagnostics import Diagnostics
 from Env.environment import Environment
 from Functions.pox_callable import PoxCallable
 from Functions.pox_function import PoxFunction
-from Functions.pox_return import PoxReturn
-import time
+from Functions.native_function import NativeFunction
+from Functions.completion import BREAK, CONTINUE, RETURN, TAIL_CALL
+from Memo.memo import MemoTable, MemoizedFunction, DEFAULT_SIZE
+from Collections.pox_array import PoxArray, get_item, set_item
+from Collections.pox_map import PoxMap
+from Collections.rope import Rope, concat
+from Natives import stdlib
+from Output.output_sink import OutputSink
+import operator
+
+# A Binary node that saw two numbers or two strings this many times in a row
+# is quickened into a NumberBinary or StringBinary node.
+QUICKEN_AFTER = 8
+# Feedback a node restarts from when it is deoptimized, so one whose operand
+# types keep changing settles on the generic path for a long while.
+DEOPTIMIZED = -1024
+
+# Operators whose meaning for two numbers or two strings is exactly that of
+# the Python operator. Division keeps its zero check on the generic path.
+NUMBER_OPERATIONS = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.MINUS: operator.sub,
+    TokenType.PLUS: operator.add,
+    TokenType.STAR: operator.mul,
+    TokenType.BANG_EQUAL: operator.ne,
+    TokenType.EQUAL_EQUAL: operator.eq,
+}
+STRING_OPERATIONS = {
+    TokenType.PLUS: operator.add,
+    TokenType.BANG_EQUAL: operator.ne,
+    TokenType.EQUAL_EQUAL: operator.eq,
+}
 
 
 class Interpreter(Expr.Visitor, Stmt.Visitor):
-    def __init__(self) -> None:
+    def __init__(self, out: OutputSink = None, diagnostics: Diagnostics = None) -> None:
+        self.out = out if out is not None else OutputSink()
+        # Where every engine running on this interpreter reports errors.
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
         self.global_env = Environment()
         self.env = self.global_env
-        self.global_env.define(
-            "clock",
-            type(
-                "Clock",
-                (PoxCallable,),
-                {
-                    "arity": lambda self: 0,
-                    "call": lambda self, interpreter, arguments: time.time(),
-                    "__repr__": lambda self: "<native fn>",
-                },
-            ),
-        )
+        # Set by a `return` right before it completes with RETURN and read
+        # by the function call that receives it.
+        self.return_value = None
+        # Inline cache counters, see visit_variable_expr and visit_call_expr.
+        self.variable_hits = 0
+        self.variable_misses = 0
+        self.call_hits = 0
+        self.call_misses = 0
+        # Tables of the memoized functions created so far, see memo_table.
+        self.memo_tables = []
+        self.memo_size = DEFAULT_SIZE
+        stdlib.install(self)
 
     def interpret(self, statements: list[Stmt]):
         try:
             for statement in statements:
                 self.execute(statement)
         except Runtime_error as error:
-            import pox as Pox
-
-            Pox.pox.runtime_error(error)
+            self.diagnostics.runtime_error(error)
+        except RecursionError:
+            token = Token(TokenType.EOF, "", None, statement.line)
+            self.diagnostics.runtime_error(Runtime_error(token, STACK_OVERFLOW))
 
     def visit_literal_expr(self, expr: Expr.Literal) -> object:
         return expr.value
@@ -65,8 +103,21 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         # unreachable
         return None
 
+    def resolve(self, expr: Expr, depth: int, slot: int) -> None:
+        expr.depth = depth
+        expr.slot = slot
+
     def visit_variable_expr(self, expr: Expr.Variable):
-        value = self.env.get(expr.name)
+        if expr.depth is None:
+            version, value = expr.cache
+            if version == self.global_env.version:
+                self.variable_hits += 1
+            else:
+                self.variable_misses += 1
+                value = self.global_env.get(expr.name)
+                expr.cache = (self.global_env.version, value)
+        else:
+            value = self.env.get_at(expr.depth, expr.slot)
         if value == None:
             raise Runtime_error(
                 expr.name, f'Can\'t access uninitialized variable "{expr.name.lexeme}".'
@@ -83,6 +134,18 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             return
         raise Runtime_error(operator, "Operand must be a number.")
 
+    def cache_report(self) -> str:
+        def rate(hits: int, misses: int) -> str:
+            total = hits + misses
+            return f"{hits / total:.1%}" if total else "-"
+
+        return (
+            f"Inline caches: globals {self.variable_hits} hits / "
+            f"{self.variable_misses} misses ({rate(self.variable_hits, self.variable_misses)}), "
+            f"calls {self.call_hits} hits / {self.call_misses} misses "
+            f"({rate(self.call_hits, self.call_misses)})"
+        )
+
     def is_truthy(self, obj: object) -> bool:
         if obj == None:
             return False
@@ -100,24 +163,48 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
 
         return a == b
 
-    def stringify(self, obj: object) -> str:
-        if obj == None:
-            return "Nil"
+    def stringify(self, obj: object, printing: set | None = None) -> str:
+        # Numbers and strings are by far the most printed values, so they
+        # are checked by exact type before anything else.
+        kind = type(obj)
+        if kind is float:
+            text = repr(obj)
+            return text[:-2] if text.endswith(".0") else text
 
-        if isinstance(obj, float):
-            text = str(obj)
-            if text.endswith(".0"):
-                text = text[: len(text) - 2]
+        if kind is str:
+            return obj
 
-            return text
+        if obj is None:
+            return "Nil"
+
+        if kind is PoxArray or kind is PoxMap:
+            return self.stringify_container(obj, set() if printing is None else printing)
 
         return str(obj)
 
+    def stringify_container(self, obj: PoxArray | PoxMap, printing: set) -> str:
+        """An array or map, printing holds the ids of the ones being printed around it."""
+        array = type(obj) is PoxArray
+        if id(obj) in printing:
+            # It contains itself.
+            return "[...]" if array else "{...}"
+
+        printing.add(id(obj))
+        try:
+            stringify = self.stringify
+            if array:
+                return "[" + ", ".join([stringify(item, printing) for item in obj.items]) + "]"
+            entries = obj.entries.items()
+            pairs = [f"{stringify(key)}: {stringify(value, printing)}" for key, value in entries]
+            return "{" + ", ".join(pairs) + "}"
+        finally:
+            printing.discard(id(obj))
+
     def evaluate(self, expr: Expr) -> object:
         return expr.accept(self)
 
     def execute(self, stmt: Stmt):
-        stmt.accept(self)
+        return stmt.accept(self)
 
     def execute_block(self, statements: list[Stmt], env: Environment):
         previous = self.env
@@ -125,67 +212,226 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             self.env = env
 
             for statement in statements:
-                self.execute(statement)
+                completion = statement.accept(self)
+                if completion is not None:
+                    return completion
 
         finally:
             self.env = previous
 
-    def visit_block_stmt(self, stmt: Stmt.Block):
-        self.execute_block(stmt.statements, Environment(self.env))
         return None
 
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        return self.execute_block(
+            stmt.statements, Environment(self.env, stmt.slot_count)
+        )
+
+    def visit_break_stmt(self, stmt: Stmt.Break):
+        return BREAK
+
+    def visit_continue_stmt(self, stmt: Stmt.Continue):
+        return CONTINUE
+
     def visit_expression_stmt(self, stmt: Stmt.Expression):
         self.evaluate(stmt.expression)
         return None
 
     def visit_function_stmt(self, stmt: Stmt.Function):
-        function = PoxFunction(stmt, self.env)
-        self.env.define(stmt.name.lexeme, function)
+        if stmt.dependencies is None:
+            function = PoxFunction(stmt, self.env)
+        else:
+            function = MemoizedFunction(stmt, self.env, self.memo_table(stmt))
+        if stmt.slot is None:
+            self.env.define(stmt.name.lexeme, function)
+        else:
+            self.env.define_at(stmt.slot, function)
         return None
 
+    def memo_table(self, stmt: Stmt.Function) -> MemoTable:
+        memo = MemoTable(stmt.name.lexeme, stmt.dependencies, self.memo_size)
+        self.memo_tables.append(memo)
+        return memo
+
+    def memo_report(self) -> str:
+        if not self.memo_tables:
+            return "Memoization: no pure functions"
+        return "\n".join(
+            ["Memoization:", *(f"  {memo.report()}" for memo in self.memo_tables)]
+        )
+
     def visit_if_stmt(self, stmt: Stmt.If):
         if self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.then_branch)
+            return self.execute(stmt.then_branch)
 
         elif stmt.else_branch != None:
-            self.execute(stmt.else_branch)
+            return self.execute(stmt.else_branch)
 
         return None
 
     def visit_print_stmt(self, stmt: Stmt.Print):
         value = self.evaluate(stmt.expression)
-        print(self.stringify(value))
+        self.out.write_line(self.stringify(value))
         return None
 
     def visit_return_stmt(self, stmt: Stmt.Return):
+        if type(stmt.value) is Expr.Call:
+            return self.tail_call(stmt.value)
+
         value = None
         if stmt.value != None:
             value = self.evaluate(stmt.value)
 
-        raise PoxReturn(value)
+        self.return_value = value
+        return RETURN
+
+    def tail_call(self, expr: Expr.Call):
+        # Plain Pox functions are called by the PoxFunction.call loop that
+        # receives TAIL_CALL, anything else is called right here.
+        callee = self.evaluate(expr.callee)
+        args = [self.evaluate(arg) for arg in expr.arguments]
+        if callee is expr.cache:
+            self.call_hits += 1
+        else:
+            self.check_call(expr, callee, args)
+
+        if type(callee) is PoxFunction:
+            self.return_value = (callee, args)
+            return TAIL_CALL
+
+        try:
+            self.return_value = callee.call(self, args)
+        except Runtime_error as error:
+            raise error.at(expr.paren)
+        return RETURN
 
     def visit_var_stmt(self, stmt: Stmt.Var):
         value = None
         if stmt.initializer != None:
             value = self.evaluate(stmt.initializer)
 
-        self.env.define(stmt.name.lexeme, value)
+        if stmt.slot is None:
+            self.env.define(stmt.name.lexeme, value)
+        else:
+            self.env.define_at(stmt.slot, value)
         return None
 
     def visit_while_stmt(self, stmt: Stmt.While):
         while self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            completion = self.execute(stmt.body)
+            if completion is BREAK:
+                break
+            if completion is RETURN or completion is TAIL_CALL:
+                return completion
+
+            if stmt.increment is not None:
+                self.evaluate(stmt.increment)
         return None
 
+    def visit_array_expr(self, expr: Expr.Array) -> object:
+        return PoxArray.of([self.evaluate(element) for element in expr.elements])
+
+    def visit_map_expr(self, expr: Expr.Map) -> object:
+        evaluate = self.evaluate
+        entries = zip(expr.keys, expr.values)
+        pairs = [(evaluate(key), evaluate(value)) for key, value in entries]
+        try:
+            return PoxMap.of(pairs)
+        except Runtime_error as error:
+            raise error.at(expr.brace)
+
+    def visit_index_expr(self, expr: Expr.Index) -> object:
+        array = self.evaluate(expr.array)
+        index = self.evaluate(expr.index)
+        try:
+            return get_item(array, index)
+        except Runtime_error as error:
+            raise error.at(expr.bracket)
+
+    def visit_set_index_expr(self, expr: Expr.SetIndex) -> object:
+        array = self.evaluate(expr.array)
+        index = self.evaluate(expr.index)
+        value = self.evaluate(expr.value)
+        try:
+            return set_item(array, index, value)
+        except Runtime_error as error:
+            raise error.at(expr.bracket)
+
     def visit_assign_expr(self, expr: Expr.Assign) -> object:
         value = self.evaluate(expr.value)
-        self.env.assign(expr.name, value)
+        if expr.depth is None:
+            self.global_env.assign(expr.name, value)
+        else:
+            self.env.assign_at(expr.depth, expr.slot, value)
+        return value
+
+    def visit_append_expr(self, expr: Expr.Append) -> object:
+        binary = expr.value
+        left = self.evaluate(binary.left)
+        right = self.evaluate(binary.right)
+
+        kind = type(left)
+        if kind is float and type(right) is float:
+            value = left + right
+        elif kind is str or kind is Rope:
+            value = concat(left, self.stringify(right))
+        else:
+            value = self.binary_operation(binary, left, right)
+
+        if expr.depth is None:
+            self.global_env.assign(expr.name, value)
+        else:
+            self.env.assign_at(expr.depth, expr.slot, value)
         return value
 
     def visit_binary_expr(self, expr: Expr.Binary) -> object:
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
 
+        kind = type(left)
+        if kind is type(right) and (kind is float or kind is str):
+            feedback = expr.feedback + 1
+            if feedback >= QUICKEN_AFTER:
+                self.quicken(expr, kind)
+            else:
+                expr.feedback = feedback
+        elif expr.feedback > 0:
+            expr.feedback = 0
+
+        return self.binary_operation(expr, left, right)
+
+    def visit_number_binary_expr(self, expr: Expr.NumberBinary) -> object:
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        if type(left) is float and type(right) is float:
+            return expr.operation(left, right)
+        return self.deoptimize(expr, left, right)
+
+    def visit_string_binary_expr(self, expr: Expr.StringBinary) -> object:
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+        if type(left) is str and type(right) is str:
+            return expr.operation(left, right)
+        return self.deoptimize(expr, left, right)
+
+    def quicken(self, expr: Expr.Binary, kind: type) -> None:
+        operations = NUMBER_OPERATIONS if kind is float else STRING_OPERATIONS
+        operation = operations.get(expr.operator.token_type)
+        if operation is None:
+            expr.feedback = DEOPTIMIZED
+            return
+
+        expr.operation = operation
+        expr.feedback = 0
+        expr.__class__ = Expr.NumberBinary if kind is float else Expr.StringBinary
+
+    def deoptimize(self, expr: Expr.Binary, left: object, right: object) -> object:
+        # operation is left set, another thread may still be running the
+        # quickened visitor on this node.
+        expr.__class__ = Expr.Binary
+        expr.feedback = DEOPTIMIZED
+        return self.binary_operation(expr, left, right)
+
+    def binary_operation(self, expr: Expr.Binary, left: object, right: object) -> object:
         match expr.operator.token_type:
             case TokenType.GREATER:
                 self.check_number_operands(expr.operator, left, right)
@@ -205,7 +451,7 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             case TokenType.PLUS:
                 if isinstance(left, float) and isinstance(right, float):
                     return float(left) + float(right)
-                if isinstance(left, str) or isinstance(right, str):
+                if isinstance(left, (str, Rope)) or isinstance(right, (str, Rope)):
                     return str(self.stringify(left)) + str(self.stringify(right))
                 raise Runtime_error(
                     expr.operator, "Operands must be two numbers or two strings."
@@ -230,20 +476,49 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
 
     def visit_call_expr(self, expr: Expr.Call) -> object:
         callee = self.evaluate(expr.callee)
+        if callee is expr.cache and type(callee) is NativeFunction:
+            return self.call_native(expr, callee)
 
         args = []
         for arg in expr.arguments:
             args.append(self.evaluate(arg))
 
+        if callee is not expr.cache:
+            self.check_call(expr, callee, args)
+        else:
+            # Same callee as last time, so it already passed both checks.
+            self.call_hits += 1
+
+        try:
+            return callee.call(self, args)
+        except Runtime_error as error:
+            raise error.at(expr.paren)
+
+    def call_native(self, expr: Expr.Call, native: NativeFunction) -> object:
+        """Calls a cached native with its arguments passed as they are evaluated."""
+        self.call_hits += 1
+        function = native.function
+        arguments = expr.arguments
+        evaluate = self.evaluate
+        try:
+            if native.argc == 1:
+                return function(evaluate(arguments[0]))
+            if native.argc == 2:
+                return function(evaluate(arguments[0]), evaluate(arguments[1]))
+            return function(*[evaluate(argument) for argument in arguments])
+        except Runtime_error as error:
+            raise error.at(expr.paren)
+
+    def check_call(self, expr: Expr.Call, callee: object, args: list) -> None:
+        """Validates a callee the inline cache of expr missed on and caches it."""
+        self.call_misses += 1
         if not isinstance(callee, PoxCallable):
             raise Runtime_error(expr.paren, "Can only call function and classes.")
 
-        function = callee
-
-        if len(args) != function.arity():
+        if len(args) != callee.arity():
             raise Runtime_error(
                 expr.paren,
-                f"Expected {function.arity()} arguments but got {len(args)}.",
+                f"Expected {callee.arity()} arguments but got {len(args)}.",
             )
 
-        return function.call(self, args)
+        expr.cache = callee
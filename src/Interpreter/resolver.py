@@ -1,53 +1,87 @@
 from Eval.expressions import Expr
 from Eval.statements import Stmt
+from Errors.diagnostics import Diagnostics
 
 
 class Resolver(Expr.Visitor, Stmt.Visitor):
-    def __init__(self, interpteter) -> None:
+    """Gives every local a (depth, slot) pair and every scope its slot count."""
+
+    def __init__(self, interpteter, diagnostics: Diagnostics = None) -> None:
         self.interpteter = interpteter
+        # Errors go to the interpreter's diagnostics unless told otherwise.
+        self.diagnostics = diagnostics if diagnostics is not None else interpteter.diagnostics
+        # Each scope maps a name to [defined, slot].
         self.scopes = []
+        self.function_depth = 0
+        self.loop_depth = 0
 
     def resolve(self, statements: list[Stmt]):
         for stmt in statements:
             self.resolve_stmt(stmt)
 
     def resolve_function(self, func: Stmt.Function):
+        enclosing_loop_depth = self.loop_depth
+        self.function_depth += 1
+        self.loop_depth = 0
         self.begin_scope()
 
         for param in func.params:
+            if param.lexeme in self.scopes[-1]:
+                self.error(param, "Already a parameter with this name.")
             self.declare(param)
             self.define(param)
 
         self.resolve(func.body)
-        self.end_scope()
+        func.slot_count = self.end_scope()
+        self.function_depth -= 1
+        self.loop_depth = enclosing_loop_depth
 
     def begin_scope(self):
         self.scopes.append({})
 
-    def end_scope(self):
-        self.scopes.pop(-1)
+    def end_scope(self) -> int:
+        return len(self.scopes.pop(-1))
 
-    def declare(self, name):
+    def declare(self, name) -> int:
         if len(self.scopes) == 0:
-            return
+            return None
+
+        scope = self.scopes[-1]
+        if name.lexeme in scope:
+            # Redeclaring in the same scope reuses the existing slot.
+            return scope[name.lexeme][1]
 
-        scope = self.scopes[0]
-        scope[name.lexeme] = False
+        scope[name.lexeme] = [False, len(scope)]
+        return len(scope) - 1
 
     def define(self, name):
-        if len(self.scopes) == 0:
-            self.scopes[0][name.lexeme] = True
+        if len(self.scopes) != 0:
+            self.scopes[-1][name.lexeme][0] = True
 
-    def resolve_local(expr: Expr, name):
+    def resolve_local(self, expr: Expr, name):
         for i in range(len(self.scopes) - 1, -1, -1):
             if name.lexeme in self.scopes[i]:
-                self.interpteter.resolve(expr, len(self.scopes) - 1 - i)
+                slot = self.scopes[i][name.lexeme][1]
+                self.interpteter.resolve(expr, len(self.scopes) - 1 - i, slot)
                 return
 
-    def visit_block_stmt(self, stmt: Stmt.block):
+    def error(self, token, message: str):
+        self.diagnostics.parse_error(token, message)
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
         self.begin_scope()
         self.resolve(stmt.statements)
-        self.end_scope()
+        stmt.slot_count = self.end_scope()
+        return None
+
+    def visit_break_stmt(self, stmt: Stmt.Break):
+        if self.loop_depth == 0:
+            self.error(stmt.keyword, 'Can\'t use "break" outside of a loop.')
+        return None
+
+    def visit_continue_stmt(self, stmt: Stmt.Continue):
+        if self.loop_depth == 0:
+            self.error(stmt.keyword, 'Can\'t use "continue" outside of a loop.')
         return None
 
     def visit_expression_stmt(self, stmt: Stmt.Expression):
@@ -55,7 +89,7 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         return None
 
     def visit_function_stmt(self, stmt: Stmt.Function):
-        self.declare(stmt.name)
+        stmt.slot = self.declare(stmt.name)
         self.define(stmt.name)
         self.resolve_function(stmt)
         return None
@@ -68,21 +102,36 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         return None
 
     def visit_print_stmt(self, stmt: Stmt.Print):
+        self.resolve_expr(stmt.expression)
+        return None
+
+    def visit_return_stmt(self, stmt: Stmt.Return):
+        if self.function_depth == 0:
+            self.error(stmt.keyword, "Can't return from top-level code.")
         if stmt.value != None:
             self.resolve_expr(stmt.value)
         return None
 
     def visit_var_stmt(self, stmt: Stmt.Var):
-        self.declare(stmt.name)
+        stmt.slot = self.declare(stmt.name)
         if stmt.initializer != None:
-            self.resolve_stmt(stmt.initializer)
+            self.resolve_expr(stmt.initializer)
 
         self.define(stmt.name)
         return None
-    
+
     def visit_while_stmt(self, stmt: Stmt.While):
         self.resolve_expr(stmt.condition)
-        self.resolve(stmt.body)
+        self.loop_depth += 1
+        self.resolve_stmt(stmt.body)
+        self.loop_depth -= 1
+        if stmt.increment is not None:
+            self.resolve_expr(stmt.increment)
+        return None
+
+    def visit_array_expr(self, expr: Expr.Array):
+        for element in expr.elements:
+            self.resolve_expr(element)
         return None
 
     def visit_assign_expr(self, expr: Expr.Assign):
@@ -95,7 +144,7 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         self.resolve_expr(expr.right)
         return None
 
-    def vitis_call_expr(self, expr: Expr.Call):
+    def visit_call_expr(self, expr: Expr.Call):
         self.resolve_expr(expr.callee)
 
         for arg in expr.arguments:
@@ -103,13 +152,30 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
 
         return None
 
-    def visit_group_expr(self, expr: Expr.Grouping):
+    def visit_grouping_expr(self, expr: Expr.Grouping):
         self.resolve_expr(expr.expression)
         return None
 
+    def visit_index_expr(self, expr: Expr.Index):
+        self.resolve_expr(expr.array)
+        self.resolve_expr(expr.index)
+        return None
+
+    def visit_set_index_expr(self, expr: Expr.SetIndex):
+        self.resolve_expr(expr.array)
+        self.resolve_expr(expr.index)
+        self.resolve_expr(expr.value)
+        return None
+
     def visit_literal_expr(self, expr: Expr.Literal):
         return None
 
+    def visit_map_expr(self, expr: Expr.Map):
+        for key, value in zip(expr.keys, expr.values):
+            self.resolve_expr(key)
+            self.resolve_expr(value)
+        return None
+
     def visit_logical_expr(self, expr: Expr.Logical):
         self.resolve_expr(expr.left)
         self.resolve_expr(expr.right)
@@ -120,12 +186,10 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         return None
 
     def visit_variable_expr(self, expr: Expr.Variable):
-        if len(self.scopes) == 0 and self.scopes[0][expr.name.lexeme] == False:
-            import pox as Pox
-
-            Pox.pox.parse_error(
-                expr.name, "Can't read local Variable in its own initializer."
-            )
+        if len(self.scopes) != 0:
+            local = self.scopes[-1].get(expr.name.lexeme)
+            if local is not None and local[0] == False:
+                self.error(expr.name, "Can't read local Variable in its own initializer.")
 
         self.resolve_local(expr, expr.name)
         return None
@@ -0,0 +1,139 @@
+import re
+import sys
+from Errors.diagnostics import Diagnostics
+from .token import Token
+from .token_type import TokenType
+from .lexer import Lexer
+from .packed_tokens import PackedTokens
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>[ \t\r]+)
+    |(?P<newline>\n+)
+    |(?P<comment>\#[^\n]*)
+    |(?P<block>/\*)
+    |(?P<string>'[^']*'?)
+    |(?P<number>[0-9]+(?:\.[0-9]+)?)
+    |(?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+    |(?P<operator>!=|==|<=|>=|[(){}\[\]:,.\-+;*/!=<>])
+    |(?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+OPERATORS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    "[": TokenType.LEFT_BRACKET,
+    "]": TokenType.RIGHT_BRACKET,
+    ":": TokenType.COLON,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "/": TokenType.SLASH,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+}
+
+
+class FastLexer(Lexer):
+    """Lexer matching a whole token at a time with one compiled pattern."""
+
+    def __init__(
+        self, source: str, packed: bool = False, diagnostics: Diagnostics = None
+    ) -> None:
+        super().__init__(source, diagnostics)
+        if packed:
+            self.tokens = PackedTokens(source)
+
+    def scan_tokens(self) -> list:
+        source = self.source
+        length = len(source)
+        tokens = self.tokens
+        if isinstance(tokens, PackedTokens):
+            add = tokens.add
+        else:
+            append = tokens.append
+
+            def add(token_type, start, size, line, text=None, literal=None):
+                append(Token(token_type, text, literal, line))
+
+        keywords = self.keywords
+        match = TOKEN_PATTERN.match
+        intern = sys.intern
+        line = 1
+        pos = 0
+
+        while pos < length:
+            found = match(source, pos)
+            kind = found.lastgroup
+            text = found.group()
+            start = pos
+            pos = found.end()
+
+            if kind == "space":
+                continue
+            if kind == "identifier":
+                text = intern(text)
+                add(keywords.get(text, TokenType.IDENTIFIER), start, pos - start, line, text)
+            elif kind == "operator":
+                add(OPERATORS[text], start, pos - start, line, text)
+            elif kind == "newline":
+                line += len(text)
+            elif kind == "number":
+                add(TokenType.NUMBER, start, pos - start, line, text, float(text))
+            elif kind == "string":
+                line += text.count("\n")
+                if len(text) < 2 or text[-1] != "'":
+                    self.report(line, "Unterminated string.")
+                    continue
+                add(TokenType.STRING, start, pos - start, line, text, text[1:-1])
+            elif kind == "comment":
+                continue
+            elif kind == "block":
+                pos, line = self.block_comment(pos, line)
+            else:
+                self.report(line, f'Unexpected character found: "{text}"')
+
+        self.line = line
+        add(TokenType.EOF, length, 0, line, "")
+        return tokens
+
+    def block_comment(self, pos: int, line: int) -> tuple[int, int]:
+        # Mirrors the loop in Lexer.scan_token exactly, including where it
+        # stops early, so both lexers agree on odd inputs.
+        source = self.source
+        length = len(source)
+
+        while True:
+            if pos < length and source[pos] == "*":
+                pos += 1
+                break
+            if pos + 1 < length and source[pos + 1] == "/":
+                break
+            if pos >= length:
+                break
+            if source[pos] == "\n":
+                line += 1
+            pos += 1
+
+        if pos >= length:
+            self.report(line, "Unterminated block comment found.")
+        else:
+            pos += 1
+
+        return pos, line
+
+    def report(self, line: int, message: str) -> None:
+        self.diagnostics.lexer_error(line, message)
@@ -1,17 +1,21 @@
+from Errors.diagnostics import Diagnostics
 from .token import Token
 from .token_type import TokenType
 
 
 class Lexer:
-    def __init__(self, source: str) -> None:
+    def __init__(self, source: str, diagnostics: Diagnostics = None) -> None:
         self.source = source
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
         self.tokens = []
         self.start = 0
         self.current = 0
         self.line = 1
         self.keywords = {
             "and": TokenType.AND,
+            "break": TokenType.BREAK,
             "class": TokenType.CLASS,
+            "continue": TokenType.CONTINUE,
             "else": TokenType.ELSE,
             "False": TokenType.FALSE,
             "for": TokenType.FOR,
@@ -47,6 +51,12 @@ class Lexer:
                 self.add_token(TokenType.LEFT_BRACE)
             case "}":
                 self.add_token(TokenType.RIGHT_BRACE)
+            case "[":
+                self.add_token(TokenType.LEFT_BRACKET)
+            case "]":
+                self.add_token(TokenType.RIGHT_BRACKET)
+            case ":":
+                self.add_token(TokenType.COLON)
             case ",":
                 self.add_token(TokenType.COMMA)
             case ".":
@@ -72,8 +82,7 @@ class Lexer:
                         self.advance()
 
                     if self.is_at_eof():
-                        import pox as Pox
-                        Pox.pox.lexer_error(self.line, f"Unterminated block comment found.")
+                        self.diagnostics.lexer_error(self.line, f"Unterminated block comment found.")
 
                     else:
                         self.advance()
@@ -113,8 +122,7 @@ class Lexer:
                 elif self.is_alpha(c):
                     self.identifier()
                 else:
-                    import pox as Pox
-                    Pox.pox.lexer_error(self.line, f'Unexpected character found: "{c}"')
+                    self.diagnostics.lexer_error(self.line, f'Unexpected character found: "{c}"')
 
     def identifier(self) -> None:
         while self.is_alpha_numeric(self.peek()):
@@ -144,8 +152,7 @@ class Lexer:
             self.advance()
 
         if self.is_at_eof():
-            import pox as Pox
-            Pox.pox.lexer_error(self.line, f"Unterminated string.")
+            self.diagnostics.lexer_error(self.line, f"Unterminated string.")
             return
 
         # Closing '
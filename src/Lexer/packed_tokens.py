@@ -0,0 +1,73 @@
+import sys
+from array import array
+from .token import Token
+from .token_type import TokenType
+
+TOKEN_TYPES = tuple(TokenType)
+TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+
+class PackedTokens:
+    """Token stream in parallel arrays, Token objects are only built when indexed."""
+
+    __slots__ = ("source", "types", "starts", "lengths", "lines", "recent")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.types = array("B")
+        self.starts = array("I")
+        self.lengths = array("I")
+        self.lines = array("I")
+        self.recent = [(-1, None), (-1, None)]
+
+    def add(
+        self,
+        token_type: TokenType,
+        start: int,
+        length: int,
+        line: int,
+        text: str = None,
+        literal: object = None,
+    ) -> None:
+        # text and literal are accepted for signature parity with the list
+        # form and dropped, they are rebuilt from the source on access.
+        self.types.append(TYPE_CODES[token_type])
+        self.starts.append(start)
+        self.lengths.append(length)
+        self.lines.append(line)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> Token:
+        if index < 0:
+            index += len(self.types)
+        # The two most recent Tokens are kept so peek() and previous() get the same one.
+        newest, older = self.recent
+        if newest[0] == index:
+            return newest[1]
+        if older[0] == index:
+            return older[1]
+
+        token = self.token(index)
+        self.recent = [(index, token), newest]
+        return token
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield self.token(index)
+
+    def token(self, index: int) -> Token:
+        token_type = TOKEN_TYPES[self.types[index]]
+        start = self.starts[index]
+        lexeme = self.source[start : start + self.lengths[index]]
+        literal = None
+
+        if token_type == TokenType.NUMBER:
+            literal = float(lexeme)
+        elif token_type == TokenType.STRING:
+            literal = lexeme[1:-1]
+        else:
+            lexeme = sys.intern(lexeme)
+
+        return Token(token_type, lexeme, literal, self.lines[index])
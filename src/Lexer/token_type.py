@@ -7,6 +7,9 @@ class TokenType(Enum):
     RIGHT_PAREN = auto()
     LEFT_BRACE = auto()
     RIGHT_BRACE = auto()
+    LEFT_BRACKET = auto()
+    RIGHT_BRACKET = auto()
+    COLON = auto()
     COMMA = auto()
     DOT = auto()
     MINUS = auto()
@@ -32,7 +35,9 @@ class TokenType(Enum):
 
     # Keywords
     AND = auto()
+    BREAK = auto()
     CLASS = auto()
+    CONTINUE = auto()
     ELSE = auto()
     FALSE = auto()
     FN = auto()
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from Env.environment import Environment
+from Functions.pox_function import PoxFunction
+
+DEFAULT_SIZE = 1024
+
+
+class MemoTable:
+    """Bounded LRU table of results for one pure function."""
+
+    def __init__(self, name: str, dependencies: tuple, size: int = DEFAULT_SIZE) -> None:
+        self.name = name
+        self.reads, self.calls = dependencies
+        self.names = self.reads + self.calls
+        self.size = size
+        self.entries = OrderedDict()
+        self.enabled = True
+        self.version = None
+        self.snapshot = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def call(self, call, function, interpreter, arguments: list) -> object:
+        """Returns call(function, interpreter, arguments), from the table if possible."""
+        if not self.enabled or not self.valid(interpreter.global_env):
+            return call(function, interpreter, arguments)
+
+        # Keyed on the types too, so 1 and True never share an entry.
+        key = (*arguments, *map(type, arguments))
+        entries = self.entries
+        if key in entries:
+            self.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+
+        self.misses += 1
+        value = call(function, interpreter, arguments)
+        entries[key] = value
+        if len(entries) > self.size:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def valid(self, global_env: Environment) -> bool:
+        # Trusted while the globals read and called are the objects it was
+        # filled with, a called one that isn't memoized turns it off for good.
+        if global_env.version == self.version:
+            return True
+
+        values = global_env.values
+        snapshot = tuple(values.get(name) for name in self.names)
+        if self.snapshot is not None and any(
+            now is not before for now, before in zip(snapshot, self.snapshot)
+        ):
+            self.entries.clear()
+            self.invalidations += 1
+
+        # Checked on the first snapshot too, a callee may have been replaced
+        # before the function ran at all. One not defined yet can't be called.
+        for name in self.calls:
+            callee = values.get(name)
+            if callee is not None and not isinstance(callee, Memoized):
+                self.entries.clear()
+                self.enabled = False
+                return False
+
+        self.snapshot = snapshot
+        self.version = global_env.version
+        return True
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = f"{self.hits / total:.1%}" if total else "-"
+        state = "" if self.enabled else ", disabled"
+        return (
+            f"{self.name}: {self.hits} hits / {self.misses} misses ({rate}), "
+            f"{len(self.entries)} entries, {self.evictions} evictions, "
+            f"{self.invalidations} invalidations{state}"
+        )
+
+
+class Memoized:
+    """Marks callables whose results come from a MemoTable."""
+
+    memo: MemoTable
+
+
+class MemoizedFunction(PoxFunction, Memoized):
+    def __init__(self, declaration, closure: Environment, memo: MemoTable) -> None:
+        super().__init__(declaration, closure)
+        self.memo = memo
+
+    def call(self, interpreter, arguments: list) -> object:
+        return self.memo.call(PoxFunction.call, self, interpreter, arguments)
@@ -0,0 +1,151 @@
+from Eval.expressions import Expr
+from Eval.statements import Stmt
+
+
+class FunctionSummary(Expr.Visitor, Stmt.Visitor):
+    """Whether a function body has side effects, and which globals it uses."""
+
+    def __init__(self, function: Stmt.Function) -> None:
+        self.pure = True
+        # Blocks entered so far, a local found deeper is captured from outside.
+        self.depth = 0
+        self.reads = set()
+        self.calls = set()
+        self.summarize(function.body)
+
+    def summarize(self, statements: list[Stmt]) -> None:
+        for stmt in statements:
+            self.summarize_stmt(stmt)
+
+    def summarize_stmt(self, stmt: Stmt) -> None:
+        if stmt is not None:
+            stmt.accept(self)
+
+    def summarize_expr(self, expr: Expr) -> None:
+        if expr is not None:
+            expr.accept(self)
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        self.depth += 1
+        self.summarize(stmt.statements)
+        self.depth -= 1
+
+    def visit_break_stmt(self, stmt: Stmt.Break):
+        pass
+
+    def visit_continue_stmt(self, stmt: Stmt.Continue):
+        pass
+
+    def visit_expression_stmt(self, stmt: Stmt.Expression):
+        self.summarize_expr(stmt.expression)
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        # A nested function is a new closure on every call.
+        self.pure = False
+
+    def visit_if_stmt(self, stmt: Stmt.If):
+        self.summarize_expr(stmt.condition)
+        self.summarize_stmt(stmt.then_branch)
+        self.summarize_stmt(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: Stmt.Print):
+        self.pure = False
+
+    def visit_return_stmt(self, stmt: Stmt.Return):
+        self.summarize_expr(stmt.value)
+
+    def visit_var_stmt(self, stmt: Stmt.Var):
+        self.summarize_expr(stmt.initializer)
+
+    def visit_while_stmt(self, stmt: Stmt.While):
+        self.summarize_expr(stmt.condition)
+        self.summarize_stmt(stmt.body)
+        self.summarize_expr(stmt.increment)
+
+    def visit_array_expr(self, expr: Expr.Array):
+        # Arrays are mutable and shared, a cached one would be handed out
+        # to every caller.
+        self.pure = False
+
+    def visit_assign_expr(self, expr: Expr.Assign):
+        if expr.depth is None or expr.depth > self.depth:
+            self.pure = False
+        self.summarize_expr(expr.value)
+
+    def visit_binary_expr(self, expr: Expr.Binary):
+        self.summarize_expr(expr.left)
+        self.summarize_expr(expr.right)
+
+    def visit_call_expr(self, expr: Expr.Call):
+        callee = expr.callee
+        if isinstance(callee, Expr.Variable) and callee.depth is None:
+            self.calls.add(callee.name.lexeme)
+        else:
+            self.pure = False
+        for argument in expr.arguments:
+            self.summarize_expr(argument)
+
+    def visit_grouping_expr(self, expr: Expr.Grouping):
+        self.summarize_expr(expr.expression)
+
+    def visit_index_expr(self, expr: Expr.Index):
+        # What an array holds can change between two calls.
+        self.pure = False
+
+    def visit_literal_expr(self, expr: Expr.Literal):
+        pass
+
+    def visit_logical_expr(self, expr: Expr.Logical):
+        self.summarize_expr(expr.left)
+        self.summarize_expr(expr.right)
+
+    def visit_map_expr(self, expr: Expr.Map):
+        # Mutable and shared, like arrays.
+        self.pure = False
+
+    def visit_set_index_expr(self, expr: Expr.SetIndex):
+        self.pure = False
+
+    def visit_unary_expr(self, expr: Expr.Unary):
+        self.summarize_expr(expr.right)
+
+    def visit_variable_expr(self, expr: Expr.Variable):
+        if expr.depth is None:
+            self.reads.add(expr.name.lexeme)
+        elif expr.depth > self.depth:
+            self.pure = False
+
+
+class PurityAnalysis:
+    """Finds the top level functions whose result only depends on their inputs."""
+
+    def analyze(self, statements: list[Stmt]) -> list[Stmt.Function]:
+        declared = {}
+        for stmt in statements:
+            if isinstance(stmt, Stmt.Function):
+                declared.setdefault(stmt.name.lexeme, []).append(stmt)
+
+        summaries = {}
+        for functions in declared.values():
+            for function in functions:
+                summaries[function] = FunctionSummary(function)
+
+        # Mutually recursive functions are pure until one of them turns out not to be.
+        pure = {function for function, summary in summaries.items() if summary.pure}
+        changed = True
+        while changed:
+            changed = False
+            for function in list(pure):
+                for name in summaries[function].calls:
+                    if name not in declared or not pure.issuperset(declared[name]):
+                        pure.discard(function)
+                        changed = True
+                        break
+
+        for function in pure:
+            summary = summaries[function]
+            function.dependencies = (
+                tuple(sorted(summary.reads - summary.calls)),
+                tuple(sorted(summary.calls)),
+            )
+        return sorted(pure, key=lambda function: function.line)
@@ -0,0 +1,117 @@
+from array import array
+from Collections.pox_array import PoxArray, storage, whole_number
+from Collections.pox_map import PoxMap
+from Collections.rope import Rope
+from Errors.runtime_error import Runtime_error
+from Functions.native_function import NativeFunction
+from Functions.pox_callable import PoxCallable
+from .registry import Registry
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Below this many elements sorted() beats setting up a NumPy view.
+NUMPY_SORT_THRESHOLD = 4096
+
+# Natives working on whole arrays, each runs as a single C level loop where
+# possible instead of one Pox statement per element.
+natives = Registry()
+
+
+def expect_array(value: object, name: str) -> PoxArray:
+    if type(value) is not PoxArray:
+        raise Runtime_error(None, f'"{name}" expects an array.')
+    return value
+
+
+def numbers(target: PoxArray, name: str) -> array:
+    """The items of target as array('d'), converting back from a list if possible."""
+    items = target.items
+    if type(items) is not array:
+        items = storage(items)
+        if type(items) is not array:
+            raise Runtime_error(None, f'"{name}" expects an array of numbers.')
+        target.items = items
+    return items
+
+
+@natives.native("array")
+def new_array(size, value):
+    count = whole_number(size, "Array size")
+    if count < 0:
+        raise Runtime_error(None, "Array size can't be negative.")
+    if type(value) is float:
+        return PoxArray(array("d", [value]) * count)
+    return PoxArray([value] * count)
+
+
+@natives.native("len")
+def length(value):
+    kind = type(value)
+    if kind is PoxArray or kind is str or kind is Rope or kind is PoxMap:
+        return float(len(value))
+    raise Runtime_error(None, '"len" expects an array, a map or a string.')
+
+
+@natives.native()
+def push(target, value):
+    items = expect_array(target, "push").items
+    if type(items) is array and type(value) is not float:
+        items = target.items = list(items)
+    items.append(value)
+    return float(len(items))
+
+
+@natives.native("sum")
+def total(target):
+    return float(sum(numbers(expect_array(target, "sum"), "sum")))
+
+
+@natives.native("map", interpreter=True)
+def map_array(interpreter, target, function):
+    items = expect_array(target, "map").items
+    if not isinstance(function, PoxCallable) or function.arity() != 1:
+        raise Runtime_error(None, '"map" expects a function of one argument.')
+    if type(function) is NativeFunction:
+        return PoxArray.of([function.function(item) for item in items])
+    call = function.call
+    return PoxArray.of([call(interpreter, [item]) for item in items])
+
+
+@natives.native()
+def fill(target, value):
+    count = len(expect_array(target, "fill"))
+    if type(value) is float:
+        target.items = array("d", [value]) * count
+    else:
+        target.items = [value] * count
+    return target
+
+
+@natives.native("slice")
+def slice_array(target, start, end):
+    items = expect_array(target, "slice").items
+    first = whole_number(start, "Slice start")
+    last = whole_number(end, "Slice end")
+    size = len(items)
+    return PoxArray(items[max(0, min(first, size)) : max(0, min(last, size))])
+
+
+@natives.native()
+def sort(target):
+    items = expect_array(target, "sort").items
+    if type(items) is not array and all(
+        type(item) is str or type(item) is Rope for item in items
+    ):
+        items.sort(key=str)
+        return target
+
+    items = numbers(target, "sort")
+    if numpy is not None and len(items) >= NUMPY_SORT_THRESHOLD:
+        # Sorts the array('d') buffer in place, no copy is made.
+        numpy.frombuffer(items, dtype=numpy.float64).sort()
+    else:
+        target.items = array("d", sorted(items))
+    return target
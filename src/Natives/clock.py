@@ -0,0 +1,16 @@
+import time
+from .registry import Registry
+
+natives = Registry()
+
+
+@natives.native()
+def clock():
+    """Seconds since the epoch."""
+    return time.time()
+
+
+@natives.native()
+def elapsed():
+    """Seconds on a monotonic clock, for timing parts of a script."""
+    return time.perf_counter()
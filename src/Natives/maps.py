@@ -0,0 +1,39 @@
+from Collections.pox_array import PoxArray
+from Collections.pox_map import PoxMap, map_key
+from Errors.runtime_error import Runtime_error
+from .registry import Registry
+
+natives = Registry()
+
+
+def expect_map(value: object, name: str) -> PoxMap:
+    if type(value) is not PoxMap:
+        raise Runtime_error(None, f'"{name}" expects a map.')
+    return value
+
+
+@natives.native()
+def keys(target):
+    """The keys of target in insertion order, as an array."""
+    return PoxArray.of(list(expect_map(target, "keys").entries))
+
+
+@natives.native()
+def values(target):
+    return PoxArray.of(list(expect_map(target, "values").entries.values()))
+
+
+@natives.native()
+def has(target, key):
+    return map_key(key) in expect_map(target, "has").entries
+
+
+@natives.native()
+def remove(target, key):
+    """Removes key from target, returns whether it was there."""
+    entries = expect_map(target, "remove").entries
+    key = map_key(key)
+    if key in entries:
+        del entries[key]
+        return True
+    return False
@@ -0,0 +1,75 @@
+import math
+from Errors.runtime_error import Runtime_error
+from .registry import Registry, expect_number
+
+natives = Registry()
+
+
+def checked(name: str, function, *values: float) -> float:
+    """function(*values), with Python's domain and range errors as Pox errors."""
+    try:
+        return float(function(*values))
+    except (ValueError, OverflowError, ZeroDivisionError):
+        raise Runtime_error(None, f'"{name}" is undefined for {values}.') from None
+
+
+@natives.native("abs")
+def absolute(x):
+    return abs(expect_number(x, "abs"))
+
+
+@natives.native()
+def floor(x):
+    return checked("floor", math.floor, expect_number(x, "floor"))
+
+
+@natives.native()
+def ceil(x):
+    return checked("ceil", math.ceil, expect_number(x, "ceil"))
+
+
+@natives.native("round")
+def round_half_up(x):
+    # Halves round away from zero, not to the even neighbour like round().
+    x = expect_number(x, "round")
+    return math.copysign(checked("round", math.floor, abs(x) + 0.5), x)
+
+
+@natives.native()
+def sqrt(x):
+    return checked("sqrt", math.sqrt, expect_number(x, "sqrt"))
+
+
+@natives.native("pow")
+def power(x, y):
+    return checked("pow", math.pow, expect_number(x, "pow"), expect_number(y, "pow"))
+
+
+@natives.native()
+def exp(x):
+    return checked("exp", math.exp, expect_number(x, "exp"))
+
+
+@natives.native()
+def log(x):
+    return checked("log", math.log, expect_number(x, "log"))
+
+
+@natives.native()
+def sin(x):
+    return math.sin(expect_number(x, "sin"))
+
+
+@natives.native()
+def cos(x):
+    return math.cos(expect_number(x, "cos"))
+
+
+@natives.native("min")
+def minimum(x, y):
+    return min(expect_number(x, "min"), expect_number(y, "min"))
+
+
+@natives.native("max")
+def maximum(x, y):
+    return max(expect_number(x, "max"), expect_number(y, "max"))
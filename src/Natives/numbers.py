@@ -0,0 +1,35 @@
+import math
+from Collections.pox_array import whole_number
+from Errors.runtime_error import Runtime_error
+from .registry import Registry, expect_number, expect_string
+
+natives = Registry()
+
+
+@natives.native()
+def number(text):
+    """Parses text as a number, like a number literal with an optional sign."""
+    text = expect_string(text, "number")
+    try:
+        value = float(text)
+    except ValueError:
+        value = math.nan
+    # float() also accepts "inf", "nan" and "1_000", Pox literals don't.
+    if not math.isfinite(value) or "_" in text:
+        raise Runtime_error(None, f'Can\'t parse "{text}" as a number.')
+    return value
+
+
+@natives.native(interpreter=True)
+def string(interpreter, value):
+    return interpreter.stringify(value)
+
+
+@natives.native()
+def fixed(x, digits):
+    """x with exactly `digits` digits after the decimal point."""
+    x = expect_number(x, "fixed")
+    places = whole_number(digits, "Digits")
+    if not 0 <= places <= 100:
+        raise Runtime_error(None, "Digits must be between 0 and 100.")
+    return f"{x:.{places}f}"
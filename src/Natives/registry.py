@@ -0,0 +1,47 @@
+from functools import partial
+from Collections.rope import Rope
+from Errors.runtime_error import Runtime_error
+from Functions.native_function import NativeFunction
+
+
+class Registry:
+    """The natives of one standard library module, installed as globals."""
+
+    def __init__(self) -> None:
+        self.entries = []
+
+    def native(self, name: str = None, interpreter: bool = False):
+        """Registers the decorated function as the native `name`, by default its own."""
+
+        def register(function):
+            # With interpreter=True the running Interpreter is passed first, it
+            # doesn't count towards the arity.
+            argc = function.__code__.co_argcount - (1 if interpreter else 0)
+            self.entries.append((name or function.__name__, argc, function, interpreter))
+            return function
+
+        return register
+
+    def install(self, interpreter) -> None:
+        for name, argc, function, bound in self.entries:
+            if bound:
+                function = partial(function, interpreter)
+            interpreter.global_env.define(name, NativeFunction(name, argc, function))
+
+
+# Argument checks shared by the natives. They raise without a token, the
+# call site fills in where the call was.
+
+
+def expect_number(value: object, name: str) -> float:
+    if type(value) is not float:
+        raise Runtime_error(None, f'"{name}" expects a number.')
+    return value
+
+
+def expect_string(value: object, name: str) -> str:
+    if type(value) is str:
+        return value
+    if type(value) is Rope:
+        return str(value)
+    raise Runtime_error(None, f'"{name}" expects a string.')
@@ -0,0 +1,16 @@
+from . import arrays, clock, maps, maths, numbers, strings
+
+REGISTRIES = (
+    arrays.natives,
+    maps.natives,
+    maths.natives,
+    strings.natives,
+    numbers.natives,
+    clock.natives,
+)
+
+
+def install(interpreter) -> None:
+    """Defines every native of the standard library as a global."""
+    for registry in REGISTRIES:
+        registry.install(interpreter)
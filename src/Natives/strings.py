@@ -0,0 +1,49 @@
+from Collections.pox_array import PoxArray, whole_number
+from .arrays import expect_array
+from .registry import Registry, expect_string
+
+natives = Registry()
+
+
+@natives.native()
+def substring(text, start, end):
+    text = expect_string(text, "substring")
+    size = len(text)
+    first = max(0, min(whole_number(start, "Substring start"), size))
+    last = max(0, min(whole_number(end, "Substring end"), size))
+    return text[first:last]
+
+
+@natives.native()
+def find(text, needle):
+    """Index of the first needle in text, -1 if there is none."""
+    return float(expect_string(text, "find").find(expect_string(needle, "find")))
+
+
+@natives.native()
+def upper(text):
+    return expect_string(text, "upper").upper()
+
+
+@natives.native()
+def lower(text):
+    return expect_string(text, "lower").lower()
+
+
+@natives.native()
+def trim(text):
+    return expect_string(text, "trim").strip()
+
+
+@natives.native()
+def split(text, separator):
+    separator = expect_string(separator, "split")
+    text = expect_string(text, "split")
+    # An empty separator splits into single characters.
+    return PoxArray(text.split(separator) if separator else list(text))
+
+
+@natives.native(interpreter=True)
+def join(interpreter, items, separator):
+    separator = expect_string(separator, "join")
+    return separator.join(map(interpreter.stringify, expect_array(items, "join").items))
@@ -0,0 +1,491 @@
+from Eval.expressions import Expr
+from Eval.statements import Stmt
+from Lexer.token_type import TokenType
+
+
+class NodeCounter(Expr.Visitor, Stmt.Visitor):
+    def count(self, statements: list[Stmt]) -> int:
+        return sum(self.count_stmt(stmt) for stmt in statements)
+
+    def count_stmt(self, stmt: Stmt) -> int:
+        return 0 if stmt is None else stmt.accept(self)
+
+    def count_expr(self, expr: Expr) -> int:
+        return 0 if expr is None else expr.accept(self)
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        return 1 + self.count(stmt.statements)
+
+    def visit_break_stmt(self, stmt: Stmt.Break):
+        return 1
+
+    def visit_continue_stmt(self, stmt: Stmt.Continue):
+        return 1
+
+    def visit_expression_stmt(self, stmt: Stmt.Expression):
+        return 1 + self.count_expr(stmt.expression)
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        return 1 + self.count(stmt.body)
+
+    def visit_if_stmt(self, stmt: Stmt.If):
+        return (
+            1
+            + self.count_expr(stmt.condition)
+            + self.count_stmt(stmt.then_branch)
+            + self.count_stmt(stmt.else_branch)
+        )
+
+    def visit_print_stmt(self, stmt: Stmt.Print):
+        return 1 + self.count_expr(stmt.expression)
+
+    def visit_return_stmt(self, stmt: Stmt.Return):
+        return 1 + self.count_expr(stmt.value)
+
+    def visit_var_stmt(self, stmt: Stmt.Var):
+        return 1 + self.count_expr(stmt.initializer)
+
+    def visit_while_stmt(self, stmt: Stmt.While):
+        return (
+            1
+            + self.count_expr(stmt.condition)
+            + self.count_stmt(stmt.body)
+            + self.count_expr(stmt.increment)
+        )
+
+    def visit_array_expr(self, expr: Expr.Array):
+        return 1 + sum(self.count_expr(element) for element in expr.elements)
+
+    def visit_assign_expr(self, expr: Expr.Assign):
+        return 1 + self.count_expr(expr.value)
+
+    def visit_binary_expr(self, expr: Expr.Binary):
+        return 1 + self.count_expr(expr.left) + self.count_expr(expr.right)
+
+    def visit_call_expr(self, expr: Expr.Call):
+        return (
+            1
+            + self.count_expr(expr.callee)
+            + sum(self.count_expr(argument) for argument in expr.arguments)
+        )
+
+    def visit_grouping_expr(self, expr: Expr.Grouping):
+        return 1 + self.count_expr(expr.expression)
+
+    def visit_index_expr(self, expr: Expr.Index):
+        return 1 + self.count_expr(expr.array) + self.count_expr(expr.index)
+
+    def visit_map_expr(self, expr: Expr.Map):
+        return 1 + sum(self.count_expr(key) for key in expr.keys) + sum(
+            self.count_expr(value) for value in expr.values
+        )
+
+    def visit_set_index_expr(self, expr: Expr.SetIndex):
+        return (
+            1
+            + self.count_expr(expr.array)
+            + self.count_expr(expr.index)
+            + self.count_expr(expr.value)
+        )
+
+    def visit_literal_expr(self, expr: Expr.Literal):
+        return 1
+
+    def visit_logical_expr(self, expr: Expr.Logical):
+        return 1 + self.count_expr(expr.left) + self.count_expr(expr.right)
+
+    def visit_unary_expr(self, expr: Expr.Unary):
+        return 1 + self.count_expr(expr.right)
+
+    def visit_variable_expr(self, expr: Expr.Variable):
+        return 1
+
+
+class BindingCollector(Expr.Visitor, Stmt.Visitor):
+    """Counts the declarations of every name and records the assigned ones."""
+
+    def __init__(self) -> None:
+        self.declared = {}
+        self.assigned = set()
+
+    def collect(self, statements: list[Stmt]) -> None:
+        for stmt in statements:
+            self.collect_stmt(stmt)
+
+    def collect_stmt(self, stmt: Stmt) -> None:
+        if stmt is not None:
+            stmt.accept(self)
+
+    def collect_expr(self, expr: Expr) -> None:
+        if expr is not None:
+            expr.accept(self)
+
+    def declare(self, name: str) -> None:
+        self.declared[name] = self.declared.get(name, 0) + 1
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        self.collect(stmt.statements)
+
+    def visit_break_stmt(self, stmt: Stmt.Break):
+        pass
+
+    def visit_continue_stmt(self, stmt: Stmt.Continue):
+        pass
+
+    def visit_expression_stmt(self, stmt: Stmt.Expression):
+        self.collect_expr(stmt.expression)
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        self.declare(stmt.name.lexeme)
+        for param in stmt.params:
+            self.declare(param.lexeme)
+        self.collect(stmt.body)
+
+    def visit_if_stmt(self, stmt: Stmt.If):
+        self.collect_expr(stmt.condition)
+        self.collect_stmt(stmt.then_branch)
+        self.collect_stmt(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: Stmt.Print):
+        self.collect_expr(stmt.expression)
+
+    def visit_return_stmt(self, stmt: Stmt.Return):
+        self.collect_expr(stmt.value)
+
+    def visit_var_stmt(self, stmt: Stmt.Var):
+        self.declare(stmt.name.lexeme)
+        self.collect_expr(stmt.initializer)
+
+    def visit_while_stmt(self, stmt: Stmt.While):
+        self.collect_expr(stmt.condition)
+        self.collect_stmt(stmt.body)
+        self.collect_expr(stmt.increment)
+
+    def visit_array_expr(self, expr: Expr.Array):
+        for element in expr.elements:
+            self.collect_expr(element)
+
+    def visit_assign_expr(self, expr: Expr.Assign):
+        self.assigned.add(expr.name.lexeme)
+        self.collect_expr(expr.value)
+
+    def visit_binary_expr(self, expr: Expr.Binary):
+        self.collect_expr(expr.left)
+        self.collect_expr(expr.right)
+
+    def visit_call_expr(self, expr: Expr.Call):
+        self.collect_expr(expr.callee)
+        for argument in expr.arguments:
+            self.collect_expr(argument)
+
+    def visit_grouping_expr(self, expr: Expr.Grouping):
+        self.collect_expr(expr.expression)
+
+    def visit_index_expr(self, expr: Expr.Index):
+        self.collect_expr(expr.array)
+        self.collect_expr(expr.index)
+
+    def visit_map_expr(self, expr: Expr.Map):
+        for key, value in zip(expr.keys, expr.values):
+            self.collect_expr(key)
+            self.collect_expr(value)
+
+    def visit_set_index_expr(self, expr: Expr.SetIndex):
+        self.collect_expr(expr.array)
+        self.collect_expr(expr.index)
+        self.collect_expr(expr.value)
+
+    def visit_literal_expr(self, expr: Expr.Literal):
+        pass
+
+    def visit_logical_expr(self, expr: Expr.Logical):
+        self.collect_expr(expr.left)
+        self.collect_expr(expr.right)
+
+    def visit_unary_expr(self, expr: Expr.Unary):
+        self.collect_expr(expr.right)
+
+    def visit_variable_expr(self, expr: Expr.Variable):
+        pass
+
+
+class Optimizer(Expr.Visitor, Stmt.Visitor):
+    """Folds constants, propagates constant `let`s and drops dead code."""
+
+    def __init__(self, interpreter, repl: bool = False) -> None:
+        self.interpreter = interpreter
+        self.repl = repl
+        self.scopes = []
+        self.constants = set()
+        self.folded = 0
+        self.propagated = 0
+        self.removed = 0
+        self.nodes_before = 0
+        self.nodes_after = 0
+
+    @property
+    def eliminated(self) -> int:
+        return self.nodes_before - self.nodes_after
+
+    def optimize(self, statements: list[Stmt]) -> list[Stmt]:
+        counter = NodeCounter()
+        self.nodes_before = counter.count(statements)
+
+        bindings = BindingCollector()
+        bindings.collect(statements)
+        self.constants = {
+            name
+            for name, count in bindings.declared.items()
+            if count == 1 and name not in bindings.assigned
+        }
+
+        self.scopes = [{}]
+        statements = self.optimize_statements(statements)
+        self.nodes_after = counter.count(statements)
+        return statements
+
+    def report(self) -> str:
+        return (
+            f"Optimizer: {self.nodes_before} -> {self.nodes_after} nodes "
+            f"({self.eliminated} eliminated, {self.folded} folded, "
+            f"{self.propagated} constants propagated, {self.removed} statements removed)"
+        )
+
+    # Helpers
+
+    def optimize_stmt(self, stmt: Stmt):
+        optimized = stmt.accept(self)
+        if optimized is not None and optimized.line == 0:
+            # Rebuilt nodes keep the source line of the one they replace.
+            optimized.line = stmt.line
+        return optimized
+
+    def optimize_expr(self, expr: Expr) -> Expr:
+        return expr.accept(self)
+
+    def optimize_statements(self, statements: list[Stmt]) -> list[Stmt]:
+        result = []
+        for statement in statements:
+            optimized = self.optimize_stmt(statement)
+            if optimized is None:
+                self.removed += 1
+            elif isinstance(optimized, Stmt.Block) and not self.declares(optimized):
+                # Nothing to scope, so the block's statements can run in ours.
+                result.extend(optimized.statements)
+            else:
+                result.append(optimized)
+        return result
+
+    def optimize_branch(self, stmt: Stmt) -> Stmt:
+        self.scopes.append({})
+        optimized = self.optimize_stmt(stmt)
+        self.scopes.pop()
+
+        if isinstance(optimized, Stmt.Block) and not self.declares(optimized):
+            if len(optimized.statements) == 1:
+                return optimized.statements[0]
+        return optimized
+
+    def declares(self, block: Stmt.Block) -> bool:
+        return any(
+            isinstance(statement, (Stmt.Var, Stmt.Function))
+            for statement in block.statements
+        )
+
+    def is_truthy(self, literal: Expr.Literal) -> bool:
+        return self.interpreter.is_truthy(literal.value)
+
+    def fold(self, expr: Expr) -> Expr:
+        # Anything that would raise at runtime, like dividing by zero, stays.
+        try:
+            value = self.interpreter.evaluate(expr)
+        except Exception:
+            return expr
+
+        self.folded += 1
+        return Expr.Literal(value)
+
+    def lookup_constant(self, name: str):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    # Statements
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        self.scopes.append({})
+        statements = self.optimize_statements(stmt.statements)
+        self.scopes.pop()
+
+        if not statements:
+            return None
+        return Stmt.Block(statements)
+
+    def visit_break_stmt(self, stmt: Stmt.Break):
+        return stmt
+
+    def visit_continue_stmt(self, stmt: Stmt.Continue):
+        return stmt
+
+    def visit_expression_stmt(self, stmt: Stmt.Expression):
+        expression = self.optimize_expr(stmt.expression)
+        if isinstance(expression, Expr.Literal):
+            return None
+        return Stmt.Expression(expression)
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        self.scopes.append({})
+        body = self.optimize_statements(stmt.body)
+        self.scopes.pop()
+        return Stmt.Function(stmt.name, stmt.params, body)
+
+    def visit_if_stmt(self, stmt: Stmt.If):
+        condition = self.optimize_expr(stmt.condition)
+        then_branch = self.optimize_branch(stmt.then_branch)
+        else_branch = None
+        if stmt.else_branch is not None:
+            else_branch = self.optimize_branch(stmt.else_branch)
+
+        if isinstance(condition, Expr.Literal):
+            return then_branch if self.is_truthy(condition) else else_branch
+
+        if then_branch is None and else_branch is None:
+            return Stmt.Expression(condition)
+        if then_branch is None:
+            then_branch = Stmt.Block([])
+        return Stmt.If(condition, then_branch, else_branch)
+
+    def visit_print_stmt(self, stmt: Stmt.Print):
+        return Stmt.Print(self.optimize_expr(stmt.expression))
+
+    def visit_return_stmt(self, stmt: Stmt.Return):
+        value = None
+        if stmt.value is not None:
+            value = self.optimize_expr(stmt.value)
+        return Stmt.Return(stmt.keyword, value)
+
+    def visit_var_stmt(self, stmt: Stmt.Var):
+        initializer = None
+        if stmt.initializer is not None:
+            initializer = self.optimize_expr(stmt.initializer)
+
+        name = stmt.name.lexeme
+        global_scope = len(self.scopes) == 1
+        if (
+            name in self.constants
+            and isinstance(initializer, Expr.Literal)
+            and initializer.value is not None
+            and not (global_scope and self.repl)
+        ):
+            self.scopes[-1][name] = initializer.value
+
+        return Stmt.Var(stmt.name, initializer)
+
+    def visit_while_stmt(self, stmt: Stmt.While):
+        condition = self.optimize_expr(stmt.condition)
+        if isinstance(condition, Expr.Literal) and not self.is_truthy(condition):
+            return None
+
+        body = self.optimize_branch(stmt.body)
+        if body is None:
+            body = Stmt.Block([])
+        increment = None
+        if stmt.increment is not None:
+            increment = self.optimize_expr(stmt.increment)
+        return Stmt.While(condition, body, increment)
+
+    # Expressions
+
+    def visit_array_expr(self, expr: Expr.Array):
+        elements = [self.optimize_expr(element) for element in expr.elements]
+        return Expr.Array(expr.bracket, elements)
+
+    def visit_assign_expr(self, expr: Expr.Assign):
+        value = self.optimize_expr(expr.value)
+        if Expr.Append.matches(expr.name, value):
+            return Expr.Append(expr.name, value)
+        return Expr.Assign(expr.name, value)
+
+    def visit_binary_expr(self, expr: Expr.Binary):
+        left = self.optimize_expr(expr.left)
+        right = self.optimize_expr(expr.right)
+        binary = Expr.Binary(left, expr.operator, right)
+
+        if isinstance(left, Expr.Literal) and isinstance(right, Expr.Literal):
+            return self.fold(binary)
+
+        # ((x + 'a') + 'b') => (x + 'ab'): the inner sum already has a string
+        # operand, so it is a string and concatenation is associative.
+        if (
+            expr.operator.token_type == TokenType.PLUS
+            and isinstance(right, Expr.Literal)
+            and isinstance(right.value, str)
+            and isinstance(left, Expr.Binary)
+            and left.operator.token_type == TokenType.PLUS
+            and isinstance(left.right, Expr.Literal)
+            and isinstance(left.right.value, str)
+        ):
+            self.folded += 1
+            merged = Expr.Literal(left.right.value + right.value)
+            return Expr.Binary(left.left, left.operator, merged)
+
+        return binary
+
+    def visit_call_expr(self, expr: Expr.Call):
+        callee = self.optimize_expr(expr.callee)
+        arguments = [self.optimize_expr(argument) for argument in expr.arguments]
+        return Expr.Call(callee, expr.paren, arguments)
+
+    def visit_grouping_expr(self, expr: Expr.Grouping):
+        return self.optimize_expr(expr.expression)
+
+    def visit_index_expr(self, expr: Expr.Index):
+        array = self.optimize_expr(expr.array)
+        return Expr.Index(array, expr.bracket, self.optimize_expr(expr.index))
+
+    def visit_map_expr(self, expr: Expr.Map):
+        keys = []
+        values = []
+        for key, value in zip(expr.keys, expr.values):
+            keys.append(self.optimize_expr(key))
+            values.append(self.optimize_expr(value))
+        return Expr.Map(expr.brace, keys, values)
+
+    def visit_set_index_expr(self, expr: Expr.SetIndex):
+        array = self.optimize_expr(expr.array)
+        index = self.optimize_expr(expr.index)
+        value = self.optimize_expr(expr.value)
+        return Expr.SetIndex(array, expr.bracket, index, value)
+
+    def visit_literal_expr(self, expr: Expr.Literal):
+        return expr
+
+    def visit_logical_expr(self, expr: Expr.Logical):
+        left = self.optimize_expr(expr.left)
+        right = self.optimize_expr(expr.right)
+
+        if isinstance(left, Expr.Literal):
+            self.folded += 1
+            truthy = self.is_truthy(left)
+            if expr.operator.token_type == TokenType.OR:
+                return left if truthy else right
+            return right if truthy else left
+
+        return Expr.Logical(left, expr.operator, right)
+
+    def visit_unary_expr(self, expr: Expr.Unary):
+        right = self.optimize_expr(expr.right)
+        unary = Expr.Unary(expr.operator, right)
+
+        if isinstance(right, Expr.Literal):
+            return self.fold(unary)
+        return unary
+
+    def visit_variable_expr(self, expr: Expr.Variable):
+        value = self.lookup_constant(expr.name.lexeme)
+        if value is None:
+            return expr
+
+        self.propagated += 1
+        return Expr.Literal(value)
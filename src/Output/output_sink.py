@@ -0,0 +1,62 @@
+import sys
+import time
+
+
+class OutputSink:
+    """Buffers printed lines and writes them to the stream in large batches."""
+
+    def __init__(self, stream=None, buffer_size: int = 1 << 16, flush_interval: float = 0.5):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.parts = []
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self.line_buffered = self.is_interactive()
+        self.lines = 0
+        self.started = None
+
+    def is_interactive(self) -> bool:
+        stream = self.target()
+        try:
+            return stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    # No stream means whatever sys.stdout is at flush time.
+    def target(self):
+        return self.stream if self.stream is not None else sys.stdout
+
+    def redirect(self, stream) -> None:
+        self.flush()
+        self.stream = stream
+        self.line_buffered = self.is_interactive()
+
+    def write_line(self, text: str) -> None:
+        if self.started is None:
+            self.started = time.perf_counter()
+        self.lines += 1
+        self.parts.append(text)
+        self.parts.append("\n")
+        self.pending += len(text) + 1
+
+        if (
+            self.line_buffered
+            or self.pending >= self.buffer_size
+            or time.monotonic() - self.last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if self.parts:
+            stream = self.target()
+            stream.write("".join(self.parts))
+            stream.flush()
+            self.parts.clear()
+            self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.started if self.started is not None else 0.0
+        rate = self.lines / elapsed if elapsed > 0 else 0.0
+        return f"{self.lines} lines in {elapsed:.3f}s ({rate:,.0f} lines/sec)"
@@ -3,6 +3,7 @@ from Lexer.token import Token
 from Eval.expressions import Expr
 from Eval.statements import Stmt
 from Errors.runtime_error import Runtime_error
+from Errors.diagnostics import Diagnostics
 
 
 class Parse_error(Runtime_error):
@@ -10,9 +11,10 @@ class Parse_error(Runtime_error):
 
 
 class Parser:
-    def __init__(self, tokens: list[Token]) -> None:
+    def __init__(self, tokens: list[Token], diagnostics: Diagnostics = None) -> None:
         self.tokens = tokens
         self.current = 0
+        self.diagnostics = diagnostics if diagnostics is not None else Diagnostics()
 
     def parse(self) -> list[Stmt]:
         statements = []
@@ -38,6 +40,13 @@ class Parser:
             return None
 
     def statement(self) -> Stmt:
+        # Every statement remembers the line it starts on.
+        line = self.peek().line
+        stmt = self.unlocated_statement()
+        stmt.line = line
+        return stmt
+
+    def unlocated_statement(self) -> Stmt:
         if self.match(TokenType.FOR):
             return self.for_statement()
 
@@ -50,6 +59,16 @@ class Parser:
         if self.match(TokenType.RETURN):
             return self.return_statement()
 
+        if self.match(TokenType.BREAK):
+            keyword = self.previous()
+            self.consume(TokenType.SEMICOLON, 'Expected ";" after "break".')
+            return Stmt.Break(keyword)
+
+        if self.match(TokenType.CONTINUE):
+            keyword = self.previous()
+            self.consume(TokenType.SEMICOLON, 'Expected ";" after "continue".')
+            return Stmt.Continue(keyword)
+
         if self.match(TokenType.WHILE):
             return self.while_statement()
 
@@ -59,6 +78,7 @@ class Parser:
         return self.expression_statement()
 
     def for_statement(self) -> Stmt:
+        line = self.previous().line
         self.consume(TokenType.LEFT_PAREN, 'Expected "(" after "for".')
         initializer = None
 
@@ -83,12 +103,10 @@ class Parser:
 
         body = self.statement()
 
-        if increment != None:
-            body = Stmt.Block([body, Stmt.Expression(increment)])
-
         if condition == None:
             condition = Expr.Literal(True)
-        body = Stmt.While(condition, body)
+        body = Stmt.While(condition, body, increment)
+        body.line = line
 
         if initializer != None:
             body = Stmt.Block([initializer, body])
@@ -129,7 +147,9 @@ class Parser:
             initializer = self.expression()
 
         self.consume(TokenType.SEMICOLON, 'Expected ";" after variable declaration')
-        return Stmt.Var(name, initializer)
+        stmt = Stmt.Var(name, initializer)
+        stmt.line = name.line
+        return stmt
 
     def while_statement(self) -> Stmt:
         self.consume(TokenType.LEFT_PAREN, 'Expect "(" after "while".')
@@ -163,7 +183,9 @@ class Parser:
         self.consume(TokenType.LEFT_BRACE, 'Expected "{" before %s body}' % (kind))
         body = self.block()
 
-        return Stmt.Function(name, parameters, body)
+        stmt = Stmt.Function(name, parameters, body)
+        stmt.line = name.line
+        return stmt
 
 
     def block(self) -> list[Stmt]:
@@ -184,8 +206,13 @@ class Parser:
 
             if isinstance(expr, Expr.Variable):
                 name = expr.name
+                if Expr.Append.matches(name, value):
+                    return Expr.Append(name, value)
                 return Expr.Assign(name, value)
 
+            if isinstance(expr, Expr.Index):
+                return Expr.SetIndex(expr.array, expr.bracket, expr.index, value)
+
             self.error(equals, "Invalid assignment target.")
 
         return expr
@@ -281,6 +308,11 @@ class Parser:
         while True:
             if self.match(TokenType.LEFT_PAREN):
                 expr = self.finish_call(expr)
+            elif self.match(TokenType.LEFT_BRACKET):
+                bracket = self.previous()
+                index = self.expression()
+                self.consume(TokenType.RIGHT_BRACKET, 'Expected "]" after index.')
+                expr = Expr.Index(expr, bracket, index)
             else:
                 break
 
@@ -307,8 +339,43 @@ class Parser:
             self.consume(TokenType.RIGHT_PAREN, 'Expected ")" after expression.')
             return Expr.Grouping(expr)
 
+        if self.match(TokenType.LEFT_BRACKET):
+            return self.array()
+
+        # A brace can't start an expression statement, so here it is
+        # always a map and never a block.
+        if self.match(TokenType.LEFT_BRACE):
+            return self.map()
+
         raise self.error(self.peek(), "Expected expression.")
 
+    def array(self) -> Expr:
+        bracket = self.previous()
+        elements = []
+        if not self.check(TokenType.RIGHT_BRACKET):
+            while True:
+                elements.append(self.expression())
+                if not self.match(TokenType.COMMA):
+                    break
+
+        self.consume(TokenType.RIGHT_BRACKET, 'Expected "]" after array elements.')
+        return Expr.Array(bracket, elements)
+
+    def map(self) -> Expr:
+        brace = self.previous()
+        keys = []
+        values = []
+        if not self.check(TokenType.RIGHT_BRACE):
+            while True:
+                keys.append(self.expression())
+                self.consume(TokenType.COLON, 'Expected ":" after map key.')
+                values.append(self.expression())
+                if not self.match(TokenType.COMMA):
+                    break
+
+        self.consume(TokenType.RIGHT_BRACE, 'Expected "}" after map entries.')
+        return Expr.Map(brace, keys, values)
+
     def match(self, *types) -> bool:
         for token_type in types:
             if self.check(token_type):
@@ -343,9 +410,7 @@ class Parser:
         return self.tokens[self.current - 1]
 
     def error(self, token: Token, message: str) -> Parse_error:
-        import pox as Pox
-
-        Pox.pox.parse_error(token, message)
+        self.diagnostics.parse_error(token, message)
         raise Parse_error()
 
     def sync(self):
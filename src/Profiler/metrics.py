@@ -0,0 +1,106 @@
+import json
+from collections import Counter
+from Eval.expressions import Expr
+from Eval.statements import Stmt
+from Functions.pox_function import PoxFunction
+from Interpreter.interpreter import Interpreter
+
+# Quickening swaps a Binary's class for a specialized one depending on the
+# operand types it saw, counts are kept under the node the parser built.
+# `x = x + y` is parsed into an Append, counted as the Assign it stands for.
+NODE_TYPES = {Expr.NumberBinary: "Binary", Expr.StringBinary: "Binary", Expr.Append: "Assign"}
+
+
+class MeteredFunction(PoxFunction):
+    def call(self, interpreter, arguments: list) -> object:
+        interpreter.calls += 1
+        interpreter.environments += 1
+        return PoxFunction.call(self, interpreter, arguments)
+
+
+class MeteringInterpreter(Interpreter):
+    """Tree-walking interpreter counting work instead of timing it, so runs repeat."""
+
+    def __init__(self, out=None, diagnostics=None) -> None:
+        super().__init__(out, diagnostics)
+        self.statements = Counter()
+        self.expressions = Counter()
+        self.environments = 0
+        self.hops = 0
+        self.calls = 0
+
+    def execute(self, stmt: Stmt):
+        self.statements[type(stmt).__name__] += 1
+        return stmt.accept(self)
+
+    def execute_block(self, statements: list[Stmt], env):
+        previous = self.env
+        try:
+            self.env = env
+
+            for statement in statements:
+                completion = self.execute(statement)
+                if completion is not None:
+                    return completion
+
+        finally:
+            self.env = previous
+
+        return None
+
+    def evaluate(self, expr: Expr) -> object:
+        kind = type(expr)
+        self.expressions[NODE_TYPES.get(kind) or kind.__name__] += 1
+        return expr.accept(self)
+
+    def tail_call(self, expr: Expr.Call):
+        self.expressions["Call"] += 1
+        return super().tail_call(expr)
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        self.environments += 1
+        return super().visit_block_stmt(stmt)
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        function = MeteredFunction(stmt, self.env)
+        if stmt.slot is None:
+            self.env.define(stmt.name.lexeme, function)
+        else:
+            self.env.define_at(stmt.slot, function)
+        return None
+
+    def visit_variable_expr(self, expr: Expr.Variable):
+        if expr.depth is not None:
+            self.hops += expr.depth
+        return super().visit_variable_expr(expr)
+
+    def visit_assign_expr(self, expr: Expr.Assign) -> object:
+        if expr.depth is not None:
+            self.hops += expr.depth
+        return super().visit_assign_expr(expr)
+
+    def visit_append_expr(self, expr: Expr.Append) -> object:
+        # Evaluates the Binary in place, without going through evaluate.
+        self.expressions["Binary"] += 1
+        if expr.depth is not None:
+            self.hops += expr.depth
+        return super().visit_append_expr(expr)
+
+    # Reports
+
+    def metrics(self) -> dict:
+        statements = sum(self.statements.values())
+        expressions = sum(self.expressions.values())
+        return {
+            "operations": statements + expressions + self.environments + self.hops,
+            "statements": statements,
+            "expressions": expressions,
+            "environments": self.environments,
+            "hops": self.hops,
+            "calls": self.calls,
+            "statements_by_type": dict(sorted(self.statements.items())),
+            "expressions_by_type": dict(sorted(self.expressions.items())),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.metrics(), indent=2)
@@ -0,0 +1,169 @@
+import json
+from time import perf_counter
+from Eval.statements import Stmt
+from Functions.pox_function import PoxFunction
+from Interpreter.interpreter import Interpreter
+
+
+class Stats:
+    __slots__ = ("name", "line", "count", "inclusive", "exclusive", "statements", "active")
+
+    def __init__(self, name: str, line: int) -> None:
+        self.name = name
+        self.line = line
+        self.count = 0
+        self.inclusive = 0.0
+        # Leaves out nested calls for functions, nested statements for lines.
+        self.exclusive = 0.0
+        self.statements = 0
+        # Activations currently on the stack, recursion only adds the
+        # outermost one to the inclusive time.
+        self.active = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "line": self.line,
+            "count": self.count,
+            "inclusive": self.inclusive,
+            "exclusive": self.exclusive,
+            "statements": self.statements,
+        }
+
+
+class ProfiledFunction(PoxFunction):
+    def call(self, interpreter, arguments: list) -> object:
+        return interpreter.profile_call(self, arguments)
+
+
+class ProfilingInterpreter(Interpreter):
+    """Tree-walking interpreter timing every statement and Pox function call."""
+
+    def __init__(self, out=None, diagnostics=None) -> None:
+        super().__init__(out, diagnostics)
+        self.functions = {}
+        self.lines = {}
+        self.function_stack = [Stats("<script>", 0)]
+        self.child_calls = [0.0]
+        self.child_statements = [0.0]
+        self.started = perf_counter()
+
+    def execute(self, stmt: Stmt):
+        stats = self.lines.get(stmt.line)
+        if stats is None:
+            stats = self.lines[stmt.line] = Stats(f"line {stmt.line}", stmt.line)
+        self.function_stack[-1].statements += 1
+
+        stats.active += 1
+        self.child_statements.append(0.0)
+        start = perf_counter()
+        try:
+            return stmt.accept(self)
+        finally:
+            elapsed = perf_counter() - start
+            nested = self.child_statements.pop()
+            self.child_statements[-1] += elapsed
+            stats.active -= 1
+            stats.count += 1
+            stats.statements += 1
+            stats.exclusive += elapsed - nested
+            if stats.active == 0:
+                stats.inclusive += elapsed
+
+    def execute_block(self, statements: list[Stmt], env):
+        previous = self.env
+        try:
+            self.env = env
+
+            for statement in statements:
+                completion = self.execute(statement)
+                if completion is not None:
+                    return completion
+
+        finally:
+            self.env = previous
+
+        return None
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        function = ProfiledFunction(stmt, self.env)
+        if stmt.slot is None:
+            self.env.define(stmt.name.lexeme, function)
+        else:
+            self.env.define_at(stmt.slot, function)
+        return None
+
+    def profile_call(self, function: ProfiledFunction, arguments: list) -> object:
+        declaration = function.declaration
+        key = (declaration.name.lexeme, declaration.line)
+        stats = self.functions.get(key)
+        if stats is None:
+            stats = self.functions[key] = Stats(*key)
+
+        stats.active += 1
+        self.function_stack.append(stats)
+        self.child_calls.append(0.0)
+        start = perf_counter()
+        try:
+            return PoxFunction.call(function, self, arguments)
+        finally:
+            elapsed = perf_counter() - start
+            nested = self.child_calls.pop()
+            self.child_calls[-1] += elapsed
+            self.function_stack.pop()
+            stats.active -= 1
+            stats.count += 1
+            stats.exclusive += elapsed - nested
+            if stats.active == 0:
+                stats.inclusive += elapsed
+
+    def finish(self) -> None:
+        script = self.function_stack[0]
+        script.count = 1
+        script.inclusive = perf_counter() - self.started
+        script.exclusive = script.inclusive - self.child_calls[0]
+
+    # Reports
+
+    def report(self, source_lines: list[str] = (), limit: int = 20) -> str:
+        self.finish()
+        functions = [self.function_stack[0], *self.functions.values()]
+        functions.sort(key=lambda stats: stats.exclusive, reverse=True)
+        lines = sorted(self.lines.values(), key=lambda stats: stats.exclusive, reverse=True)
+
+        rows = [
+            "Functions (sorted by exclusive time)",
+            f"{'calls':>10} {'incl ms':>10} {'excl ms':>10} {'stmts':>10}  function",
+        ]
+        for stats in functions[:limit]:
+            where = f" (line {stats.line})" if stats.line else ""
+            rows.append(
+                f"{stats.count:>10} {stats.inclusive * 1e3:>10.2f} "
+                f"{stats.exclusive * 1e3:>10.2f} {stats.statements:>10}  {stats.name}{where}"
+            )
+
+        rows.append("")
+        rows.append("Lines (sorted by exclusive time)")
+        rows.append(f"{'count':>10} {'incl ms':>10} {'excl ms':>10}  line")
+        for stats in lines[:limit]:
+            text = ""
+            if 0 < stats.line <= len(source_lines):
+                text = "  " + source_lines[stats.line - 1].strip()
+            rows.append(
+                f"{stats.count:>10} {stats.inclusive * 1e3:>10.2f} "
+                f"{stats.exclusive * 1e3:>10.2f}  {stats.line:>4}{text}"
+            )
+        return "\n".join(rows)
+
+    def to_json(self) -> str:
+        self.finish()
+        return json.dumps(
+            {
+                "functions": [
+                    stats.as_dict()
+                    for stats in [self.function_stack[0], *self.functions.values()]
+                ],
+                "lines": [stats.as_dict() for stats in self.lines.values()],
+            },
+            indent=2,
+        )
@@ -0,0 +1,114 @@
+import sys
+import threading
+from collections import Counter
+from ClosureCompiler import closure_compiler
+from ClosureCompiler.closure_compiler import CompiledFunction
+from Functions.pox_function import PoxFunction
+from Interpreter.interpreter import Interpreter
+from Transpiler.transpiler import BLOCK_PREFIX, FILENAME
+from VM.vm import VM
+
+CALL_CODES = (PoxFunction.call.__code__, CompiledFunction.call.__code__)
+STATEMENT_CODES = (Interpreter.execute_block.__code__, Interpreter.interpret.__code__)
+VM_CODE = VM.run.__code__
+CLOSURE_FILENAME = closure_compiler.__file__
+SCRIPT = "<script>"
+
+
+class Sampler:
+    """Samples the Pox call stack of the running thread into folded stacks."""
+
+    def __init__(self, executor, interval: float = 0.005) -> None:
+        self.executor = executor
+        self.interval = interval
+        self.samples = Counter()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.target = None
+
+    def start(self) -> None:
+        self.target = threading.get_ident()
+        self.thread = threading.Thread(target=self.run, name="pox-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is not None:
+                self.samples[self.sample(frame)] += 1
+
+    def sample(self, frame) -> str:
+        stack = []
+        line = None
+        block_line = None
+
+        while frame is not None:
+            code = frame.f_code
+            if code in STATEMENT_CODES:
+                if line is None:
+                    statement = frame.f_locals.get("statement")
+                    line = getattr(statement, "line", None)
+            elif code in CALL_CODES:
+                # Tail calls replace `function` in the same Python frame, a
+                # sample taken before it is first set still has `self`.
+                local_vars = frame.f_locals
+                function = local_vars.get("function") or local_vars.get("self")
+                if function is not None:
+                    declaration = function.declaration
+                    if line is None and isinstance(function, CompiledFunction):
+                        line = self.compiled_line(function.body)
+                    stack.append(self.label(declaration.name.lexeme, line or declaration.line))
+                    line = None
+            elif code.co_filename == CLOSURE_FILENAME:
+                # Block loops, block scopes and interpret keep the running
+                # statement's closure in `statement`.
+                if line is None:
+                    line = self.compiled_line(frame.f_locals.get("statement"))
+            elif code is VM_CODE:
+                stack.extend(self.vm_frames(frame.f_locals))
+            elif code.co_filename == FILENAME:
+                if code.co_name.startswith(BLOCK_PREFIX):
+                    # A loop body run as a function, part of the function around it.
+                    if block_line is None:
+                        block_line = self.transpiled_line(frame)
+                else:
+                    stack.append(self.transpiled_frame(frame, block_line))
+                    block_line = None
+            frame = frame.f_back
+
+        if not stack or not stack[-1].startswith(SCRIPT):
+            stack.append(self.label(SCRIPT, line))
+        return ";".join(reversed(stack))
+
+    def label(self, name: str, line) -> str:
+        return name if line is None else f"{name}:{line}"
+
+    def compiled_line(self, closure):
+        return self.executor.lines.get(closure)
+
+    def vm_frames(self, local_vars: dict) -> list[str]:
+        frames = [*local_vars.get("frames", ()), (local_vars["closure"], local_vars["ip"], 0)]
+        labels = []
+        for closure, ip, _ in reversed(frames):
+            proto = closure.proto
+            name = SCRIPT if proto.name == "script" else proto.name
+            labels.append(self.label(name, proto.chunk.lines[max(ip - 1, 0)]))
+        return labels
+
+    def transpiled_frame(self, frame, line=None) -> str:
+        name = frame.f_code.co_name
+        # Generated names look like f12_fib, the script body is _main.
+        name = SCRIPT if name == "_main" else name.split("_", 1)[-1]
+        return self.label(name, line if line is not None else self.transpiled_line(frame))
+
+    def transpiled_line(self, frame):
+        line_map = getattr(self.executor, "line_map", ())
+        return line_map[frame.f_lineno - 1] if frame.f_lineno <= len(line_map) else None
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
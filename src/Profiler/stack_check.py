@@ -0,0 +1,72 @@
+import io
+import sys
+import argparse
+from collections import Counter
+from pathlib import Path
+import pox as Pox
+from Functions.native_function import NativeFunction
+from Profiler.sampler import Sampler
+
+SCRIPT = Path(__file__).resolve().parents[2] / "tests" / "stacks.pox"
+
+
+def native_stacks(engine: str, source: str) -> Counter:
+    """Samples the Pox stack every time a native is called."""
+    pox = Pox.Pox(engine=engine, output=io.StringIO())
+    pox.use_cache = False
+    sampler = Sampler(pox.executor)
+    stacks = Counter()
+
+    # Native calls happen at the same points of the script in every engine,
+    # unlike timer samples.
+    def probe(function):
+        def native(*arguments):
+            stacks[sampler.sample(sys._getframe(1))] += 1
+            return function(*arguments)
+
+        return native
+
+    for value in pox.interpreter.global_env.values.values():
+        if isinstance(value, NativeFunction):
+            value.function = probe(value.function)
+
+    pox.run(source)
+    return stacks
+
+
+def compare(name: str, expected: Counter, actual: Counter, engine: str) -> bool:
+    if expected == actual:
+        return True
+    print(f"{name}: {engine} stacks differ")
+    for stack in sorted(expected.keys() | actual.keys()):
+        if expected[stack] != actual[stack]:
+            print(f"  {stack}  {expected[stack]} != {actual[stack]}")
+    return False
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="Pox sampler stack check")
+    parser.add_argument("scripts", nargs="*", help="scripts to run (default tests/stacks.pox)")
+    parser.add_argument(
+        "--engines",
+        # Not python, which keeps the frames of tail calls.
+        default="tree,closure,vm",
+        help="the first engine's stacks are the ones the others must match",
+    )
+    args = parser.parse_args()
+
+    scripts = [Path(script) for script in args.scripts] or [SCRIPT]
+    reference, *engines = [engine for engine in args.engines.split(",") if engine]
+    matched = True
+    for script in scripts:
+        source = script.read_text()
+        expected = Pox.on_large_stack(native_stacks, reference, source)
+        for engine in engines:
+            actual = Pox.on_large_stack(native_stacks, engine, source)
+            matched = compare(script.stem, expected, actual, engine) and matched
+        print(f"{script.stem}: {sum(expected.values())} stacks")
+    return 0 if matched else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
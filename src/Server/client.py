@@ -0,0 +1,55 @@
+import sys
+import json
+import socket
+from itertools import count
+
+
+class Client:
+    """A connection to `run.py serve --socket PATH`, kept open between requests."""
+
+    def __init__(self, path: str) -> None:
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.connect(path)
+        self.reader = self.connection.makefile("rb")
+        self.writer = self.connection.makefile("wb")
+        self.ids = count(1)
+
+    def run(
+        self,
+        path: str | None = None,
+        source: str | None = None,
+        engine: str | None = None,
+        globals: dict | None = None,
+        output=None,
+    ) -> dict:
+        """Runs a script, streaming its output, and returns the final message."""
+        request = {"id": next(self.ids)}
+        if path is not None:
+            request["path"] = path
+        if source is not None:
+            request["source"] = source
+        if engine is not None:
+            request["engine"] = engine
+        if globals is not None:
+            request["globals"] = globals
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        self.writer.flush()
+
+        stream = output if output is not None else sys.stdout
+        for line in self.reader:
+            message = json.loads(line)
+            if message.get("done"):
+                return message
+            stream.write(message["output"])
+        raise ConnectionError("The server closed the connection.")
+
+    def close(self) -> None:
+        self.reader.close()
+        self.writer.close()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
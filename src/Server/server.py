@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import traceback
+from collections import OrderedDict
+import pox as Pox
+from Batch.runner import load
+from Embed.program import ENGINES, CompileError, Program
+
+# Compiled programs each worker keeps, by source text.
+PROGRAM_CACHE_SIZE = 256
+
+
+class Channel:
+    """JSON messages, one per line, over a binary stream."""
+
+    def __init__(self, reader, writer) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, message: dict) -> None:
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        self.writer.flush()
+
+    def __iter__(self):
+        for line in self.reader:
+            if line.strip():
+                yield line
+
+
+class OutputStream:
+    """The stream a run prints to, every flush becomes an output message."""
+
+    def __init__(self, channel: Channel, id: object) -> None:
+        self.channel = channel
+        self.id = id
+
+    def write(self, text: str) -> None:
+        self.channel.send({"id": self.id, "output": text})
+
+    def flush(self) -> None:
+        pass
+
+
+class Worker:
+    """Runs requests one after the other, each on a fresh interpreter."""
+
+    def __init__(self, engine: str, optimize: bool, memoize: bool, use_cache: bool) -> None:
+        self.engine = engine
+        self.optimize = optimize
+        self.memoize = memoize
+        self.use_cache = use_cache
+        self.programs = OrderedDict()
+
+    def serve(self, channel: Channel) -> None:
+        for line in channel:
+            self.execute(channel, line)
+
+    # A request is {"path" or "source", "id", "engine", "globals"}, output is
+    # streamed back as {"id", "output"} and it ends with
+    # {"id", "done", "status", "exit", "seconds", "errors"}.
+    # A request is {"path" or "source", "id", "engine", "globals"}, output is
+    # streamed back as {"id", "output"} and it ends with
+    # {"id", "done", "status", "exit", "seconds", "errors"}.
+    def execute(self, channel: Channel, line: bytes) -> None:
+        start = time.perf_counter()
+        id = None
+        status, exit_status, errors = "ok", 0, []
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object.")
+            id = request.get("id")
+            program = self.program(request)
+            engine = request.get("engine", self.engine)
+            if engine not in ENGINES:
+                raise ValueError(f'Unknown engine "{engine}".')
+            globals = request.get("globals")
+            if globals is not None and not isinstance(globals, dict):
+                raise ValueError('"globals" must be a JSON object.')
+            result = program.run(engine, globals=globals, output=OutputStream(channel, id))
+            errors = [str(error) for error in result.errors]
+            if not result.ok:
+                status = "runtime error"
+        except CompileError as error:
+            status, exit_status = "compile error", 1
+            errors = [str(diagnostic) for diagnostic in error.diagnostics]
+        except (OSError, ValueError, TypeError) as error:
+            # A bad request: not JSON, missing file, unknown engine, unusable globals.
+            status, exit_status, errors = "bad request", 1, [str(error)]
+        except Exception:
+            status, exit_status, errors = "crashed", 1, [traceback.format_exc()]
+        channel.send(
+            {
+                "id": id,
+                "done": True,
+                "status": status,
+                "exit": exit_status,
+                "seconds": time.perf_counter() - start,
+                "errors": errors,
+            }
+        )
+
+    def program(self, request: dict) -> Program:
+        """The compiled script of request, reused while its source is unchanged."""
+        path = request.get("path")
+        if path is not None:
+            with open(path, "r") as file:
+                source = file.read()
+        elif "source" in request:
+            source = request["source"]
+        else:
+            raise ValueError('A request needs a "path" or a "source".')
+
+        program = self.programs.get(source)
+        if program is not None:
+            self.programs.move_to_end(source)
+            return program
+        if path is not None:
+            program = load(path, source, self.optimize, self.memoize, self.use_cache)
+        else:
+            program = Program.compile(source, optimize=self.optimize, memoize=self.memoize)
+        self.programs[source] = program
+        if len(self.programs) > PROGRAM_CACHE_SIZE:
+            self.programs.popitem(last=False)
+        return program
+
+
+def prepare() -> None:
+    """Imports and warms up what a first run would, so forked workers start ready."""
+    program = Program.compile("print len([1]) + 1;")
+    for engine in ENGINES:
+        program.run(engine)
+
+
+def serve_stdio(worker: Worker) -> None:
+    Pox.on_large_stack(worker.serve, Channel(sys.stdin.buffer, sys.stdout.buffer))
+
+
+class PreforkServer:
+    """Forks `workers` processes serving connections on one Unix socket."""
+
+    def __init__(self, path: str, workers: int, worker: Worker) -> None:
+        self.path = path
+        self.workers = workers
+        self.worker = worker
+        self.children = set()
+
+    def serve_forever(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.listen(128)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            for _ in range(self.workers):
+                self.spawn(listener)
+            print(f"Serving on {self.path} with {self.workers} workers", file=sys.stderr)
+            while True:
+                pid, _ = os.wait()
+                if pid in self.children:
+                    self.children.discard(pid)
+                    self.spawn(listener)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for pid in self.children:
+                os.kill(pid, signal.SIGTERM)
+            listener.close()
+            os.unlink(self.path)
+
+    def spawn(self, listener: socket.socket) -> None:
+        pid = os.fork()
+        if pid:
+            self.children.add(pid)
+            return
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            self.accept(listener)
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            os._exit(status)
+
+    def accept(self, listener: socket.socket) -> None:
+        while True:
+            connection, _ = listener.accept()
+            with connection, connection.makefile("rb") as reader, connection.makefile("wb") as writer:
+                try:
+                    Pox.on_large_stack(self.worker.serve, Channel(reader, writer))
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client went away in the middle of a request.
+                    pass
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="Pox serve")
+    parser.add_argument(
+        "--socket", metavar="PATH", help="listen on a Unix socket (default: stdin and stdout)"
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes for --socket (default one per core)",
+    )
+    parser.add_argument("--engine", choices=ENGINES, default="tree")
+    parser.add_argument("-O", "--optimize", action="store_true")
+    parser.add_argument("--memoize", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    worker = Worker(args.engine, args.optimize, args.memoize, not args.no_cache)
+    prepare()
+    if args.socket is None:
+        serve_stdio(worker)
+    else:
+        PreforkServer(args.socket, max(args.workers, 1), worker).serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+from Collections.pox_array import get_item, set_item
+from Collections.pox_map import PoxMap
+from Collections.rope import Rope, concat
+from Errors.runtime_error import Runtime_error
+from Functions.pox_callable import PoxCallable
+from Lexer.token import Token
+from Lexer.token_type import TokenType
+
+
+class TranspiledFunction(PoxCallable):
+    """A Pox function whose body has been compiled to a real Python function."""
+
+    __slots__ = ("fn", "name", "argc")
+
+    def __init__(self, fn, name: str, argc: int) -> None:
+        self.fn = fn
+        self.name = name
+        self.argc = argc
+
+    def call(self, interpreter, arguments: list) -> object:
+        return self.fn(*arguments)
+
+    def arity(self) -> int:
+        return self.argc
+
+    def __repr__(self) -> str:
+        return f'"<Fn {self.name}>"'
+
+
+# Slow paths of the generated code. The fast paths are inlined by the
+# Transpiler, these only run when operand types are unusual or an error
+# has to be raised.
+
+
+def error(line: int, message: str) -> Runtime_error:
+    return Runtime_error(Token(TokenType.EOF, "", None, line), message)
+
+
+def uninitialized(name: str, line: int):
+    raise error(line, f'Can\'t access uninitialized variable "{name}".')
+
+
+def undefined(name: str, value: object, line: int):
+    raise error(line, f'Undefined variable "{name}".')
+
+
+def number_operands(left: object, right: object, line: int) -> None:
+    if not isinstance(left, float) or not isinstance(right, float):
+        raise error(line, "Operand must be a number.")
+
+
+def less(left, right, line):
+    number_operands(left, right, line)
+    return left < right
+
+
+def less_equal(left, right, line):
+    number_operands(left, right, line)
+    return left <= right
+
+
+def greater(left, right, line):
+    number_operands(left, right, line)
+    return left > right
+
+
+def greater_equal(left, right, line):
+    number_operands(left, right, line)
+    return left >= right
+
+
+def multiply(left, right, line):
+    number_operands(left, right, line)
+    return left * right
+
+
+def divide(left, right, line):
+    number_operands(left, right, line)
+    if left == 0 or right == 0:
+        raise error(line, f"Trying to devide by Zero: {left} / {right}")
+    return left / right
+
+
+def subtract(left, right, line):
+    if not isinstance(right, float):
+        raise error(line, "Operand must be a number.")
+    return float(left) - right
+
+
+def make_add(stringify):
+    def add(left, right, line):
+        if isinstance(left, float) and isinstance(right, float):
+            return left + right
+        if isinstance(left, (str, Rope)) or isinstance(right, (str, Rope)):
+            return stringify(left) + stringify(right)
+        raise error(line, "Operands must be two numbers or two strings.")
+
+    return add
+
+
+def make_append(stringify):
+    add = make_add(stringify)
+
+    def append(left, right, line):
+        if type(left) is str or type(left) is Rope:
+            return concat(left, stringify(right))
+        return add(left, right, line)
+
+    return append
+
+
+def make_call(interpreter):
+    def call(callee, arguments: list, line: int):
+        if not isinstance(callee, PoxCallable):
+            raise error(line, "Can only call function and classes.")
+        if len(arguments) != callee.arity():
+            raise error(
+                line, f"Expected {callee.arity()} arguments but got {len(arguments)}."
+            )
+        try:
+            return callee.call(interpreter, arguments)
+        except Runtime_error as native:
+            raise native.at(Token(TokenType.EOF, "", None, line))
+
+    return call
+
+
+def get_index(target, index, line):
+    try:
+        return get_item(target, index)
+    except Runtime_error as native:
+        raise native.at(Token(TokenType.EOF, "", None, line))
+
+
+def set_index(target, index, value, line):
+    try:
+        return set_item(target, index, value)
+    except Runtime_error as native:
+        raise native.at(Token(TokenType.EOF, "", None, line))
+
+
+def new_map(pairs: list, line: int) -> PoxMap:
+    try:
+        return PoxMap.of(pairs)
+    except Runtime_error as native:
+        raise native.at(Token(TokenType.EOF, "", None, line))
@@ -0,0 +1,598 @@
+from Eval.expressions import Expr
+from Eval.statements import Stmt
+from Lexer.token import Token
+from Lexer.token_type import TokenType
+from Errors.runtime_error import Runtime_error, STACK_OVERFLOW
+from Collections.pox_array import PoxArray
+from Functions.native_function import NativeFunction
+from . import runtime
+
+FILENAME = "<pox>"
+# Name prefix of the functions loop bodies with closures are run as.
+BLOCK_PREFIX = "_block"
+# Operators nested in one expression before the value so far is stored in
+# a temporary, CPython refuses expressions nested much deeper.
+SPILL_DEPTH = 8
+
+
+class Code:
+    """A generated Python expression, `raw` if it can be re-evaluated freely."""
+
+    def __init__(
+        self,
+        text: str,
+        raw: str = None,
+        boolean: bool = False,
+        number: bool = False,
+        depth: int = 0,
+    ) -> None:
+        self.text = text
+        # A literal or bare name, binary operators inline their fast paths on it.
+        self.raw = raw
+        self.boolean = boolean
+        self.number = number
+        # Binary operators nested in the expression.
+        self.depth = depth
+
+
+class FunctionContext:
+    def __init__(self, enclosing, block: bool = False) -> None:
+        self.enclosing = enclosing
+        self.globals = set()
+        self.nonlocals = set()
+        # Loops entered so far in this Python function.
+        self.loops = 0
+        # A block body run as a function of its own, the "break", "continue"
+        # and "return" it hands back to its caller are collected in exits.
+        self.block = block
+        self.exits = set()
+
+
+class Scope:
+    def __init__(self, function: FunctionContext) -> None:
+        self.function = function
+        # Resolver slot -> Python variable name.
+        self.names = {}
+
+
+class Transpiler(Expr.Visitor, Stmt.Visitor):
+    """Translates resolved statements into Python source and lets CPython run it."""
+
+    NUMERIC = {
+        TokenType.LESS: ("<", "_less"),
+        TokenType.LESS_EQUAL: ("<=", "_less_equal"),
+        TokenType.GREATER: (">", "_greater"),
+        TokenType.GREATER_EQUAL: (">=", "_greater_equal"),
+        TokenType.STAR: ("*", "_multiply"),
+        TokenType.MINUS: ("-", "_subtract"),
+        TokenType.PLUS: ("+", "_add"),
+    }
+
+    def __init__(self, interpreter) -> None:
+        self.interpreter = interpreter
+        self.namespace = {
+            "_Fn": runtime.TranspiledFunction,
+            "_Native": NativeFunction,
+            "_str": interpreter.stringify,
+            "_print": interpreter.out.write_line,
+            "_uninit": runtime.uninitialized,
+            "_undefined": runtime.undefined,
+            "_less": runtime.less,
+            "_less_equal": runtime.less_equal,
+            "_greater": runtime.greater,
+            "_greater_equal": runtime.greater_equal,
+            "_multiply": runtime.multiply,
+            "_divide": runtime.divide,
+            "_subtract": runtime.subtract,
+            "_add": runtime.make_add(interpreter.stringify),
+            "_append": runtime.make_append(interpreter.stringify),
+            "_call": runtime.make_call(interpreter),
+            "_Array": PoxArray.of,
+            "_Map": runtime.new_map,
+            "_get_index": runtime.get_index,
+            "_set_index": runtime.set_index,
+        }
+        self.namespace["_G"] = self.namespace
+
+    def interpret(self, statements: list[Stmt]):
+        for name, value in self.interpreter.global_env.values.items():
+            self.namespace.setdefault("g_" + name, value)
+
+        try:
+            source, line_map = self.transpile(statements)
+            code = compile(source, FILENAME, "exec")
+        except (SyntaxError, RecursionError, MemoryError):
+            # Nested deeper than CPython's compiler allows.
+            self.fall_back(statements)
+            return
+
+        diagnostics = self.interpreter.diagnostics
+        try:
+            exec(code, self.namespace)
+            self.namespace["_main"]()
+        except Runtime_error as error:
+            if error.token is None:
+                # Raised by a native called on the fast path.
+                line = self.source_line(error, line_map)
+                error.at(Token(TokenType.EOF, "", None, line))
+            diagnostics.runtime_error(error)
+        except NameError as error:
+            diagnostics.runtime_error(self.undefined_variable(error, line_map))
+        except RecursionError as error:
+            token = Token(TokenType.EOF, "", None, self.source_line(error, line_map))
+            diagnostics.runtime_error(Runtime_error(token, STACK_OVERFLOW))
+
+    def fall_back(self, statements: list[Stmt]) -> None:
+        """Runs statements on the tree interpreter, sharing the globals."""
+        global_env = self.interpreter.global_env
+        for name, value in self.namespace.items():
+            if name.startswith("g_"):
+                global_env.define(name[2:], value)
+        self.interpreter.interpret(statements)
+        for name, value in global_env.values.items():
+            self.namespace["g_" + name] = value
+
+    def source_line(self, error: Exception, line_map: list) -> int:
+        """Pox line of the innermost generated frame error passed through."""
+        lineno = None
+        traceback = error.__traceback__
+        while traceback is not None:
+            if traceback.tb_frame.f_code.co_filename == FILENAME:
+                lineno = traceback.tb_lineno
+            traceback = traceback.tb_next
+        return line_map[lineno - 1] if lineno is not None else 0
+
+    def undefined_variable(self, error: NameError, line_map: list) -> Runtime_error:
+        if error.name is None or not error.name.startswith("g_"):
+            raise error
+
+        name = error.name[2:]
+        token = Token(TokenType.IDENTIFIER, name, None, self.source_line(error, line_map))
+        return Runtime_error(token, f'Undefined variable "{name}".')
+
+    def transpile(self, statements: list[Stmt]) -> tuple[str, list[int]]:
+        self.lines = []
+        self.line_map = []
+        self.indent = 0
+        self.line = 1
+        self.counter = 0
+        self.first = False
+        self.scopes = []
+        self.function = FunctionContext(None)
+
+        self.emit("def _main():")
+        self.indent += 1
+        declarations = self.emit("pass")
+        for statement in statements:
+            self.transpile_stmt(statement)
+        self.declare_scoping(declarations, self.function)
+        self.indent -= 1
+
+        return "\n".join(self.lines) + "\n", self.line_map
+
+    # Emitting
+
+    def emit(self, text: str) -> int:
+        self.lines.append("    " * self.indent + text)
+        self.line_map.append(self.line)
+        return len(self.lines) - 1
+
+    def declare_scoping(self, index: int, function: FunctionContext) -> None:
+        declarations = []
+        if function.globals:
+            declarations.append("global " + ", ".join(sorted(function.globals)))
+        if function.nonlocals:
+            declarations.append("nonlocal " + ", ".join(sorted(function.nonlocals)))
+        if declarations:
+            self.lines[index] = "    " * self.indent + "; ".join(declarations)
+
+    def temp(self) -> str:
+        self.counter += 1
+        return f"t{self.counter}"
+
+    def fresh(self, prefix: str, name: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}_{name}"
+
+    def declare(self, slot: int, name: str) -> str:
+        scope = self.scopes[-1]
+        if slot not in scope.names:
+            scope.names[slot] = self.fresh("l", name)
+        return scope.names[slot]
+
+    def local(self, depth: int, slot: int, assign: bool) -> str:
+        scope = self.scopes[-1 - depth]
+        name = scope.names[slot]
+        if assign and scope.function is not self.function:
+            self.function.nonlocals.add(name)
+        return name
+
+    def condition(self, code: Code) -> str:
+        if code.boolean:
+            return code.text
+        if code.raw is not None and code.raw != code.text:
+            # A checked variable read is never None.
+            return f"{code.text} is not False"
+        t = self.temp()
+        return f"({t} := {code.text}) is not None and {t} is not False"
+
+    def transpile_stmt(self, stmt: Stmt) -> None:
+        stmt.accept(self)
+
+    def transpile_expr(self, expr: Expr, first: bool = False) -> Code:
+        # Whether expr is evaluated before anything else in its statement,
+        # so parts of it may be computed by statements emitted before.
+        self.first = first
+        return expr.accept(self)
+
+    def transpile_body(self, stmt: Stmt) -> None:
+        self.indent += 1
+        start = len(self.lines)
+        self.transpile_stmt(stmt)
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.indent -= 1
+
+    # Statements
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        if self.function.loops and self.creates_closures(stmt):
+            self.transpile_block_function(stmt)
+            return
+
+        self.scopes.append(Scope(self.function))
+        for statement in stmt.statements:
+            self.transpile_stmt(statement)
+        self.scopes.pop()
+
+    def creates_closures(self, stmt: Stmt.Block) -> bool:
+        """Whether a function declared somewhere in stmt may capture its locals."""
+        declares = any(
+            isinstance(inner, (Stmt.Var, Stmt.Function)) for inner in stmt.statements
+        )
+        return declares and self.declares_function(stmt)
+
+    def declares_function(self, stmt: Stmt) -> bool:
+        if isinstance(stmt, Stmt.Function):
+            return True
+        if isinstance(stmt, Stmt.Block):
+            return any(self.declares_function(inner) for inner in stmt.statements)
+        if isinstance(stmt, Stmt.If):
+            return self.declares_function(stmt.then_branch) or (
+                stmt.else_branch is not None and self.declares_function(stmt.else_branch)
+            )
+        if isinstance(stmt, Stmt.While):
+            return self.declares_function(stmt.body)
+        return False
+
+    def transpile_block_function(self, stmt: Stmt.Block) -> None:
+        # Python cells belong to a function call, so a fresh call per pass
+        # is what gives every iteration its own variables.
+        self.counter += 1
+        python_name = f"{BLOCK_PREFIX}{self.counter}"
+        self.emit(f"def {python_name}():")
+        self.indent += 1
+        declarations = self.emit("pass")
+
+        function = FunctionContext(self.function, block=True)
+        enclosing = self.function
+        self.function = function
+        self.scopes.append(Scope(function))
+        for statement in stmt.statements:
+            self.transpile_stmt(statement)
+        self.scopes.pop()
+        self.function = enclosing
+
+        self.declare_scoping(declarations, function)
+        self.indent -= 1
+        result = self.temp()
+        self.emit(f"{result} = {python_name}()")
+        if not function.exits:
+            return
+
+        self.emit(f"if {result} is not None:")
+        self.indent += 1
+        for kind in ("break", "continue"):
+            if kind in function.exits:
+                self.emit(f"if {result} == {kind!r}:")
+                self.indent += 1
+                self.exit_loop(kind)
+                self.indent -= 1
+        if "return" in function.exits:
+            if self.function.block:
+                # Still wrapped, the caller further out unwraps it.
+                self.function.exits.add("return")
+                self.emit(f"return {result}")
+            else:
+                self.emit(f"return {result}[0]")
+        self.indent -= 1
+
+    def exit_loop(self, kind: str) -> None:
+        """Emits a break or continue, handed to the caller from a block function."""
+        if self.function.block and not self.function.loops:
+            self.function.exits.add(kind)
+            self.emit(f"return {kind!r}")
+        else:
+            self.emit(kind)
+
+    def visit_break_stmt(self, stmt: Stmt.Break):
+        self.line = stmt.keyword.line
+        self.exit_loop("break")
+
+    def visit_continue_stmt(self, stmt: Stmt.Continue):
+        self.line = stmt.keyword.line
+        self.exit_loop("continue")
+
+    def visit_expression_stmt(self, stmt: Stmt.Expression):
+        self.emit(self.transpile_expr(stmt.expression, first=True).text)
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        self.line = stmt.name.line
+        name = stmt.name.lexeme
+        if stmt.slot is None:
+            target = "g_" + name
+            self.function.globals.add(target)
+        else:
+            target = self.declare(stmt.slot, name)
+
+        function = FunctionContext(self.function)
+        scope = Scope(function)
+        params = [self.fresh("l", param.lexeme) for param in stmt.params]
+        scope.names = dict(enumerate(params))
+        python_name = self.fresh("f", name)
+
+        self.emit(f"def {python_name}({', '.join(params)}):")
+        self.indent += 1
+        declarations = self.emit("pass")
+
+        enclosing = self.function
+        self.function = function
+        self.scopes.append(scope)
+        for statement in stmt.body:
+            self.transpile_stmt(statement)
+        self.scopes.pop()
+        self.function = enclosing
+
+        self.declare_scoping(declarations, function)
+        self.indent -= 1
+        self.line = stmt.name.line
+        self.emit(f"{target} = _Fn({python_name}, {name!r}, {len(params)})")
+
+    def visit_if_stmt(self, stmt: Stmt.If):
+        self.emit(f"if {self.condition(self.transpile_expr(stmt.condition, first=True))}:")
+        self.transpile_body(stmt.then_branch)
+        if stmt.else_branch is not None:
+            self.emit("else:")
+            self.transpile_body(stmt.else_branch)
+
+    def visit_print_stmt(self, stmt: Stmt.Print):
+        self.emit(f"_print(_str({self.transpile_expr(stmt.expression, first=True).text}))")
+
+    def visit_return_stmt(self, stmt: Stmt.Return):
+        self.line = stmt.keyword.line
+        value = "None" if stmt.value is None else self.transpile_expr(stmt.value, first=True).text
+        if self.function.block:
+            # Wrapped so the caller can tell it from "break" and "continue".
+            self.function.exits.add("return")
+            self.emit(f"return ({value},)")
+        else:
+            self.emit(f"return {value}")
+
+    def visit_var_stmt(self, stmt: Stmt.Var):
+        self.line = stmt.name.line
+        value = "None"
+        if stmt.initializer is not None:
+            value = self.transpile_expr(stmt.initializer, first=True).text
+
+        if stmt.slot is None:
+            target = "g_" + stmt.name.lexeme
+            self.function.globals.add(target)
+        else:
+            target = self.declare(stmt.slot, stmt.name.lexeme)
+        self.emit(f"{target} = {value}")
+
+    def visit_while_stmt(self, stmt: Stmt.While):
+        self.function.loops += 1
+        self.transpile_while(stmt)
+        self.function.loops -= 1
+
+    def transpile_while(self, stmt: Stmt.While) -> None:
+        if stmt.increment is None:
+            self.emit(f"while {self.condition(self.transpile_expr(stmt.condition))}:")
+            self.transpile_body(stmt.body)
+            return
+
+        if not self.continues(stmt.body):
+            self.emit(f"while {self.condition(self.transpile_expr(stmt.condition))}:")
+            self.transpile_body(stmt.body)
+            self.indent += 1
+            self.emit(self.transpile_expr(stmt.increment).text)
+            self.indent -= 1
+            return
+
+        # A Python `continue` would skip an increment placed after the body,
+        # so the increment moves to the top and is skipped on the first pass.
+        started = self.temp()
+        self.emit(f"{started} = False")
+        self.emit("while True:")
+        self.indent += 1
+        self.emit(f"if {started}:")
+        self.indent += 1
+        self.emit(self.transpile_expr(stmt.increment).text)
+        self.indent -= 1
+        self.emit(f"{started} = True")
+        self.emit(f"if not ({self.condition(self.transpile_expr(stmt.condition))}):")
+        self.indent += 1
+        self.emit("break")
+        self.indent -= 1
+        self.indent -= 1
+        self.transpile_body(stmt.body)
+
+    def continues(self, stmt: Stmt) -> bool:
+        """Whether stmt holds a continue for the loop it is the body of."""
+        if isinstance(stmt, Stmt.Continue):
+            return True
+        if isinstance(stmt, Stmt.Block):
+            return any(self.continues(inner) for inner in stmt.statements)
+        if isinstance(stmt, Stmt.If):
+            return self.continues(stmt.then_branch) or (
+                stmt.else_branch is not None and self.continues(stmt.else_branch)
+            )
+        return False
+
+    # Expressions
+
+    def visit_literal_expr(self, expr: Expr.Literal):
+        text = repr(expr.value)
+        return Code(
+            text,
+            raw=text,
+            boolean=isinstance(expr.value, bool),
+            number=isinstance(expr.value, float),
+        )
+
+    def visit_grouping_expr(self, expr: Expr.Grouping):
+        return self.transpile_expr(expr.expression, self.first)
+
+    def visit_variable_expr(self, expr: Expr.Variable):
+        self.line = expr.name.line
+        if expr.depth is None:
+            name = "g_" + expr.name.lexeme
+        else:
+            name = self.local(expr.depth, expr.slot, assign=False)
+
+        check = f"_uninit({expr.name.lexeme!r}, {self.line})"
+        return Code(f"({name} if {name} is not None else {check})", raw=name)
+
+    def visit_assign_expr(self, expr: Expr.Assign):
+        return self.transpile_assign(expr, self.transpile_expr(expr.value, self.first).text)
+
+    def visit_append_expr(self, expr: Expr.Append):
+        # The numeric fast path of `+`, with a slow path that grows Ropes.
+        value = self.transpile_binary(expr.value, "_append").text
+        return self.transpile_assign(expr, value)
+
+    def transpile_assign(self, expr: Expr.Assign, value: str) -> Code:
+        self.line = expr.name.line
+
+        if expr.depth is not None:
+            name = self.local(expr.depth, expr.slot, assign=True)
+            return Code(f"({name} := {value})")
+
+        name = "g_" + expr.name.lexeme
+        self.function.globals.add(name)
+        undefined = f"_undefined({expr.name.lexeme!r}, {value}, {self.line})"
+        return Code(f"(({name} := {value}) if {name!r} in _G else {undefined})")
+
+    def visit_logical_expr(self, expr: Expr.Logical):
+        left = self.transpile_expr(expr.left).text
+        right = self.transpile_expr(expr.right).text
+        t = self.temp()
+        truthy = f"({t} := {left}) is not None and {t} is not False"
+
+        if expr.operator.token_type == TokenType.OR:
+            return Code(f"({t} if {truthy} else {right})")
+        return Code(f"({right} if {truthy} else {t})")
+
+    def visit_unary_expr(self, expr: Expr.Unary):
+        right = self.transpile_expr(expr.right).text
+        if expr.operator.token_type == TokenType.MINUS:
+            return Code(f"(-float({right}))")
+
+        t = self.temp()
+        return Code(f"(({t} := {right}) is None or {t} is False)", boolean=True)
+
+    def visit_binary_expr(self, expr: Expr.Binary):
+        return self.transpile_binary(expr)
+
+    def transpile_binary(self, expr: Expr.Binary, slow_add: str = "_add") -> Code:
+        first = self.first
+        left = self.transpile_expr(expr.left, first)
+        if first and left.depth >= SPILL_DEPTH:
+            # The left operand runs before the rest of the statement anyway.
+            t = self.temp()
+            self.emit(f"{t} = {left.text}")
+            left = Code(t, raw=t, boolean=left.boolean, number=left.number)
+        right = self.transpile_expr(expr.right)
+        depth = max(left.depth, right.depth) + 1
+        self.line = expr.operator.line
+        kind = expr.operator.token_type
+
+        if kind == TokenType.EQUAL_EQUAL:
+            return Code(f"({left.text} == {right.text})", boolean=True, depth=depth)
+        if kind == TokenType.BANG_EQUAL:
+            return Code(f"({left.text} != {right.text})", boolean=True, depth=depth)
+
+        if left.raw is not None and right.raw is not None:
+            # Neither side has side effects, so both can be read twice.
+            a, b = left.raw, right.raw
+            slow_a, slow_b = left.text, right.text
+            if left.number:
+                check = f"type({b}) is float"
+            elif right.number:
+                check = f"type({a}) is float"
+            else:
+                check = f"type({a}) is type({b}) is float"
+        else:
+            a, b = self.temp(), self.temp()
+            slow_a, slow_b = a, b
+            check = f"type({a} := {left.text}) is type({b} := {right.text}) is float"
+
+        if kind == TokenType.SLASH:
+            fast, slow = f"{a} / {b}", "_divide"
+            check += f" and {a} and {b}"
+        else:
+            operator, slow = self.NUMERIC[kind]
+            if kind == TokenType.PLUS:
+                slow = slow_add
+            fast = f"{a} {operator} {b}"
+
+        arithmetic = kind in (TokenType.PLUS, TokenType.MINUS, TokenType.STAR, TokenType.SLASH)
+        return Code(
+            f"({fast} if {check} else {slow}({slow_a}, {slow_b}, {self.line}))",
+            boolean=not arithmetic,
+            depth=depth,
+        )
+
+    def visit_call_expr(self, expr: Expr.Call):
+        callee = self.transpile_expr(expr.callee)
+        arguments = ", ".join(self.transpile_expr(arg).text for arg in expr.arguments)
+        self.line = expr.paren.line
+        argc = len(expr.arguments)
+        t = self.temp()
+
+        # Reading a bare name again in the slow path re-runs its
+        # uninitialized check before any argument is evaluated.
+        slow_callee = callee.text if callee.raw is not None else t
+        fast = f"{t}.fn({arguments})"
+        value = callee.text if callee.raw is None else callee.raw
+        check = f"type({t} := {value}) is _Fn and {t}.argc == {argc}"
+        native = f"{t}.function({arguments})"
+        native_check = f"type({t}) is _Native and {t}.argc == {argc}"
+        slow = f"_call({slow_callee}, [{arguments}], {self.line})"
+        return Code(f"({fast} if {check} else {native} if {native_check} else {slow})")
+
+    def visit_array_expr(self, expr: Expr.Array):
+        elements = ", ".join(self.transpile_expr(element).text for element in expr.elements)
+        return Code(f"_Array([{elements}])")
+
+    def visit_map_expr(self, expr: Expr.Map):
+        pairs = ", ".join(
+            f"({self.transpile_expr(key).text}, {self.transpile_expr(value).text})"
+            for key, value in zip(expr.keys, expr.values)
+        )
+        self.line = expr.brace.line
+        return Code(f"_Map([{pairs}], {self.line})")
+
+    def visit_index_expr(self, expr: Expr.Index):
+        array = self.transpile_expr(expr.array).text
+        index = self.transpile_expr(expr.index).text
+        self.line = expr.bracket.line
+        return Code(f"_get_index({array}, {index}, {self.line})")
+
+    def visit_set_index_expr(self, expr: Expr.SetIndex):
+        array = self.transpile_expr(expr.array).text
+        index = self.transpile_expr(expr.index).text
+        value = self.transpile_expr(expr.value).text
+        self.line = expr.bracket.line
+        return Code(f"_set_index({array}, {index}, {value}, {self.line})")
@@ -0,0 +1,50 @@
+from array import array
+
+
+class Chunk:
+    """Instructions flat in `code`, with the source line of every word in `lines`."""
+
+    def __init__(self) -> None:
+        self.code = array("I")
+        self.ops = None
+        self.lines = array("I")
+        self.constants = []
+        self.constant_index = {}
+        # Instruction offset -> variable name, only consulted on errors.
+        self.names = {}
+
+    def write(self, word: int, line: int) -> int:
+        self.code.append(word)
+        self.lines.append(line)
+        return len(self.code) - 1
+
+    def seal(self) -> None:
+        # The VM indexes a list about twice as fast as it unboxes from an array.
+        self.ops = self.code.tolist()
+
+    def add_constant(self, value: object) -> int:
+        # Keyed on the type as well, so 1.0 and True don't share a slot.
+        key = (type(value), value)
+        try:
+            return self.constant_index[key]
+        except (KeyError, TypeError):
+            pass
+
+        self.constants.append(value)
+        index = len(self.constants) - 1
+        try:
+            self.constant_index[key] = index
+        except TypeError:
+            pass
+        return index
+
+
+class FunctionProto:
+    def __init__(self, name: str, arity: int = 0) -> None:
+        self.name = name
+        self.arity = arity
+        self.upvalue_count = 0
+        self.chunk = Chunk()
+
+    def __repr__(self) -> str:
+        return f'"<Fn {self.name}>"'
@@ -0,0 +1,391 @@
+from Eval.expressions import Expr
+from Eval.statements import Stmt
+from Lexer.token_type import TokenType
+from .chunk import FunctionProto
+from .opcodes import OpCode
+
+
+class Local:
+    def __init__(self, name: str, depth: int) -> None:
+        self.name = name
+        self.depth = depth
+        self.captured = False
+
+
+class Loop:
+    def __init__(self, scope_depth: int) -> None:
+        self.scope_depth = scope_depth
+        self.break_jumps = []
+        self.continue_jumps = []
+
+
+class FunctionState:
+    def __init__(self, enclosing, proto: FunctionProto) -> None:
+        self.enclosing = enclosing
+        self.proto = proto
+        self.locals = []
+        self.upvalues = []
+        self.loops = []
+        self.scope_depth = 0
+
+
+class Compiler(Expr.Visitor, Stmt.Visitor):
+    """Lowers parsed statements into bytecode for the VM."""
+
+    BINARY_OPS = {
+        TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+        TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+        TokenType.GREATER: OpCode.GREATER,
+        TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+        TokenType.LESS: OpCode.LESS,
+        TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+        TokenType.PLUS: OpCode.ADD,
+        TokenType.MINUS: OpCode.SUBTRACT,
+        TokenType.STAR: OpCode.MULTIPLY,
+        TokenType.SLASH: OpCode.DIVIDE,
+    }
+
+    def __init__(self) -> None:
+        self.state = None
+        self.line = 1
+
+    def compile(self, statements: list[Stmt]) -> FunctionProto:
+        self.state = FunctionState(None, FunctionProto("script"))
+
+        for statement in statements:
+            self.compile_stmt(statement)
+
+        self.emit_return()
+        self.state.proto.chunk.seal()
+        return self.state.proto
+
+    # Emitting
+
+    def emit(self, *words: int) -> int:
+        chunk = self.state.proto.chunk
+        offset = len(chunk.code)
+        for word in words:
+            chunk.write(word, self.line)
+        return offset
+
+    def emit_constant(self, value: object) -> None:
+        self.emit(OpCode.CONSTANT, self.state.proto.chunk.add_constant(value))
+
+    def emit_jump(self, op: OpCode) -> int:
+        return self.emit(op, 0) + 1
+
+    def patch_jump(self, operand: int) -> None:
+        chunk = self.state.proto.chunk
+        chunk.code[operand] = len(chunk.code)
+
+    def emit_return(self) -> None:
+        self.emit(OpCode.NIL)
+        self.emit(OpCode.RETURN)
+
+    def emit_named(self, op: OpCode, operand: int, name: str) -> None:
+        offset = self.emit(op, operand)
+        self.state.proto.chunk.names[offset] = name
+
+    # Scopes and variables
+
+    def begin_scope(self) -> None:
+        self.state.scope_depth += 1
+
+    def end_scope(self) -> None:
+        state = self.state
+        state.scope_depth -= 1
+
+        while state.locals and state.locals[-1].depth > state.scope_depth:
+            if state.locals[-1].captured:
+                self.emit(OpCode.CLOSE_UPVALUE)
+            else:
+                self.emit(OpCode.POP)
+            state.locals.pop()
+
+    def discard_locals(self, depth: int) -> None:
+        """Emits pops for the locals deeper than depth without forgetting them."""
+        for local in reversed(self.state.locals):
+            if local.depth <= depth:
+                break
+            self.emit(OpCode.CLOSE_UPVALUE if local.captured else OpCode.POP)
+
+    def resolve_local(self, state: FunctionState, name: str) -> int:
+        for i in range(len(state.locals) - 1, -1, -1):
+            if state.locals[i].name == name:
+                return i
+        return -1
+
+    def add_upvalue(self, state: FunctionState, is_local: bool, index: int) -> int:
+        upvalue = (is_local, index)
+        if upvalue in state.upvalues:
+            return state.upvalues.index(upvalue)
+
+        state.upvalues.append(upvalue)
+        state.proto.upvalue_count = len(state.upvalues)
+        return len(state.upvalues) - 1
+
+    def resolve_upvalue(self, state: FunctionState, name: str) -> int:
+        if state.enclosing is None:
+            return -1
+
+        local = self.resolve_local(state.enclosing, name)
+        if local != -1:
+            state.enclosing.locals[local].captured = True
+            return self.add_upvalue(state, True, local)
+
+        upvalue = self.resolve_upvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self.add_upvalue(state, False, upvalue)
+
+        return -1
+
+    def declare_local(self, name: str) -> None:
+        """Binds the top of the stack to a new local, redeclaring reuses the slot."""
+        state = self.state
+        for i in range(len(state.locals) - 1, -1, -1):
+            local = state.locals[i]
+            if local.depth < state.scope_depth:
+                break
+            if local.name == name:
+                self.emit(OpCode.SET_LOCAL, i)
+                self.emit(OpCode.POP)
+                return
+
+        state.locals.append(Local(name, state.scope_depth))
+
+    def define_variable(self, name: str) -> None:
+        if self.state.scope_depth > 0:
+            self.declare_local(name)
+            return
+
+        self.emit(OpCode.DEFINE_GLOBAL, self.state.proto.chunk.add_constant(name))
+
+    def named_variable(self, name: str, assign: bool) -> None:
+        state = self.state
+        slot = self.resolve_local(state, name)
+        if slot != -1:
+            get_op, set_op = OpCode.GET_LOCAL, OpCode.SET_LOCAL
+        else:
+            slot = self.resolve_upvalue(state, name)
+            if slot != -1:
+                get_op, set_op = OpCode.GET_UPVALUE, OpCode.SET_UPVALUE
+            else:
+                slot = state.proto.chunk.add_constant(name)
+                get_op, set_op = OpCode.GET_GLOBAL, OpCode.SET_GLOBAL
+
+        if assign:
+            self.emit_named(set_op, slot, name)
+        else:
+            self.emit_named(get_op, slot, name)
+
+    # Statements
+
+    def compile_stmt(self, stmt: Stmt) -> None:
+        stmt.accept(self)
+
+    def compile_expr(self, expr: Expr) -> None:
+        expr.accept(self)
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        self.begin_scope()
+        for statement in stmt.statements:
+            self.compile_stmt(statement)
+        self.end_scope()
+
+    def visit_break_stmt(self, stmt: Stmt.Break):
+        self.line = stmt.keyword.line
+        loop = self.state.loops[-1]
+        self.discard_locals(loop.scope_depth)
+        loop.break_jumps.append(self.emit_jump(OpCode.JUMP))
+
+    def visit_continue_stmt(self, stmt: Stmt.Continue):
+        self.line = stmt.keyword.line
+        loop = self.state.loops[-1]
+        self.discard_locals(loop.scope_depth)
+        loop.continue_jumps.append(self.emit_jump(OpCode.JUMP))
+
+    def visit_expression_stmt(self, stmt: Stmt.Expression):
+        self.compile_expr(stmt.expression)
+        self.emit(OpCode.POP)
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        self.line = stmt.name.line
+        enclosing = self.state
+        if enclosing.scope_depth > 0:
+            # Declare the name first so the body can refer to itself.
+            self.emit(OpCode.NIL)
+            self.declare_local(stmt.name.lexeme)
+
+        proto = FunctionProto(stmt.name.lexeme, len(stmt.params))
+        self.state = FunctionState(enclosing, proto)
+        self.begin_scope()
+        for param in stmt.params:
+            self.state.locals.append(Local(param.lexeme, self.state.scope_depth))
+        for statement in stmt.body:
+            self.compile_stmt(statement)
+        self.emit_return()
+        proto.chunk.seal()
+        upvalues = self.state.upvalues
+        self.state = enclosing
+
+        self.emit(OpCode.CLOSURE, enclosing.proto.chunk.add_constant(proto))
+        for is_local, index in upvalues:
+            self.emit(1 if is_local else 0, index)
+
+        if enclosing.scope_depth > 0:
+            slot = self.resolve_local(enclosing, stmt.name.lexeme)
+            self.emit(OpCode.SET_LOCAL, slot)
+            self.emit(OpCode.POP)
+        else:
+            self.define_variable(stmt.name.lexeme)
+
+    def visit_if_stmt(self, stmt: Stmt.If):
+        self.compile_expr(stmt.condition)
+        else_jump = self.emit_jump(OpCode.POP_JUMP_IF_FALSE)
+        self.compile_stmt(stmt.then_branch)
+
+        if stmt.else_branch is None:
+            self.patch_jump(else_jump)
+            return
+
+        end_jump = self.emit_jump(OpCode.JUMP)
+        self.patch_jump(else_jump)
+        self.compile_stmt(stmt.else_branch)
+        self.patch_jump(end_jump)
+
+    def visit_print_stmt(self, stmt: Stmt.Print):
+        self.compile_expr(stmt.expression)
+        self.emit(OpCode.PRINT)
+
+    def visit_return_stmt(self, stmt: Stmt.Return):
+        self.line = stmt.keyword.line
+        if stmt.value is None:
+            self.emit(OpCode.NIL)
+        elif isinstance(stmt.value, Expr.Call):
+            # TAIL_CALL replaces the current frame when calling a Closure,
+            # for anything else it is a CALL and the RETURN below runs.
+            self.compile_call(stmt.value, OpCode.TAIL_CALL)
+        else:
+            self.compile_expr(stmt.value)
+        self.emit(OpCode.RETURN)
+
+    def visit_var_stmt(self, stmt: Stmt.Var):
+        self.line = stmt.name.line
+        if stmt.initializer is None:
+            self.emit(OpCode.NIL)
+        else:
+            self.compile_expr(stmt.initializer)
+        self.define_variable(stmt.name.lexeme)
+
+    def visit_while_stmt(self, stmt: Stmt.While):
+        loop_start = len(self.state.proto.chunk.code)
+        self.compile_expr(stmt.condition)
+        exit_jump = self.emit_jump(OpCode.POP_JUMP_IF_FALSE)
+
+        loop = Loop(self.state.scope_depth)
+        self.state.loops.append(loop)
+        self.compile_stmt(stmt.body)
+        self.state.loops.pop()
+
+        for jump in loop.continue_jumps:
+            self.patch_jump(jump)
+        if stmt.increment is not None:
+            self.compile_expr(stmt.increment)
+            self.emit(OpCode.POP)
+        self.emit(OpCode.JUMP, loop_start)
+        self.patch_jump(exit_jump)
+        for jump in loop.break_jumps:
+            self.patch_jump(jump)
+
+    # Expressions
+
+    def visit_array_expr(self, expr: Expr.Array):
+        for element in expr.elements:
+            self.compile_expr(element)
+        self.line = expr.bracket.line
+        self.emit(OpCode.ARRAY, len(expr.elements))
+
+    def visit_assign_expr(self, expr: Expr.Assign):
+        self.compile_expr(expr.value)
+        self.line = expr.name.line
+        self.named_variable(expr.name.lexeme, assign=True)
+
+    def visit_append_expr(self, expr: Expr.Append):
+        binary = expr.value
+        self.compile_expr(binary.left)
+        self.compile_expr(binary.right)
+        self.line = binary.operator.line
+        self.emit(OpCode.APPEND)
+        self.line = expr.name.line
+        self.named_variable(expr.name.lexeme, assign=True)
+
+    def visit_binary_expr(self, expr: Expr.Binary):
+        self.compile_expr(expr.left)
+        self.compile_expr(expr.right)
+        self.line = expr.operator.line
+        self.emit(self.BINARY_OPS[expr.operator.token_type])
+
+    def visit_call_expr(self, expr: Expr.Call):
+        self.compile_call(expr, OpCode.CALL)
+
+    def compile_call(self, expr: Expr.Call, op: OpCode) -> None:
+        self.compile_expr(expr.callee)
+        for argument in expr.arguments:
+            self.compile_expr(argument)
+        self.line = expr.paren.line
+        self.emit(op, len(expr.arguments))
+
+    def visit_grouping_expr(self, expr: Expr.Grouping):
+        self.compile_expr(expr.expression)
+
+    def visit_map_expr(self, expr: Expr.Map):
+        for key, value in zip(expr.keys, expr.values):
+            self.compile_expr(key)
+            self.compile_expr(value)
+        self.line = expr.brace.line
+        self.emit(OpCode.MAP, len(expr.keys))
+
+    def visit_index_expr(self, expr: Expr.Index):
+        self.compile_expr(expr.array)
+        self.compile_expr(expr.index)
+        self.line = expr.bracket.line
+        self.emit(OpCode.GET_INDEX)
+
+    def visit_set_index_expr(self, expr: Expr.SetIndex):
+        self.compile_expr(expr.array)
+        self.compile_expr(expr.index)
+        self.compile_expr(expr.value)
+        self.line = expr.bracket.line
+        self.emit(OpCode.SET_INDEX)
+
+    def visit_literal_expr(self, expr: Expr.Literal):
+        if expr.value is None:
+            self.emit(OpCode.NIL)
+        elif expr.value is True:
+            self.emit(OpCode.TRUE)
+        elif expr.value is False:
+            self.emit(OpCode.FALSE)
+        else:
+            self.emit_constant(expr.value)
+
+    def visit_logical_expr(self, expr: Expr.Logical):
+        self.compile_expr(expr.left)
+        if expr.operator.token_type == TokenType.OR:
+            end_jump = self.emit_jump(OpCode.JUMP_IF_TRUE)
+        else:
+            end_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.emit(OpCode.POP)
+        self.compile_expr(expr.right)
+        self.patch_jump(end_jump)
+
+    def visit_unary_expr(self, expr: Expr.Unary):
+        self.compile_expr(expr.right)
+        self.line = expr.operator.line
+        if expr.operator.token_type == TokenType.MINUS:
+            self.emit(OpCode.NEGATE)
+        else:
+            self.emit(OpCode.NOT)
+
+    def visit_variable_expr(self, expr: Expr.Variable):
+        self.line = expr.name.line
+        self.named_variable(expr.name.lexeme, assign=False)
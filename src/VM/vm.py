@@ -0,0 +1,531 @@
+from Collections.pox_array import PoxArray, get_item, set_item
+from Collections.pox_map import PoxMap
+from Collections.rope import Rope, concat
+from Errors.runtime_error import Runtime_error, STACK_OVERFLOW
+from Functions.native_function import NativeFunction
+from Functions.pox_callable import PoxCallable
+from Lexer.token import Token
+from Lexer.token_type import TokenType
+from .chunk import FunctionProto
+from .compiler import Compiler
+from .opcodes import OpCode
+
+CONSTANT = OpCode.CONSTANT.value
+NIL = OpCode.NIL.value
+TRUE = OpCode.TRUE.value
+FALSE = OpCode.FALSE.value
+POP = OpCode.POP.value
+GET_LOCAL = OpCode.GET_LOCAL.value
+SET_LOCAL = OpCode.SET_LOCAL.value
+GET_GLOBAL = OpCode.GET_GLOBAL.value
+DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+SET_GLOBAL = OpCode.SET_GLOBAL.value
+GET_UPVALUE = OpCode.GET_UPVALUE.value
+SET_UPVALUE = OpCode.SET_UPVALUE.value
+EQUAL = OpCode.EQUAL.value
+NOT_EQUAL = OpCode.NOT_EQUAL.value
+GREATER = OpCode.GREATER.value
+GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+LESS = OpCode.LESS.value
+LESS_EQUAL = OpCode.LESS_EQUAL.value
+ADD = OpCode.ADD.value
+APPEND = OpCode.APPEND.value
+SUBTRACT = OpCode.SUBTRACT.value
+MULTIPLY = OpCode.MULTIPLY.value
+DIVIDE = OpCode.DIVIDE.value
+NOT = OpCode.NOT.value
+NEGATE = OpCode.NEGATE.value
+PRINT = OpCode.PRINT.value
+JUMP = OpCode.JUMP.value
+JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+JUMP_IF_TRUE = OpCode.JUMP_IF_TRUE.value
+POP_JUMP_IF_FALSE = OpCode.POP_JUMP_IF_FALSE.value
+CALL = OpCode.CALL.value
+TAIL_CALL = OpCode.TAIL_CALL.value
+CLOSURE = OpCode.CLOSURE.value
+CLOSE_UPVALUE = OpCode.CLOSE_UPVALUE.value
+RETURN = OpCode.RETURN.value
+ARRAY = OpCode.ARRAY.value
+MAP = OpCode.MAP.value
+GET_INDEX = OpCode.GET_INDEX.value
+SET_INDEX = OpCode.SET_INDEX.value
+
+
+class Upvalue:
+    """A variable captured by a closure."""
+
+    __slots__ = ("cells", "index")
+
+    def __init__(self, stack: list, index: int) -> None:
+        # The VM stack while the variable is on it, a one element list once
+        # closed, so reads and writes never check which.
+        self.cells = stack
+        self.index = index
+
+    def close(self) -> None:
+        self.cells = [self.cells[self.index]]
+        self.index = 0
+
+
+class Closure(PoxCallable):
+    def __init__(self, proto: FunctionProto, upvalues: list, vm) -> None:
+        self.proto = proto
+        self.upvalues = upvalues
+        self.vm = vm
+
+    def call(self, interpreter, arguments: list) -> object:
+        return self.vm.call_closure(self, arguments)
+
+    def arity(self) -> int:
+        return self.proto.arity
+
+    def __repr__(self) -> str:
+        return f'"<Fn {self.proto.name}>"'
+
+
+class VM:
+    """Runs the Compiler's bytecode, globals are the Interpreter's global values."""
+
+    def __init__(self, interpreter) -> None:
+        self.interpreter = interpreter
+        self.globals = interpreter.global_env.values
+        self.stack = []
+        self.open_upvalues = []
+
+    def interpret(self, statements: list):
+        try:
+            script = Closure(Compiler().compile(statements), [], self)
+            self.call_closure(script, [])
+        except Runtime_error as error:
+            self.stack.clear()
+            self.open_upvalues.clear()
+            self.interpreter.diagnostics.runtime_error(error)
+        except RecursionError as error:
+            # Pox calls don't nest here, natives calling back into Pox do.
+            self.stack.clear()
+            self.open_upvalues.clear()
+            self.interpreter.diagnostics.runtime_error(self.overflow_error(error))
+
+    def call_closure(self, closure: Closure, arguments: list) -> object:
+        self.stack.append(closure)
+        self.stack.extend(arguments)
+        return self.run(closure, len(self.stack) - len(arguments))
+
+    def error(self, closure: Closure, ip: int, message: str) -> Runtime_error:
+        line = closure.proto.chunk.lines[ip - 1]
+        return Runtime_error(Token(TokenType.EOF, "", None, line), message)
+
+    def overflow_error(self, error: RecursionError) -> Runtime_error:
+        """Stack overflow at the instruction the innermost VM.run was on."""
+        location = None
+        traceback = error.__traceback__
+        while traceback is not None:
+            if traceback.tb_frame.f_code is VM.run.__code__:
+                local_vars = traceback.tb_frame.f_locals
+                location = (local_vars["closure"], local_vars["ip"])
+            traceback = traceback.tb_next
+        if location is None:
+            return Runtime_error(Token(TokenType.EOF, "", None, 0), STACK_OVERFLOW)
+        return self.error(*location, STACK_OVERFLOW)
+
+    def native_error(self, closure: Closure, ip: int, error: Runtime_error):
+        """Places an error raised by a native at the instruction before ip."""
+        if error.token is None:
+            return self.error(closure, ip, error.message)
+        return error
+
+    def capture_upvalue(self, index: int) -> Upvalue:
+        for upvalue in self.open_upvalues:
+            if upvalue.index == index:
+                return upvalue
+
+        upvalue = Upvalue(self.stack, index)
+        self.open_upvalues.append(upvalue)
+        return upvalue
+
+    def close_upvalues(self, last: int) -> None:
+        remaining = []
+        for upvalue in self.open_upvalues:
+            if upvalue.index >= last:
+                upvalue.close()
+            else:
+                remaining.append(upvalue)
+        self.open_upvalues = remaining
+
+    def run(self, closure: Closure, base: int) -> object:
+        stack = self.stack
+        push = stack.append
+        pop = stack.pop
+        globals_ = self.globals
+        interpreter = self.interpreter
+        stringify = interpreter.stringify
+        write_line = interpreter.out.write_line
+
+        frames = []
+        chunk = closure.proto.chunk
+        code = chunk.ops
+        constants = chunk.constants
+        upvalues = closure.upvalues
+        ip = 0
+
+        while True:
+            op = code[ip]
+            ip += 1
+
+            if op == GET_LOCAL:
+                value = stack[base + code[ip]]
+                ip += 1
+                if value is None:
+                    name = chunk.names[ip - 2]
+                    raise self.error(
+                        closure,
+                        ip,
+                        f'Can\'t access uninitialized variable "{name}".',
+                    )
+                push(value)
+
+            elif op == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+
+            elif op == GET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                value = globals_.get(name)
+                if value is None:
+                    if name in globals_:
+                        message = f'Can\'t access uninitialized variable "{name}".'
+                    else:
+                        message = f'Undefined variable "{name}".'
+                    raise self.error(closure, ip, message)
+                push(value)
+
+            elif op == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+
+            elif op == LESS or op == LESS_EQUAL or op == GREATER or op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(closure, ip, "Operand must be a number.")
+                if op == LESS:
+                    stack[-1] = left < right
+                elif op == LESS_EQUAL:
+                    stack[-1] = left <= right
+                elif op == GREATER:
+                    stack[-1] = left > right
+                else:
+                    stack[-1] = left >= right
+
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                elif isinstance(left, (str, Rope)) or isinstance(right, (str, Rope)):
+                    stack[-1] = stringify(left) + stringify(right)
+                else:
+                    raise self.error(
+                        closure, ip, "Operands must be two numbers or two strings."
+                    )
+
+            elif op == APPEND:
+                right = pop()
+                left = stack[-1]
+                kind = type(left)
+                if kind is float and type(right) is float:
+                    stack[-1] = left + right
+                elif kind is str or kind is Rope:
+                    stack[-1] = concat(left, stringify(right))
+                elif isinstance(right, (str, Rope)):
+                    stack[-1] = stringify(left) + stringify(right)
+                else:
+                    raise self.error(
+                        closure, ip, "Operands must be two numbers or two strings."
+                    )
+
+            elif op == SUBTRACT:
+                right = pop()
+                if type(right) is not float:
+                    raise self.error(closure, ip, "Operand must be a number.")
+                stack[-1] = float(stack[-1]) - right
+
+            elif op == SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+
+            elif op == POP:
+                pop()
+
+            elif op == JUMP:
+                ip = code[ip]
+
+            elif op == CALL:
+                argc = code[ip]
+                ip += 1
+                callee = stack[-1 - argc]
+
+                if type(callee) is Closure:
+                    proto = callee.proto
+                    if argc != proto.arity:
+                        raise self.error(
+                            closure,
+                            ip,
+                            f"Expected {proto.arity} arguments but got {argc}.",
+                        )
+                    frames.append((closure, ip, base))
+                    closure = callee
+                    chunk = proto.chunk
+                    code = chunk.ops
+                    constants = chunk.constants
+                    upvalues = closure.upvalues
+                    base = len(stack) - argc
+                    ip = 0
+
+                elif type(callee) is NativeFunction:
+                    if argc != callee.argc:
+                        raise self.error(
+                            closure,
+                            ip,
+                            f"Expected {callee.argc} arguments but got {argc}.",
+                        )
+                    # The arguments go straight from the stack to the Python
+                    # function, the result takes the callee's slot.
+                    function = callee.function
+                    try:
+                        if argc == 1:
+                            value = function(pop())
+                        elif argc == 0:
+                            value = function()
+                        else:
+                            value = function(*stack[len(stack) - argc :])
+                            del stack[len(stack) - argc :]
+                    except Runtime_error as error:
+                        raise self.native_error(closure, ip, error)
+                    stack[-1] = value
+
+                elif isinstance(callee, PoxCallable):
+                    if argc != callee.arity():
+                        raise self.error(
+                            closure,
+                            ip,
+                            f"Expected {callee.arity()} arguments but got {argc}.",
+                        )
+                    arguments = stack[len(stack) - argc :]
+                    del stack[len(stack) - argc - 1 :]
+                    try:
+                        push(callee.call(interpreter, arguments))
+                    except Runtime_error as error:
+                        raise self.native_error(closure, ip, error)
+
+                else:
+                    raise self.error(
+                        closure, ip, "Can only call function and classes."
+                    )
+
+            elif op == TAIL_CALL and type(stack[-1 - code[ip]]) is Closure:
+                argc = code[ip]
+                ip += 1
+                callee = stack[-1 - argc]
+                proto = callee.proto
+                if argc != proto.arity:
+                    raise self.error(
+                        closure,
+                        ip,
+                        f"Expected {proto.arity} arguments but got {argc}.",
+                    )
+                # The callee and its arguments take over the slots of the
+                # returning frame, so tail recursion runs in constant space.
+                if self.open_upvalues:
+                    self.close_upvalues(base)
+                stack[base - 1 :] = stack[len(stack) - argc - 1 :]
+                closure = callee
+                chunk = proto.chunk
+                code = chunk.ops
+                constants = chunk.constants
+                upvalues = closure.upvalues
+                ip = 0
+
+            elif op == TAIL_CALL:
+                # Not a Closure, call it like CALL does and let the RETURN
+                # that follows hand back the result.
+                argc = code[ip]
+                ip += 1
+                callee = stack[-1 - argc]
+                if not isinstance(callee, PoxCallable):
+                    raise self.error(
+                        closure, ip, "Can only call function and classes."
+                    )
+                if argc != callee.arity():
+                    raise self.error(
+                        closure,
+                        ip,
+                        f"Expected {callee.arity()} arguments but got {argc}.",
+                    )
+                arguments = stack[len(stack) - argc :]
+                del stack[len(stack) - argc - 1 :]
+                try:
+                    push(callee.call(interpreter, arguments))
+                except Runtime_error as error:
+                    raise self.native_error(closure, ip, error)
+
+            elif op == RETURN:
+                result = pop()
+                if self.open_upvalues:
+                    self.close_upvalues(base)
+                del stack[base - 1 :]
+
+                if not frames:
+                    return result
+
+                push(result)
+                closure, ip, base = frames.pop()
+                chunk = closure.proto.chunk
+                code = chunk.ops
+                constants = chunk.constants
+                upvalues = closure.upvalues
+
+            elif op == GET_INDEX:
+                index = pop()
+                try:
+                    stack[-1] = get_item(stack[-1], index)
+                except Runtime_error as error:
+                    raise self.native_error(closure, ip, error)
+
+            elif op == SET_INDEX:
+                value = pop()
+                index = pop()
+                try:
+                    stack[-1] = set_item(stack[-1], index, value)
+                except Runtime_error as error:
+                    raise self.native_error(closure, ip, error)
+
+            elif op == ARRAY:
+                count = code[ip]
+                ip += 1
+                elements = stack[len(stack) - count :]
+                del stack[len(stack) - count :]
+                push(PoxArray.of(elements))
+
+            elif op == MAP:
+                count = 2 * code[ip]
+                ip += 1
+                flat = stack[len(stack) - count :]
+                del stack[len(stack) - count :]
+                try:
+                    push(PoxMap.of(zip(flat[::2], flat[1::2])))
+                except Runtime_error as error:
+                    raise self.native_error(closure, ip, error)
+
+            elif op == GET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                ip += 1
+                value = upvalue.cells[upvalue.index]
+                if value is None:
+                    name = chunk.names[ip - 2]
+                    raise self.error(
+                        closure,
+                        ip,
+                        f'Can\'t access uninitialized variable "{name}".',
+                    )
+                push(value)
+
+            elif op == SET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                ip += 1
+                upvalue.cells[upvalue.index] = stack[-1]
+
+            elif op == SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in globals_:
+                    raise self.error(closure, ip, f'Undefined variable "{name}".')
+                globals_[name] = stack[-1]
+
+            elif op == DEFINE_GLOBAL:
+                globals_[constants[code[ip]]] = pop()
+                ip += 1
+
+            elif op == PRINT:
+                write_line(stringify(pop()))
+
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(closure, ip, "Operand must be a number.")
+                stack[-1] = left * right
+
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(closure, ip, "Operand must be a number.")
+                if left == 0 or right == 0:
+                    raise self.error(
+                        closure, ip, f"Trying to devide by Zero: {left} / {right}"
+                    )
+                stack[-1] = left / right
+
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] == right
+
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] != right
+
+            elif op == NIL:
+                push(None)
+
+            elif op == TRUE:
+                push(True)
+
+            elif op == FALSE:
+                push(False)
+
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+
+            elif op == NEGATE:
+                stack[-1] = -float(stack[-1])
+
+            elif op == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+
+            elif op == JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 1
+                else:
+                    ip = code[ip]
+
+            elif op == CLOSURE:
+                proto = constants[code[ip]]
+                ip += 1
+                captured = []
+                for _ in range(proto.upvalue_count):
+                    is_local = code[ip]
+                    index = code[ip + 1]
+                    ip += 2
+                    if is_local:
+                        captured.append(self.capture_upvalue(base + index))
+                    else:
+                        captured.append(upvalues[index])
+                push(Closure(proto, captured, self))
+
+            elif op == CLOSE_UPVALUE:
+                self.close_upvalues(len(stack) - 1)
+                pop()
+
+            else:
+                raise self.error(closure, ip, f"Unknown opcode {op}.")
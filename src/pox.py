@@ -1,84 +1,320 @@
 import sys
-from Lexer.lexer import Lexer
-from Lexer.token import Token
-from Lexer.token_type import TokenType
-from Eval.expressions import Expr
+import argparse
+import threading
 from Eval.statements import Stmt
-from Parser.ast_printer import AstPrinter
 from Interpreter.interpreter import Interpreter
-from Errors.runtime_error import Runtime_error
-from Parser.parser import Parser
+from Errors.diagnostics import Diagnostic, Diagnostics
+from Embed.program import ENGINES, compile_source, make_executor
+from Cache.program_cache import ProgramCache
+from Output.output_sink import OutputSink
+from Profiler.profiler import ProfilingInterpreter
+from Profiler.sampler import Sampler
+from Profiler.metrics import MeteringInterpreter
+
+POX_VERSION = "0.4"
+# Since Python 3.11 calls between Python functions don't nest C frames, but
+# Pox recursion through natives (map calling a Pox function, printing nested
+# arrays) still does, at up to ~650 bytes of C stack per Python frame. So the
+# limit is only raised on a thread whose stack holds that many frames with
+# room to spare. The vm keeps Pox frames in a list of its own.
+STACK_SIZE = 1 << 30
+RECURSION_LIMIT = 1_000_000
+
+
+def on_large_stack(function, *args):
+    """Returns function(*args) run on a thread with a STACK_SIZE stack."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = function(*args)
+        except BaseException as error:
+            outcome["error"] = error
+
+    thread = threading.Thread(target=target, name="pox", daemon=True)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+    previous = threading.stack_size(STACK_SIZE)
+    try:
+        thread.start()
+    finally:
+        threading.stack_size(previous)
+    try:
+        thread.join()
+    finally:
+        sys.setrecursionlimit(limit)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
 
 
 class Pox:
-    def __init__(self):
-        self.had_error = False
-        self.had_runtime_error = False
-        self.interpreter = Interpreter()
+    def __init__(self, engine: str = "tree", optimize: bool = False, output=None):
+        self.out = OutputSink(output)
+        self.diagnostics = Diagnostics(self.report)
+        self.interpreter = Interpreter(self.out, self.diagnostics)
+        self.optimize = optimize
+        self.optimize_report = False
+        self.fast_lexer = False
+        self.packed_tokens = False
+        self.use_cache = True
+        self.memoize = False
+        self.select_engine(engine)
+
+    @property
+    def had_error(self) -> bool:
+        return self.diagnostics.had_error
+
+    @property
+    def had_runtime_error(self) -> bool:
+        return self.diagnostics.had_runtime_error
+
+    def select_engine(self, engine: str) -> None:
+        self.executor = make_executor(engine, self.interpreter)
+        self.engine = engine
 
     def main(self) -> None:
-        args = sys.argv[1:]
-        if len(args) > 1:
-            print("Usage: Pox [script]")
-            sys.exit(2)
-        elif len(args) == 1:
-            self.runFile(args[0])
-        else:
-            self.runPrompt()
+        if sys.argv[1:2] == ["bench"]:
+            from Bench.suite import main as bench
+
+            sys.exit(bench(sys.argv[2:]))
+        if sys.argv[1:2] == ["batch"]:
+            from Batch.runner import main as batch
+
+            sys.exit(batch(sys.argv[2:]))
+        if sys.argv[1:2] == ["serve"]:
+            from Server.server import main as serve
+
+            sys.exit(serve(sys.argv[2:]))
+
+        on_large_stack(self.run_command_line)
+
+    def run_command_line(self) -> None:
+        parser = argparse.ArgumentParser(prog="Pox")
+        parser.add_argument("script", nargs="?")
+        parser.add_argument(
+            "--engine",
+            choices=ENGINES,
+            default="tree",
+            help="tree-walking interpreter, closure compiler, bytecode VM or Python transpiler",
+        )
+        parser.add_argument(
+            "-O",
+            "--optimize",
+            action="store_true",
+            help="fold constants and remove dead code before running",
+        )
+        parser.add_argument(
+            "--optimize-report",
+            action="store_true",
+            help="print how many nodes the optimizer eliminated to stderr",
+        )
+        parser.add_argument(
+            "--fast-lexer",
+            action="store_true",
+            help="scan tokens with the single-pass regex lexer",
+        )
+        parser.add_argument(
+            "--packed-tokens",
+            action="store_true",
+            help="keep the token stream in parallel arrays (implies --fast-lexer)",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="always lex and parse the script instead of using __poxcache__",
+        )
+        parser.add_argument(
+            "--cache-stats",
+            action="store_true",
+            help="print inline cache hits and misses to stderr",
+        )
+        parser.add_argument(
+            "--output",
+            metavar="FILE",
+            help="write printed output to FILE instead of stdout",
+        )
+        parser.add_argument(
+            "--output-stats",
+            action="store_true",
+            help="print how many lines were written and the lines/sec to stderr",
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="time every Pox function and source line and print a report to stderr",
+        )
+        parser.add_argument(
+            "--profile-json",
+            metavar="FILE",
+            help="profile like --profile but write the results to FILE as JSON",
+        )
+        parser.add_argument(
+            "--memoize",
+            action="store_true",
+            help="cache the results of pure functions (tree and closure engines)",
+        )
+        parser.add_argument(
+            "--memo-size",
+            type=int,
+            default=None,
+            metavar="N",
+            help="results kept per memoized function (implies --memoize)",
+        )
+        parser.add_argument(
+            "--memo-stats",
+            action="store_true",
+            help="print memo hits, misses, evictions and invalidations to stderr (implies --memoize)",
+        )
+        parser.add_argument(
+            "--metrics",
+            metavar="FILE",
+            help="count executed statements, expressions, environments and calls and write them to FILE as JSON",
+        )
+        parser.add_argument(
+            "--sample",
+            metavar="FILE",
+            help="sample the Pox call stack and write folded stacks to FILE",
+        )
+        parser.add_argument(
+            "--sample-interval",
+            type=float,
+            default=5.0,
+            metavar="MS",
+            help="milliseconds between two samples (default 5)",
+        )
+        args = parser.parse_args()
+
+        profile = args.profile or args.profile_json is not None
+        if profile and args.metrics is not None:
+            parser.error("--profile and --metrics can't be combined")
+        if profile:
+            if args.engine != "tree":
+                parser.error("--profile needs the tree engine")
+            self.interpreter = ProfilingInterpreter(self.out, self.diagnostics)
+        elif args.metrics is not None:
+            if args.engine != "tree":
+                parser.error("--metrics needs the tree engine")
+            self.interpreter = MeteringInterpreter(self.out, self.diagnostics)
+
+        memoize = args.memoize or args.memo_size is not None or args.memo_stats
+        if memoize:
+            if args.engine not in ("tree", "closure"):
+                parser.error("--memoize needs the tree or closure engine")
+            if profile or args.metrics is not None:
+                parser.error("--memoize can't be combined with --profile or --metrics")
+            if args.memo_size is not None:
+                self.interpreter.memo_size = max(args.memo_size, 1)
+
+        self.select_engine(args.engine)
+        self.optimize = args.optimize or args.optimize_report
+        self.optimize_report = args.optimize_report
+        self.fast_lexer = args.fast_lexer or args.packed_tokens
+        self.packed_tokens = args.packed_tokens
+        self.use_cache = not (args.no_cache or args.optimize_report)
+        self.memoize = memoize
+        output = open(args.output, "w") if args.output is not None else None
+        if output is not None:
+            self.out.redirect(output)
+
+        sampler = None
+        if args.sample is not None:
+            sampler = Sampler(self.executor, args.sample_interval / 1000)
+            sampler.start()
+
+        try:
+            if args.script is not None:
+                self.runFile(args.script)
+            else:
+                self.runPrompt()
+        finally:
+            self.out.flush()
+            if sampler is not None:
+                sampler.stop()
+                with open(args.sample, "w") as file:
+                    file.write(sampler.folded())
+            if args.output_stats:
+                print(self.out.report(), file=sys.stderr)
+            if args.cache_stats:
+                print(self.interpreter.cache_report(), file=sys.stderr)
+            if args.memo_stats:
+                print(self.interpreter.memo_report(), file=sys.stderr)
+            if profile:
+                self.write_profile(args)
+            if args.metrics is not None:
+                with open(args.metrics, "w") as file:
+                    file.write(self.interpreter.to_json())
+            if output is not None:
+                output.close()
+
+    def write_profile(self, args) -> None:
+        if args.profile_json is not None:
+            with open(args.profile_json, "w") as file:
+                file.write(self.interpreter.to_json())
+        if args.profile:
+            source_lines = []
+            if args.script is not None:
+                with open(args.script, "r") as file:
+                    source_lines = file.read().splitlines()
+            print(self.interpreter.report(source_lines), file=sys.stderr)
 
     def runFile(self, file_path: str) -> None:
         with open(file_path, "r") as file:
             source = file.read()
 
-        self.run(source)
+        if not self.use_cache:
+            self.run(source)
+        else:
+            options = []
+            if self.optimize:
+                options.append("opt")
+            if self.memoize:
+                options.append("memo")
+            cache = ProgramCache(file_path, POX_VERSION, tuple(options))
+            statements = cache.load(source)
+            if statements is None:
+                statements = self.compile(source)
+                if statements is not None:
+                    cache.store(source, statements)
+            if statements is not None:
+                self.executor.interpret(statements)
 
         # Indicate an error in the exit code.
         if self.had_error:
             sys.exit(1)
 
     def runPrompt(self):
-        print("POX Repl V0.4")
+        print(f"POX Repl V{POX_VERSION}")
         while True:
+            self.out.flush()
             line = input("Pox: >> ")
             if line == "exit":
                 break
 
             self.run(line, repl=True)
-            self.had_error = False
+            self.diagnostics.had_error = False
 
     def run(self, source: str, repl=False) -> None:
-        lexer = Lexer(source)
-        tokens = lexer.scan_tokens()
-        parser = Parser(tokens)
-        statements = parser.parse()
-
-        if repl:
-            pass
-
-        if self.had_error:
-            return
-
-        self.interpreter.interpret(statements)
-
-    def report(self, line: int, where: str, message: str):
-        print(f"[Line: {line}] Error {where}: {message}")
-        self.had_error = True
-
-    def lexer_error(self, line: int, message: str) -> None:
-        self.report(line, "", message)
-
-    def parse_error(self, token: Token, message: str) -> None:
-        if token.token_type == TokenType.EOF:
-            self.report(token.line, " at end", message)
-        else:
-            self.report(token.line, f' at "{token.lexeme}"', message)
-
-    def runtime_error(self, error: Runtime_error):
-        print(f'[Line {error.token.line}]: Runtime Error: {error.message}')
-        self.had_runtime_error = True
-
-
-pox = Pox()
+        statements = self.compile(source, repl)
+        if statements is not None:
+            self.executor.interpret(statements)
 
+    def compile(self, source: str, repl=False) -> list[Stmt] | None:
+        """Lexes, parses and resolves source, returns None if it had errors."""
+        return compile_source(
+            source,
+            self.interpreter,
+            optimize=self.optimize,
+            memoize=self.memoize,
+            fast_lexer=self.fast_lexer,
+            packed_tokens=self.packed_tokens,
+            repl=repl,
+            optimizer_report=self.print_optimizer_report if self.optimize_report else None,
+        )
 
+    def print_optimizer_report(self, report: str) -> None:
+        print(report, file=sys.stderr)
 
+    def report(self, diagnostic: Diagnostic) -> None:
+        self.out.flush()
+        print(diagnostic)
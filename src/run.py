@@ -1,5 +1,4 @@
 import pox
 
 if __name__ == "__main__":
-#    pox.pox.runFile(file_path='/home/krypt7on/DEV/Programming/Pox/tests/functions.pox')
-    pox.pox.main()
+    pox.Pox().main()